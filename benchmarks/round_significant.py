@@ -0,0 +1,71 @@
+"""
+Compares the time taken by ``sigfig.round()`` and by the built-in \
+``round_significant()`` and ``round_array()`` to round the values that a \
+test typically returns, and confirms that their results are identical.
+
+    python benchmarks/round_significant.py
+"""
+from random import Random
+from timeit import timeit
+import warnings
+
+from sigfig import round as sigfig_round
+
+from mats.rounding import round_array, round_significant
+
+warnings.simplefilter("ignore")  # sigfig warns of values with few digits
+
+SIGNIFICANT_FIGURES = 4
+REPEAT = 20000
+
+
+def _values() -> dict[str, list]:
+    rng = Random(0)
+    return {
+        "float": [rng.gauss(0, 1) * 10 ** rng.randint(-9, 9) for _ in range(100)],
+        "short float": [round(rng.uniform(-100, 100), 2) for _ in range(100)],
+        "int": [rng.randint(-(10**9), 10**9) for _ in range(100)],
+    }
+
+
+def main():
+    for name, values in _values().items():
+        for value in values:
+            expected = sigfig_round(value, SIGNIFICANT_FIGURES)
+            assert round_significant(value, SIGNIFICANT_FIGURES) == expected
+
+        count = REPEAT // len(values)
+        before = timeit(
+            lambda: [sigfig_round(v, SIGNIFICANT_FIGURES) for v in values],
+            number=count,
+        )
+        after = timeit(
+            lambda: [round_significant(v, SIGNIFICANT_FIGURES) for v in values],
+            number=count,
+        )
+        per_value = 1e6 / (count * len(values))
+        print(
+            f"{name:>12}: sigfig {before * per_value:6.2f} us, "
+            f"built-in {after * per_value:6.2f} us, {before / after:5.1f}x"
+        )
+
+    try:
+        import numpy as np
+    except ImportError:
+        return
+
+    sweep = np.asarray(_values()["float"] * 10)
+    count = 100
+    before = timeit(
+        lambda: [sigfig_round(float(v), SIGNIFICANT_FIGURES) for v in sweep],
+        number=count,
+    )
+    after = timeit(lambda: round_array(sweep, SIGNIFICANT_FIGURES), number=count)
+    print(
+        f"{len(sweep)} element array: sigfig {before / count * 1e3:6.2f} ms, "
+        f"built-in {after / count * 1e3:6.2f} ms, {before / after:5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
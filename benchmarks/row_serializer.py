@@ -0,0 +1,118 @@
+"""
+Compares the time taken to convert each data point into a row of data \
+format 0 and 1 by the ``RowSerializer``, which is compiled once for the \
+sequence, and by formatting the header and every column of each point \
+anew, as the ``ArchiveManager`` previously did.  The rows are confirmed \
+to be identical.
+
+    python benchmarks/row_serializer.py
+"""
+from timeit import repeat
+
+import pint
+
+from mats.archiving.serializer import RowSerializer
+
+unit = pint.UnitRegistry()
+
+ROWS = 1000
+REPEAT = 25
+
+_SUFFIXES = {"pass_if": " =", "min": " >=", "max": " <="}
+
+
+def _point(i: int) -> dict:
+    point = {
+        "datetime": {"value": f"2022-05-26 10:00:{i % 60:02}"},
+        "pass": {"value": True},
+        "failed": {"value": []},
+    }
+    for column in range(40):
+        value = 5.5 + column + i / 1000
+        if column < 10:
+            value = value * unit.liter
+        point[f"test {column}"] = {"value": value}
+        if column % 2 == 0:
+            point[f"test {column}"]["criteria"] = {"min": 5.0, "max": 50.0}
+
+    # a limit with units is written along with its units
+    point["test 0"]["criteria"] = {"min": 5.0 * unit.liter, "max": 50.0 * unit.liter}
+    return point
+
+
+def _format(v) -> str:
+    if isinstance(v, (str, int, float)):
+        return f"{v}"
+    try:
+        # convert from pint-style values
+        return f"{v.magnitude}"
+    except AttributeError:
+        return str(v)  # this is the catch-all
+
+
+def _per_point(point: dict, data_format: int) -> str:
+    """Formats the header and the row of ``point`` without compiling."""
+    headers = list(point.keys())
+
+    header_string = ""
+    data = []
+    for header in headers:
+        criteria = point[header].get("criteria") or {}
+        keys = [key for key in ("pass_if", "min", "max") if key in criteria]
+        v = point[header]["value"]
+
+        if data_format == 0:
+            if criteria:
+                fragments = [f"{key}={criteria[key]}" for key in keys]
+                header_string += header + ":" + ",".join(fragments) + "\n"
+            data.append(_format(v))
+        else:
+            header_string += "".join(
+                [f"{header}\t"] + [f"{header}{_SUFFIXES[key]}\t" for key in keys]
+            )
+            data.append(";".join(v) if header == "failed" else _format(v))
+            data.extend(f"{criteria[key]}" for key in keys)
+
+    if data_format == 0:
+        header_string += "\n" + "\t".join(headers) + "\n"
+    else:
+        header_string = header_string.strip() + "\n"
+    return header_string + "\t".join(data) + "\n"
+
+
+def _compiled(points: list, data_format: int) -> list:
+    serializer = None
+    rows = []
+    for point in points:
+        if serializer is None or not serializer.matches(point):
+            serializer = RowSerializer(point, data_format=data_format)
+        rows.append(serializer.header + serializer.serialize(point))
+    return rows
+
+
+def main():
+    points = [_point(i) for i in range(ROWS)]
+
+    for data_format in (0, 1):
+        expected = [_per_point(point, data_format) for point in points]
+        assert _compiled(points, data_format) == expected
+
+        before = min(
+            repeat(
+                lambda: [_per_point(point, data_format) for point in points],
+                number=1,
+                repeat=REPEAT,
+            )
+        )
+        after = min(
+            repeat(lambda: _compiled(points, data_format), number=1, repeat=REPEAT)
+        )
+        print(
+            f"data_format {data_format}: "
+            f"per point {before / ROWS * 1e6:6.2f} us/row, "
+            f"compiled {after / ROWS * 1e6:6.2f} us/row, {before / after:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -40,7 +40,6 @@ if __name__ == '__main__':
 
     # allow the test to run until it has completed
     start_dt = datetime.now()
-    while ts.in_progress:
-        sleep(0.1)
+    ts.wait()
 
     logger.info(f'test time: {datetime.now() - start_dt}')
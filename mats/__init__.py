@@ -14,14 +14,48 @@ manufacturing automated test must implement, such as:
 import coloredlogs
 import logging
 
-from mats.archiving import ArchiveManager
-
-from mats.test import Test
-from mats.test_sequence import TestSequence
+from mats.archiving import (
+    ArchiveFanout,
+    ArchiveIndex,
+    ArchiveManager,
+    ArchiveReader,
+    ArchiveSink,
+    BlobStore,
+    ColumnarArchive,
+    SpoolUploader,
+    SqliteArchive,
+    load_arrays,
+    read_archive,
+)
+
+from mats.criteria import Verdict
+from mats.events import Event
+from mats.test import PhaseTimeoutError, Test
+from mats.test_sequence import SequenceState, TestSequence
 from mats.tkwidgets import MatsFrame
 from mats.version import __version__
 
-__all__ = ["Test", "TestSequence", "ArchiveManager", "MatsFrame", "__version__"]
+__all__ = [
+    "Test",
+    "Verdict",
+    "PhaseTimeoutError",
+    "TestSequence",
+    "SequenceState",
+    "Event",
+    "ArchiveFanout",
+    "ArchiveIndex",
+    "ArchiveManager",
+    "ArchiveReader",
+    "ArchiveSink",
+    "BlobStore",
+    "ColumnarArchive",
+    "SpoolUploader",
+    "SqliteArchive",
+    "MatsFrame",
+    "load_arrays",
+    "read_archive",
+    "__version__",
+]
 
 coloredlogs.install(level="DEBUG")
 
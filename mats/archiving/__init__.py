@@ -0,0 +1,35 @@
+"""
+Storage of test sequence data.
+
+The ``ArchiveManager`` is the default data manager; the storage formats \
+that it supports are implemented within the modules of this package.
+"""
+
+from mats.archiving.arrays import Measurements, load_arrays
+from mats.archiving.blobs import BlobRef, BlobStore
+from mats.archiving.columnar import ColumnarArchive
+from mats.archiving.compaction import ArchiveCompactor, compact_archives
+from mats.archiving.fanout import ArchiveFanout, ArchiveSink
+from mats.archiving.index import ArchiveIndex
+from mats.archiving.manager import ArchiveManager
+from mats.archiving.reader import ArchiveReader, read_archive
+from mats.archiving.sqlite import SqliteArchive
+from mats.archiving.uploader import SpoolUploader
+
+__all__ = [
+    "ArchiveCompactor",
+    "ArchiveFanout",
+    "ArchiveIndex",
+    "ArchiveManager",
+    "ArchiveReader",
+    "ArchiveSink",
+    "BlobRef",
+    "BlobStore",
+    "ColumnarArchive",
+    "Measurements",
+    "SpoolUploader",
+    "SqliteArchive",
+    "compact_archives",
+    "load_arrays",
+    "read_archive",
+]
@@ -0,0 +1,339 @@
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Iterable
+
+from mats.archiving.reader import ArchiveReader, parse_value
+from mats.archiving.serializer import BLOCK_PREFIX
+
+# columns which describe the execution rather than a single measurement
+_RUN_COLUMNS = ("datetime", "pass", "failed")
+
+
+class Measurements:
+    """
+    The results of a single test, or saved value, loaded by \
+    ``load_arrays()``.  Each attribute is a NumPy array with one element \
+    per execution of the test sequence.
+
+    :ivar datetime: the datetime of each execution as ``datetime64[us]``
+    :ivar values: the values, as ``float64`` when every value is numeric, \
+    ``bool`` when every value is ``True`` or ``False``, else ``object``
+    :ivar passed: ``True`` where the test does not appear within the \
+    ``failed`` column of the execution
+    :ivar min: the minimum allowed at the time, ``nan`` when not defined; \
+    when the test has a minimum per element, an ``object`` array of \
+    which each element is the sequence of minimums
+    :ivar max: the maximum allowed at the time, ``nan`` when not defined; \
+    when the test has a maximum per element, an ``object`` array of \
+    which each element is the sequence of maximums
+    :ivar pass_if: the ``pass_if`` criteria at the time, ``None`` when \
+    not defined
+    """
+
+    def __init__(self, datetime, values, passed, min, max, pass_if):
+        self.datetime = datetime
+        self.values = values
+        self.passed = passed
+        self.min = min
+        self.max = max
+        self.pass_if = pass_if
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _to_array(np, raw, encoding: str):
+    """
+    Converts a column of raw fields, as a NumPy ``bytes`` array, into \
+    the most specific array type.
+    """
+    missing = (raw == b"None") | (raw == b"")
+
+    try:
+        return np.where(missing, b"nan", raw).astype(np.float64)
+    except ValueError:
+        pass
+
+    if np.isin(raw, (b"True", b"False")).all():
+        return raw == b"True"
+
+    values = np.empty(len(raw), dtype=object)
+    values[:] = [parse_value(field.decode(encoding)) for field in raw.tolist()]
+    return values
+
+
+def _to_limits(np, limits):
+    """
+    Returns a column of limits as ``float64``, unless it contains limits \
+    per element, such as ``[0.0, 0.5]``, which are kept as ``object``.
+    """
+    try:
+        return limits.astype(np.float64)
+    except (TypeError, ValueError):
+        return limits
+
+
+def _failed_mask(np, failed, moniker: str, data_format: int, encoding: str):
+    """
+    Returns ``True`` where ``moniker`` appears within the ``failed`` column.
+    """
+    if data_format in (1, 4):
+        wrapped = np.char.add(np.char.add(b";", failed), b";")
+        target = f";{moniker};".encode(encoding)
+    else:
+        wrapped = failed
+        target = repr(moniker).encode(encoding)
+    return np.char.find(wrapped, target) >= 0
+
+
+def _field_bounds(np, buffer, delimiter: int, width: int):
+    """
+    Locates every field within a buffer of complete lines.
+
+    :return: a tuple of ``(starts, ends)`` arrays shaped ``(rows, width)``, \
+    or ``None`` if any line does not contain ``width`` fields
+    """
+    separators = np.flatnonzero((buffer == delimiter) | (buffer == ord("\n")))
+    if len(separators) % width:
+        return None
+
+    ends = separators.reshape(-1, width)
+    if not (buffer[ends[:, -1]] == ord("\n")).all():
+        return None
+
+    starts = np.empty_like(separators)
+    starts[0] = 0
+    starts[1:] = separators[:-1] + 1
+    starts = starts.reshape(-1, width)
+
+    # ignore the carriage return of files written on Windows
+    last = ends[:, -1]
+    carriage = (last > starts[:, -1]) & (buffer[last - 1] == ord("\r"))
+    ends[carriage, -1] -= 1
+
+    return starts, ends
+
+
+def _gather(np, buffer, starts, ends):
+    """
+    Copies one column of fields out of the buffer into a NumPy ``bytes`` \
+    array without creating a Python object per field.  Only the bytes of \
+    the fields are indexed, so a single long field does not require an \
+    index for every byte of the widest field on every row.
+    """
+    lengths = ends - starts
+    width = max(int(lengths.max(initial=0)), 1)
+    fields = np.zeros(len(lengths) * width, dtype=np.uint8)
+
+    total = int(lengths.sum())
+    if total:
+        # the offset of the first byte of each field within the gathered bytes
+        first = np.cumsum(lengths) - lengths
+        position = np.arange(total)
+        source = np.repeat(starts - first, lengths) + position
+        position += np.repeat(np.arange(len(lengths)) * width - first, lengths)
+        fields[position] = buffer[source]
+
+    return fields.view(f"S{width}")
+
+
+def _well_formed(buffer: bytes, delimiter: bytes, width: int) -> bytes:
+    """
+    Returns the buffer without the lines that do not contain ``width`` fields.
+    """
+    lines = buffer.split(b"\n")[:-1]
+    return b"".join(
+        line + b"\n" for line in lines if line.count(delimiter) == width - 1
+    )
+
+
+def _blocks(mapped, reader: ArchiveReader, end: int) -> list[tuple[int, int, dict]]:
+    """
+    Divides the rows of a data format 4 file at each criteria block.
+
+    :return: a list of ``(start, end, criteria)`` tuples
+    """
+    marker = f"\n{BLOCK_PREFIX}{reader._delimiter}".encode(reader._encoding)
+
+    segments = []
+    start, criteria = reader.data_offset, reader.criteria
+    found = mapped.find(marker, reader.data_offset - 1, end)
+    while found >= 0:
+        line_end = mapped.find(b"\n", found + 1, end)
+        block = reader._parse_block(
+            mapped[found + 1 : line_end].decode(reader._encoding).rstrip("\r")
+        )
+        if block is not None:
+            segments.append((start, found + 1, criteria))
+            start, criteria = line_end + 1, block
+        found = mapped.find(marker, line_end, end)
+
+    segments.append((start, end, criteria))
+    return [segment for segment in segments if segment[0] < segment[1]]
+
+
+def _load_file(np, path: Path, delimiter: str, encoding: str) -> dict:
+    reader = ArchiveReader(path, delimiter=delimiter, encoding=encoding)
+    if len(delimiter.encode(encoding)) != 1:
+        raise ValueError("the delimiter must be a single byte")
+
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            return {}  # an empty file cannot be mapped
+
+    # a final row without a line feed was only partially written
+    end = mapped.rfind(b"\n") + 1
+    if end <= reader.data_offset:
+        mapped.close()
+        return {}
+
+    if reader.data_format != 4:
+        return _load_rows(np, reader, mapped, reader.data_offset, end, reader.criteria)
+
+    # each run of rows between criteria blocks is loaded separately
+    return _combine(
+        np,
+        [
+            _load_rows(np, reader, mapped, start, stop, criteria)
+            for start, stop, criteria in _blocks(mapped, reader, end)
+        ],
+    )
+
+
+def _load_rows(
+    np, reader: ArchiveReader, mapped, start: int, end: int, file_criteria: dict
+) -> dict:
+    """
+    Loads the complete lines of data between ``start`` and ``end``.
+
+    :param file_criteria: the criteria of each heading which are not \
+    written within the lines
+    """
+    width = reader._width
+    separator = reader._delimiter.encode(reader._encoding)
+    encoding = reader._encoding
+
+    buffer = np.frombuffer(mapped, dtype=np.uint8, offset=start, count=end - start)
+    bounds = _field_bounds(np, buffer, separator[0], width)
+    if bounds is None:
+        # at least one malformed row is present, so take the slow path
+        buffer = np.frombuffer(
+            _well_formed(mapped[start:end], separator, width),
+            dtype=np.uint8,
+        )
+        bounds = _field_bounds(np, buffer, separator[0], width) if len(buffer) else None
+        if bounds is None:
+            return {}
+    starts, ends = bounds
+    rows = len(starts)
+
+    def column(index):
+        return _gather(np, buffer, starts[:, index], ends[:, index])
+
+    layout = {heading: (i, criteria) for heading, i, criteria in reader._layout}
+
+    if "datetime" in layout:
+        dts = column(layout["datetime"][0])
+        dts = np.where(dts == b"None", b"NaT", dts).astype("datetime64[us]")
+    else:
+        dts = np.full(rows, np.datetime64("NaT"), dtype="datetime64[us]")
+
+    if "failed" in layout:
+        failed = column(layout["failed"][0])
+    else:
+        failed = np.zeros(rows, dtype=bytes)
+
+    measurements = {}
+    for heading, (i, criteria_columns) in layout.items():
+        if heading in _RUN_COLUMNS:
+            continue
+
+        criteria = {}
+        for key in ("min", "max", "pass_if"):
+            if key in criteria_columns:
+                criteria[key] = _to_array(np, column(criteria_columns[key]), encoding)
+            elif key in file_criteria.get(heading, {}):
+                # np.full() would spread a sequence of limits across the rows
+                criteria[key] = np.empty(rows, dtype=object)
+                criteria[key][:] = [file_criteria[heading][key]] * rows
+            else:
+                criteria[key] = np.full(
+                    rows,
+                    None if key == "pass_if" else np.nan,
+                    dtype=object if key == "pass_if" else np.float64,
+                )
+
+        pass_if = np.empty(rows, dtype=object)
+        pass_if[:] = criteria["pass_if"]
+
+        measurements[heading] = Measurements(
+            datetime=dts,
+            values=_to_array(np, column(i), encoding),
+            passed=~_failed_mask(np, failed, heading, reader.data_format, encoding),
+            min=_to_limits(np, criteria["min"]),
+            max=_to_limits(np, criteria["max"]),
+            pass_if=pass_if,
+        )
+
+    return measurements
+
+
+def _combine(np, loaded: list[dict]) -> dict:
+    """
+    Joins the ``Measurements`` of each test, in the order supplied.
+    """
+    monikers = []
+    for measurements in loaded:
+        monikers += [m for m in measurements if m not in monikers]
+
+    combined = {}
+    for moniker in monikers:
+        parts = [m[moniker] for m in loaded if moniker in m]
+        combined[moniker] = Measurements(
+            **{
+                name: np.concatenate([getattr(p, name) for p in parts])
+                for name in ("datetime", "values", "passed", "min", "max", "pass_if")
+            }
+        )
+
+    return combined
+
+
+def load_arrays(
+    paths: str | Path | Iterable[str | Path],
+    delimiter: str = "\t",
+    encoding: str = "utf-8",
+) -> dict[str, Measurements]:
+    """
+    Loads one or more data files written using data format 0, 1, or 4 into \
+    NumPy arrays, one ``Measurements`` per test.  NumPy must be installed \
+    in order to use this function.
+
+    Each file is memory-mapped and the fields are located using bulk \
+    NumPy operations on the whole buffer rather than parsing line by \
+    line.  \
+    When several files are supplied, such as files which have been moved \
+    aside as the criteria changed, the results of each test are combined \
+    in the order supplied.  The criteria in effect for each execution are \
+    retained, and a test only contributes elements from the files in \
+    which it appears.
+
+    .. code-block:: python
+
+        data = load_arrays(sorted(Path('.').glob('data*.txt')))
+        flow = data['pump flow test']
+        print(flow.values.mean(), (~flow.passed).sum())
+
+    :param paths: a path or paths to the data files
+    :param delimiter: the data delimiter
+    :param encoding: the text encoding of the files
+    :return: a ``dict`` of ``Measurements`` keyed by test moniker
+    """
+    import numpy as np
+
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    return _combine(np, [_load_file(np, Path(p), delimiter, encoding) for p in paths])
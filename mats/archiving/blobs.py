@@ -0,0 +1,176 @@
+from hashlib import sha256
+import logging
+from mmap import ACCESS_READ, mmap
+from os import getpid, replace
+from pathlib import Path
+import sys
+from threading import get_ident
+from typing import Optional
+
+# the directory, next to the data file, which contains the store
+BLOBS_DIR = "blobs"
+
+# the text which begins a reference to a stored value within a row
+BLOB_PREFIX = "blob:"
+
+
+def payload_size(value) -> Optional[int]:
+    """
+    Returns the size, in bytes, of a value which may be kept within a \
+    ``BlobStore``, else ``None``.
+
+    :param value: the value
+    :return: the size of the value or ``None``
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return memoryview(value).nbytes
+
+    # NumPy is only examined when the application has already imported it
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        return value.nbytes
+
+    return None
+
+
+class BlobRef(str):
+    """
+    The reference to a stored value, as read from a data file.  The \
+    reference compares equal to its text, while ``load()`` maps the \
+    stored value into memory.
+    """
+
+    def __new__(cls, text: str, store: "BlobStore"):
+        ref = super().__new__(cls, text)
+        ref._store = store
+        return ref
+
+    def __reduce__(self):
+        # the store is carried along, such as to the processes of a compaction
+        return self.__class__, (str(self), self._store)
+
+    def load(self):
+        """
+        Returns the stored value; see ``BlobStore.load()``.
+
+        :return: the stored value
+        """
+        return self._store.load(self)
+
+
+class BlobStore:
+    """
+    A content-addressed store of large values, such as waveforms and \
+    images, which are too large to be kept within the cells of a data file.
+
+    Each value is written once to ``<path>/<xx>/<sha256>.npy`` when it is \
+    a NumPy array, or to ``<path>/<xx>/<sha256>.bin`` when it is \
+    ``bytes``, ``bytearray``, or ``memoryview``, where ``xx`` are the first \
+    two characters of the hash.  A value which is identical to one already \
+    stored is not written again.  The row refers to the value using the \
+    text ``blob:<sha256>.<extension>``.
+
+    :param path: a string or `Path` containing the path to the store
+    :param loglevel: the logging level
+    """
+
+    def __init__(self, path: str | Path, loglevel=logging.INFO):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._path = Path(path)
+        self._known = set()
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path to the store
+
+        :return: the path
+        """
+        return self._path
+
+    def _locate(self, name: str) -> Path:
+        return self._path / name[:2] / name
+
+    def put(self, value) -> str:
+        """
+        Stores a value, unless an identical value is already stored.
+
+        :param value: ``bytes``, ``bytearray``, ``memoryview``, or a NumPy \
+        array which does not contain Python objects
+        :return: the reference to the value
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = memoryview(value)
+            if data.format != "B" or not data.c_contiguous:
+                data = memoryview(data.tobytes())
+
+            name = sha256(data).hexdigest() + ".bin"
+            self._write(name, lambda f: f.write(data))
+            return BLOB_PREFIX + name
+
+        import numpy as np
+
+        if not isinstance(value, np.ndarray) or value.dtype.hasobject:
+            raise TypeError(f"unable to store {type(value).__name__} values")
+
+        array = np.ascontiguousarray(value)
+
+        # arrays of the same bytes but of a different type or shape differ
+        digest = sha256(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.reshape(-1).view(np.uint8))
+
+        name = digest.hexdigest() + ".npy"
+        self._write(name, lambda f: np.save(f, array, allow_pickle=False))
+        return BLOB_PREFIX + name
+
+    def _write(self, name: str, write):
+        """
+        Writes a value under a temporary name, then renames it, so that \
+        a partially-written value is never found within the store.
+        """
+        if name in self._known:
+            return
+
+        target = self._locate(name)
+        if target.exists():
+            self._known.add(name)
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f"{name}.{getpid()}.{get_ident()}.partial")
+
+        self._logger.debug(f'storing "{target}"')
+        with open(partial, "wb") as f:
+            write(f)
+        replace(partial, target)
+
+        self._known.add(name)
+
+    def load(self, ref: str):
+        """
+        Maps a stored value into memory without reading it.
+
+        :param ref: the reference to the value, with or without the \
+        leading ``blob:``
+        :return: a read-only NumPy array for ``.npy`` values, else a \
+        read-only ``memoryview``
+        """
+        name = ref[len(BLOB_PREFIX) :] if ref.startswith(BLOB_PREFIX) else ref
+        path = self._locate(name)
+
+        if name.endswith(".npy"):
+            import numpy as np
+
+            try:
+                return np.load(path, mmap_mode="r", allow_pickle=False)
+            except ValueError:
+                # arrays without any elements cannot be mapped
+                return np.load(path, allow_pickle=False)
+
+        with open(path, "rb") as f:
+            try:
+                return memoryview(mmap(f.fileno(), 0, access=ACCESS_READ))
+            except ValueError:
+                return memoryview(b"")  # an empty file cannot be mapped
@@ -0,0 +1,356 @@
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+from struct import Struct
+
+from mats.archiving.serializer import format_value
+
+MAGIC = b"MATS-COLUMNAR 1\n"
+STRINGS_SUFFIX = ".strings"
+
+# kind: (struct format, numpy dtype)
+_KINDS = {
+    "float": ("d", "<f8"),
+    "int": ("q", "<i8"),
+    "bool": ("b", "i1"),
+    "str": ("i", "<i4"),
+    "list": ("i", "<i4"),
+    "datetime": ("q", "<M8[us]"),
+}
+
+# stored in place of ``None`` for integer and datetime columns; this is
+# also the value that NumPy uses to represent "not a time"
+INT_NONE = -(2**63)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _magnitude(value):
+    """
+    Returns the magnitude of pint-style values, else ``value``.
+    """
+    return getattr(value, "magnitude", value)
+
+
+def _is_datetime(value) -> bool:
+    if isinstance(value, datetime):
+        return True
+    try:
+        datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _kind_of(heading: str, value) -> str:
+    """
+    Returns the kind of column which is able to store ``value``.
+    """
+    if heading == "failed":
+        return "list"
+    if heading == "datetime" and _is_datetime(value):
+        return "datetime"
+    if heading == "pass" or isinstance(value, bool):
+        return "bool"
+
+    value = _magnitude(value)
+    if isinstance(value, int):
+        return "int"
+    if value is None or isinstance(value, float):
+        return "float"
+
+    return "str"
+
+
+def _fits(kind: str, value) -> bool:
+    """
+    Returns True if ``value`` may be stored within a column of ``kind``.
+    """
+    if value is None or kind in ("str", "list"):
+        return True
+    if kind == "bool":
+        return isinstance(value, bool)
+    if kind == "datetime":
+        return _is_datetime(value)
+
+    value = _magnitude(value)
+    if isinstance(value, bool):
+        return False
+    if kind == "int":
+        return isinstance(value, int)
+    return isinstance(value, (int, float))
+
+
+class StringTable:
+    """
+    The dictionary of strings referenced by a columnar data file.  Each \
+    distinct string is appended once to the companion file as a line of \
+    JSON and is referred to by its line number.
+
+    :param path: the path to the companion file
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._strings = []
+        self._indices = {}
+
+        if self._path.exists():
+            with open(self._path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # a partial line left behind by an interruption
+                        break
+                    string = json.loads(line)
+                    self._indices[string] = len(self._strings)
+                    self._strings.append(string)
+
+        self._file = None
+
+    def __getitem__(self, index: int) -> str:
+        return self._strings[index]
+
+    def __len__(self):
+        return len(self._strings)
+
+    @property
+    def strings(self) -> list[str]:
+        """
+        Returns all strings in order of their index
+
+        :return: a list of strings
+        """
+        return self._strings
+
+    def close(self):
+        """
+        Closes the companion file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def index(self, string: str) -> int:
+        """
+        Returns the index of ``string``, adding it to the table if it is \
+        not already present.
+
+        :param string: the string to look up
+        :return: the index of the string
+        """
+        index = self._indices.get(string)
+        if index is not None:
+            return index
+
+        if self._file is None:
+            self._file = open(self._path, "a", encoding="utf-8")
+
+        # the string must be on disk before any record refers to it
+        self._file.write(json.dumps(string) + "\n")
+        self._file.flush()
+
+        index = len(self._strings)
+        self._strings.append(string)
+        self._indices[string] = index
+
+        return index
+
+
+class ColumnarSchema:
+    """
+    The descriptor of a columnar data file, which is derived from the \
+    headings, the types of the values, and the criteria of a data point.
+
+    The file begins with ``MAGIC`` followed by one line of JSON that \
+    describes each column.  Every record that follows is packed to the \
+    same width using little-endian ``float64``, ``int64``, and ``int8`` \
+    fields.  Strings, including the ``failed`` list, are stored as an \
+    ``int32`` index into a ``StringTable``.
+
+    :param point: a ``dict`` in the same form supplied to \
+    ``ArchiveManager.save()``
+    :param preamble: a string that is saved within the descriptor
+    """
+
+    def __init__(self, point: dict, preamble: str | None = None):
+        self.columns = []
+        for heading, entry in point.items():
+            column = {"name": heading, "kind": _kind_of(heading, entry.get("value"))}
+            if entry.get("criteria") is not None:
+                column["criteria"] = entry["criteria"]
+            self.columns.append(column)
+
+        descriptor = {"preamble": preamble, "columns": self.columns}
+        self.header = MAGIC + json.dumps(descriptor, default=str).encode() + b"\n"
+
+        self._struct = Struct(
+            "<" + "".join(_KINDS[c["kind"]][0] for c in self.columns)
+        )
+        self._encoders = tuple(
+            getattr(self, f"_encode_{c['kind']}") for c in self.columns
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the width of each record, in bytes
+
+        :return: the record width
+        """
+        return self._struct.size
+
+    def fits(self, point: dict) -> bool:
+        """
+        Returns True when ``point`` may be stored using this schema.
+
+        :param point: a ``dict`` in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: True if the point fits
+        """
+        if len(point) != len(self.columns):
+            return False
+
+        for column, (heading, entry) in zip(self.columns, point.items()):
+            if column["name"] != heading:
+                return False
+            if column.get("criteria") != entry.get("criteria"):
+                return False
+            if not _fits(column["kind"], entry.get("value")):
+                return False
+
+        return True
+
+    def pack(self, point: dict, strings: StringTable) -> bytes:
+        """
+        Returns ``point`` packed into a single record.
+
+        :param point: a ``dict`` which ``fits()`` this schema
+        :param strings: the table to which string values are added
+        :return: the record as ``bytes``
+        """
+        return self._struct.pack(
+            *[
+                encode(entry.get("value"), strings)
+                for encode, entry in zip(self._encoders, point.values())
+            ]
+        )
+
+    @staticmethod
+    def _encode_float(value, strings):
+        return float("nan") if value is None else float(_magnitude(value))
+
+    @staticmethod
+    def _encode_int(value, strings):
+        return INT_NONE if value is None else int(_magnitude(value))
+
+    @staticmethod
+    def _encode_bool(value, strings):
+        return -1 if value is None else int(value)
+
+    @staticmethod
+    def _encode_str(value, strings):
+        if value is None:
+            return -1
+        return strings.index(value if isinstance(value, str) else format_value(value))
+
+    @staticmethod
+    def _encode_list(value, strings):
+        if value is None:
+            return -1
+        if isinstance(value, str):
+            return strings.index(value)
+        return strings.index(";".join(value))
+
+    @staticmethod
+    def _encode_datetime(value, strings):
+        if value is None:
+            return INT_NONE
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(value)
+        return (value.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+
+
+class ColumnarArchive:
+    """
+    Read access to a file written using ``ArchiveManager(data_format=3)``.
+
+    The records are memory-mapped into a NumPy structured array, so \
+    numeric and datetime columns are available without copying or \
+    parsing.  NumPy must be installed in order to use this class.
+
+    :param path: a string or `Path` containing the path to the data file
+    """
+
+    def __init__(self, path: str | Path):
+        import numpy as np
+
+        self._path = Path(path)
+
+        with open(self._path, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f'"{self._path}" is not a columnar data file')
+            descriptor = json.loads(f.readline())
+            offset = f.tell()
+
+        self.preamble = descriptor.get("preamble")
+        self.columns = descriptor["columns"]
+        self._kinds = {c["name"]: c["kind"] for c in self.columns}
+
+        dtype = np.dtype([(c["name"], _KINDS[c["kind"]][1]) for c in self.columns])
+
+        # a partially-written record at the end of the file is ignored
+        count = (self._path.stat().st_size - offset) // dtype.itemsize
+        if count:
+            self.records = np.memmap(
+                self._path, dtype=dtype, mode="r", offset=offset, shape=(count,)
+            )
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+        strings = StringTable(self._path.with_name(self._path.name + STRINGS_SUFFIX))
+        self._strings = np.array(strings.strings + [None], dtype=object)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def criteria(self) -> dict:
+        """
+        Returns the criteria of each column which has criteria
+
+        :return: a ``dict`` of criteria keyed by column name
+        """
+        return {c["name"]: c["criteria"] for c in self.columns if "criteria" in c}
+
+    def column(self, name: str):
+        """
+        Returns the values of a single column as a NumPy array.
+
+        Numeric and datetime columns are views into the file.  Missing \
+        values are ``nan``, ``INT_NONE``, or ``NaT`` respectively.  Boolean \
+        columns are returned as ``True`` where the value was ``True``.  \
+        String columns are returned as object arrays containing ``None`` \
+        for missing values, while the ``failed`` column contains lists.
+
+        :param name: the column name
+        :return: the column values
+        """
+        import numpy as np
+
+        kind = self._kinds[name]
+        values = self.records[name]
+
+        if kind == "bool":
+            return values == 1
+        if kind == "str":
+            return self._strings[values]
+        if kind == "list":
+            column = np.empty(len(values), dtype=object)
+            for i, s in enumerate(self._strings[values]):
+                column[i] = [] if not s else s.split(";")
+            return column
+
+        return values
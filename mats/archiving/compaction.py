@@ -0,0 +1,408 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from hashlib import blake2b
+import json
+import logging
+from os import remove, replace
+from pathlib import Path
+from shutil import copyfileobj
+from tempfile import NamedTemporaryFile
+from typing import Iterable, Optional
+
+from mats.archiving.compression import COMPRESSORS
+from mats.archiving.manager import ArchiveManager
+from mats.archiving.reader import ArchiveReader
+from mats.archiving.sqlite import SqliteArchive
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+# the digests of the rows already within the output, which are stored
+# next to the manifest as consecutive fixed-width digests
+KEYS_SUFFIX = ".keys"
+_KEY_SIZE = 16
+
+# columns which describe the execution rather than a single measurement
+_RUN_COLUMNS = ("datetime", "pass", "failed")
+
+
+def _row_key(row: dict) -> bytes:
+    """
+    Returns a digest which identifies the content of a row, regardless of \
+    the order of its columns and of columns which contain nothing.
+    """
+    content = []
+    for heading, entry in row.items():
+        value = entry.get("value")
+        criteria = {k: v for k, v in (entry.get("criteria") or {}).items() if v is not None}
+        if value is None or value == []:
+            if not criteria:
+                continue
+            value = None
+        content.append((heading, repr(value), sorted(criteria.items())))
+
+    content.sort()
+    return blake2b(repr(content).encode(), digest_size=_KEY_SIZE).digest()
+
+
+def _columns_of(rows: list[dict]) -> dict[str, list[str]]:
+    """
+    Returns the headings of the rows, in order of appearance, along with \
+    the criteria keys of each heading.
+    """
+    columns = {}
+    for row in rows:
+        for heading, entry in row.items():
+            keys = columns.setdefault(heading, [])
+            for key in entry.get("criteria") or {}:
+                if key not in keys:
+                    keys.append(key)
+    return columns
+
+
+def _read_file(path: str, delimiter: str, encoding: str) -> dict:
+    """
+    Reads every row of a data file, which may have been compressed after \
+    it was moved aside.  Executed within the worker processes.
+    """
+    source = Path(path)
+
+    temporary = None
+    for module, extension in COMPRESSORS.values():
+        if source.suffix == extension:
+            with module.open(source, "rb") as compressed, NamedTemporaryFile(
+                "wb", suffix=Path(source.stem).suffix, delete=False
+            ) as f:
+                copyfileobj(compressed, f, 1024 * 1024)
+                temporary = Path(f.name)
+
+    try:
+        reader = ArchiveReader(temporary or source, delimiter=delimiter, encoding=encoding)
+        rows = list(reader)
+    finally:
+        if temporary is not None:
+            remove(temporary)
+
+    return {
+        "path": path,
+        "data_format": reader.data_format,
+        "columns": _columns_of(rows),
+        "rows": rows,
+        "keys": [_row_key(row) for row in rows],
+    }
+
+
+def _sort_key(row: dict):
+    dt = row.get("datetime", {}).get("value")
+    return (0, dt, "") if isinstance(dt, datetime) else (1, datetime.min, str(dt))
+
+
+class ArchiveCompactor:
+    """
+    Merges data files, such as the many files moved aside by the \
+    ``ArchiveManager`` as the criteria change, into one data file.
+
+    Each file is read within a pool of worker processes.  Files written \
+    using data format 0, 1, or 4, with or without a preamble, and files which \
+    were compressed after being moved aside, may be mixed.  The headings \
+    of every file are combined, a row which appears more than once is only \
+    written once, and the rows are written in order of their datetime.
+
+    A manifest of the files which have been merged is kept, so that a \
+    later run only reads the files which are new or which have changed.  \
+    The digests of the rows within the output are kept next to the \
+    manifest in order to find duplicates without reading the output.
+
+    .. code-block:: python
+
+        compactor = ArchiveCompactor('merged.txt')
+        compactor.compact(sorted(Path('.').glob('data*.txt*')))
+
+    :param output: a string or `Path` containing the path to the merged \
+    data file
+    :param data_format: the format of the merged data file; 1 writes text \
+    containing the criteria of every row, 4 writes text containing the \
+    criteria only when they change, and 2 writes an SQLite database
+    :param manifest: a string or `Path` containing the path to the \
+    manifest; defaults to ``<output>.manifest.json``
+    :param processes: the number of worker processes; defaults to the \
+    number of processors
+    :param delimiter: the data delimiter of the files to be merged
+    :param encoding: the text encoding of the files to be merged
+    :param preamble: a string that is written at the beginning of a merged \
+    text file
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        output: str | Path,
+        data_format: int = 1,
+        manifest: Optional[str | Path] = None,
+        processes: Optional[int] = None,
+        delimiter: str = "\t",
+        encoding: str = "utf-8",
+        preamble: Optional[str] = None,
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        if data_format not in (1, 2, 4):
+            # the other formats are unable to store criteria which change
+            raise ValueError(f'data_format "{data_format}" invalid')
+
+        self._output = Path(output)
+        self._format = data_format
+        self._manifest_path = (
+            Path(manifest)
+            if manifest is not None
+            else self._output.with_name(self._output.name + MANIFEST_SUFFIX)
+        )
+        self._keys_path = self._manifest_path.with_name(
+            self._manifest_path.name + KEYS_SUFFIX
+        )
+        self._processes = processes
+        self._delimiter = delimiter
+        self._encoding = encoding
+        self._preamble = preamble
+        self._loglevel = loglevel
+
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {"data_format": self._format, "columns": {}, "files": {}}
+
+        if manifest.get("data_format") != self._format:
+            raise ValueError(
+                f'"{self._manifest_path}" describes data_format '
+                f'{manifest.get("data_format")}'
+            )
+        return manifest
+
+    def _save_manifest(self):
+        partial = self._manifest_path.with_name(self._manifest_path.name + ".partial")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        replace(partial, self._manifest_path)
+
+    def pending(self, paths: Iterable[str | Path]) -> list[Path]:
+        """
+        Returns the files which have not been merged, or which have \
+        changed since they were merged.
+
+        :param paths: the paths to the data files
+        :return: a list of paths
+        """
+        excluded = {
+            p.resolve()
+            for p in (self._output, self._manifest_path, self._keys_path)
+        }
+
+        pending = []
+        for path in paths:
+            path = Path(path)
+            if path.resolve() in excluded:
+                continue
+
+            stat = path.stat()
+            merged = self.manifest["files"].get(str(path.resolve()))
+            if merged is None or (merged["size"], merged["mtime"]) != (
+                stat.st_size,
+                stat.st_mtime,
+            ):
+                pending.append(path)
+
+        return pending
+
+    def compact(self, paths: Iterable[str | Path]) -> dict:
+        """
+        Merges the files which have not yet been merged into the output.
+
+        :param paths: the paths to the data files
+        :return: a ``dict`` containing the number of ``files`` read, the \
+        number of ``rows`` written, and the number of ``duplicates`` found
+        """
+        pending = self.pending(paths)
+        summary = {"files": 0, "rows": 0, "duplicates": 0}
+        if not pending:
+            self._logger.info("no new files to merge")
+            return summary
+
+        self._logger.info(f"reading {len(pending)} files")
+        args = (self._delimiter, self._encoding)
+
+        if self._processes == 1 or len(pending) == 1:
+            results = self._collect(
+                pending, [lambda p=p: _read_file(str(p), *args) for p in pending]
+            )
+        else:
+            with ProcessPoolExecutor(max_workers=self._processes) as pool:
+                futures = [pool.submit(_read_file, str(p), *args) for p in pending]
+                results = self._collect(pending, [f.result for f in futures])
+
+        keys = self._load_keys()
+        rows, new_keys = [], []
+        for result in results:
+            for row, key in zip(result["rows"], result["keys"]):
+                if key in keys:
+                    summary["duplicates"] += 1
+                    continue
+                keys.add(key)
+                new_keys.append(key)
+                rows.append(row)
+
+        rows.sort(key=_sort_key)
+
+        if self._format in (1, 4):
+            self._write_text(rows, results)
+        else:
+            self._write_sqlite(rows)
+
+        with open(self._keys_path, "ab") as f:
+            f.write(b"".join(new_keys))
+
+        for result in results:
+            stat = Path(result["path"]).stat()
+            self.manifest["files"][str(Path(result["path"]).resolve())] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "rows": len(result["rows"]),
+            }
+        self._save_manifest()
+
+        summary["files"] = len(results)
+        summary["rows"] = len(rows)
+        self._logger.info(
+            f'wrote {summary["rows"]} rows from {summary["files"]} files to '
+            f'"{self._output}", ignoring {summary["duplicates"]} duplicates'
+        )
+        return summary
+
+    def _collect(self, pending: list[Path], results: list) -> list[dict]:
+        """
+        Gathers the result of reading each file, skipping the files which \
+        could not be read so that they are attempted again by a later run.
+
+        :param pending: the paths to the data files
+        :param results: a function per file which returns its result
+        :return: the results of the files which were read
+        """
+        collected = []
+        for path, result in zip(pending, results):
+            try:
+                collected.append(result())
+            except (OSError, ValueError, EOFError) as e:
+                self._logger.error(f'unable to read "{path}": {e}')
+        return collected
+
+    def _load_keys(self) -> set[bytes]:
+        try:
+            with open(self._keys_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return set()
+
+        return {
+            data[i : i + _KEY_SIZE]
+            for i in range(0, len(data) - _KEY_SIZE + 1, _KEY_SIZE)
+        }
+
+    def _write_text(self, rows: list[dict], results: list[dict]):
+        """
+        Appends rows to the output, or writes the output again when the \
+        new rows contain headings or criteria which it does not.
+        """
+        columns = {h: list(k) for h, k in self.manifest["columns"].items()}
+        grown = not self._output.exists()
+        for result in results:
+            for heading, keys in result["columns"].items():
+                if heading not in columns:
+                    columns[heading] = []
+                    grown = True
+                for key in keys:
+                    if key not in columns[heading]:
+                        columns[heading].append(key)
+                        grown = True
+
+        # the columns which describe the execution always come first
+        columns = {
+            **{h: columns[h] for h in _RUN_COLUMNS if h in columns},
+            **{h: k for h, k in columns.items() if h not in _RUN_COLUMNS},
+        }
+
+        if grown and self._output.exists():
+            self._logger.info(f'adding columns to "{self._output}"')
+            existing = list(
+                ArchiveReader(self._output, delimiter=self._delimiter, encoding=self._encoding)
+            )
+            rows = sorted(existing + rows, key=_sort_key)
+
+        fname = self._output.name
+        if grown:
+            # the file is replaced only once it is complete
+            fname = f".{fname}.partial"
+            partial = self._output.with_name(fname)
+            if partial.exists():
+                remove(partial)
+
+        manager = ArchiveManager(
+            path=self._output.parent,
+            fname=fname,
+            delimiter=self._delimiter,
+            data_format=self._format,
+            preamble=self._preamble,
+            persistent=True,
+            loglevel=self._loglevel,
+        )
+        with manager:
+            for row in rows:
+                manager.save(self._unify(row, columns))
+
+        if grown:
+            replace(self._output.with_name(fname), self._output)
+
+        self.manifest["columns"] = columns
+
+    @staticmethod
+    def _unify(row: dict, columns: dict[str, list[str]]) -> dict:
+        """
+        Returns the row containing every column of the output.
+        """
+        unified = {}
+        for heading, keys in columns.items():
+            entry = row.get(heading, {})
+            value = entry.get("value")
+            if heading == "failed" and value is None:
+                value = []
+
+            unified[heading] = {"value": value}
+            if keys:
+                criteria = entry.get("criteria") or {}
+                unified[heading]["criteria"] = {k: criteria.get(k) for k in keys}
+        return unified
+
+    def _write_sqlite(self, rows: list[dict]):
+        with SqliteArchive(self._output, loglevel=self._loglevel) as database:
+            for row in rows:
+                database.insert(row)
+            database.commit()
+
+
+def compact_archives(
+    paths: Iterable[str | Path], output: str | Path, **kwargs
+) -> dict:
+    """
+    Merges data files into ``output``.  See ``ArchiveCompactor`` for the \
+    available keyword arguments.
+
+    :param paths: the paths to the data files
+    :param output: a string or `Path` containing the path to the merged \
+    data file
+    :return: a ``dict`` containing the number of ``files`` read, the \
+    number of ``rows`` written, and the number of ``duplicates`` found
+    """
+    return ArchiveCompactor(output, **kwargs).compact(paths)
@@ -0,0 +1,105 @@
+import gzip
+import logging
+import lzma
+from os import remove, replace
+from pathlib import Path
+from queue import Queue
+from shutil import copyfileobj
+from threading import Thread
+from typing import Optional
+
+# compression method: (module, file extension)
+COMPRESSORS = {
+    "gzip": (gzip, ".gz"),
+    "lzma": (lzma, ".xz"),
+}
+
+
+def compress_file(path: str | Path, method: str = "gzip") -> Path:
+    """
+    Compresses a file, replacing it with ``<path>.gz`` or ``<path>.xz``.
+
+    The compressed file is written under a temporary name and renamed \
+    once complete, so an interruption never leaves a truncated archive \
+    in place of the original.
+
+    :param path: a string or `Path` containing the path to the file
+    :param method: "gzip" or "lzma"
+    :return: the path to the compressed file
+    """
+    module, extension = COMPRESSORS[method]
+
+    path = Path(path)
+    destination = path.with_name(path.name + extension)
+    partial = path.with_name(path.name + extension + ".partial")
+
+    with open(path, "rb") as source, module.open(partial, "wb") as target:
+        copyfileobj(source, target, 1024 * 1024)
+
+    replace(partial, destination)
+    remove(path)
+
+    return destination
+
+
+class Compressor:
+    """
+    Compresses files on a background thread so that the thread which \
+    requested the compression does not wait on it.
+
+    :param method: "gzip" or "lzma"
+    :param loglevel: the logging level
+    """
+
+    def __init__(self, method: str = "gzip", loglevel=logging.INFO):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        if method not in COMPRESSORS:
+            raise ValueError(f'compression "{method}" invalid')
+
+        self._method = method
+        self._queue = Queue()
+        self._thread = None
+
+    def submit(self, path: str | Path):
+        """
+        Queues a file to be compressed.
+
+        :param path: a string or `Path` containing the path to the file
+        :return: None
+        """
+        if self._thread is None:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+        self._queue.put(Path(path))
+
+    def join(self, timeout: Optional[float] = None):
+        """
+        Waits for queued files to be compressed.
+
+        :param timeout: the maximum time, in seconds, to wait
+        :return: None
+        """
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+        if self._thread.is_alive():
+            self._logger.warning("timed out while compressing files")
+        self._thread = None
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+
+            self._logger.info(f'compressing "{path}"')
+            try:
+                compress_file(path, self._method)
+            except OSError as e:
+                self._logger.error(f'unable to compress "{path}": {e}')
@@ -0,0 +1,507 @@
+from datetime import datetime
+import logging
+from pathlib import Path
+import pickle
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from types import MappingProxyType
+from typing import Iterable, Optional
+
+from mats.archiving.manager import collect_point
+from mats.test import Test
+
+# what a sink does with a record when its queue is full
+SINK_POLICIES = ("block", "drop", "spill")
+
+# placed onto the queue of a sink by close()
+_STOP = object()
+
+
+def freeze(point: dict) -> MappingProxyType:
+    """
+    Returns a read-only record of a data point which may be shared by \
+    several sinks.  The row and each of its entries are read-only views \
+    of copies, and the criteria are copied, so that neither the caller \
+    nor a sink is able to modify the record seen by another sink.
+
+    :param point: a ``dict`` in the same form supplied to \
+    ``ArchiveManager.save()``
+    :return: the record
+    """
+    record = {}
+    for heading, entry in point.items():
+        entry = dict(entry)
+        if entry.get("criteria") is not None:
+            entry["criteria"] = dict(entry["criteria"])
+        record[heading] = MappingProxyType(entry)
+    return MappingProxyType(record)
+
+
+def thaw(record) -> dict:
+    """
+    Returns a record created by ``freeze()`` as a ``dict`` of ``dict``, \
+    such as in order to pickle it.
+
+    :param record: the record
+    :return: the data point
+    """
+    return {heading: dict(entry) for heading, entry in record.items()}
+
+
+class ArchiveSink:
+    """
+    Saves records to a single target, such as an ``ArchiveManager``, \
+    from a worker thread of its own, so that a target which is slow or \
+    which fails does not delay the test sequence or the other sinks of \
+    an ``ArchiveFanout``.
+
+    Records wait within a bounded queue.  When the queue is full, the \
+    ``policy`` determines what happens to a new record:
+
+     * ``"block"`` - the caller waits until there is room
+     * ``"drop"`` - the record is discarded and counted
+     * ``"spill"`` - the record is appended to ``spill_path`` and saved \
+       once the queue has been emptied.  Records are always saved in \
+       the order received, and records left within the spill file when \
+       the process ended are saved by the next sink created using the \
+       same ``spill_path``, so a record may be saved more than once.
+
+    The records which are waiting are saved together within the \
+    ``batch()`` of the target, when it has one, such as the \
+    ``ArchiveManager``.  An exception raised by the target is logged and \
+    counted, the record is discarded, and the worker continues with the \
+    next record.
+
+    :param target: an object with a ``save(point)`` method, such as an \
+    ``ArchiveManager``; the ``close()`` method of the target, when it has \
+    one, is called as the sink is closed
+    :param name: the name of the sink within logs and statistics; \
+    defaults to the class name of the target
+    :param queue_size: the maximum number of records waiting to be saved
+    :param policy: "block", "drop", or "spill"
+    :param spill_path: a string or `Path` containing the path to the \
+    spill file, which is required by the "spill" policy
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        target,
+        name: Optional[str] = None,
+        queue_size: int = 1000,
+        policy: str = "block",
+        spill_path: Optional[str | Path] = None,
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        if policy not in SINK_POLICIES:
+            raise ValueError(f'policy "{policy}" invalid')
+        if policy == "spill" and spill_path is None:
+            raise ValueError('the "spill" policy requires a spill_path')
+
+        self.name = name if name else type(target).__name__
+        self._target = target
+        self._policy = policy
+        self._queue = Queue(maxsize=queue_size)
+        self._lock = Lock()
+        self._closed = False
+
+        self._saved = 0
+        self._errors = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._last_error = None
+
+        # the records within the spill file which have not yet been read,
+        # which are saved before any record received after them
+        self._spill_path = None if spill_path is None else Path(spill_path)
+        self._spill_file = None
+        self._spill_offset = 0
+        self._backlog = 0
+        if self._spill_path is not None:
+            self._backlog = self._count_spilled()
+            if self._backlog:
+                self._logger.warning(
+                    f'{self._backlog} records remain within "{self._spill_path}"'
+                )
+
+        self._worker = Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of records which have been received, but not \
+        yet saved
+
+        :return: the number of records waiting to be saved
+        """
+        return self._queue.unfinished_tasks + self._backlog
+
+    @property
+    def statistics(self) -> dict:
+        """
+        Returns the counters of the sink: the number of records ``queued`` \
+        and waiting within the spill file (``spill_backlog``), along with \
+        the number of records ``saved``, ``dropped``, and ``spilled``, the \
+        number of ``errors`` raised by the target, and the ``last_error``
+
+        :return: a ``dict`` of counters
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "spill_backlog": self._backlog,
+            "saved": self._saved,
+            "dropped": self._dropped,
+            "spilled": self._spilled,
+            "errors": self._errors,
+            "last_error": None if self._last_error is None else str(self._last_error),
+        }
+
+    def put(self, record):
+        """
+        Places a record onto the queue of the sink, applying the policy \
+        when the queue is full.
+
+        :param record: a record created using ``freeze()``, or a ``dict`` \
+        in the same form supplied to ``ArchiveManager.save()``
+        :return: None
+        """
+        if self._closed:
+            self._logger.warning(f'"{self.name}" is closed, ignoring record')
+            return
+
+        if self._policy == "block":
+            if self._queue.full():
+                self._logger.warning(f'"{self.name}" queue is full, waiting')
+            self._queue.put(record)
+            return
+
+        with self._lock:
+            if not self._backlog:
+                try:
+                    self._queue.put_nowait(record)
+                    return
+                except Full:
+                    pass
+
+            if self._policy == "drop":
+                self._dropped += 1
+                self._logger.warning(
+                    f'"{self.name}" queue is full, dropped a record '
+                    f"({self._dropped} in total)"
+                )
+                return
+
+            try:
+                self._spill(record)
+            except Exception as e:
+                self._dropped += 1
+                self._logger.error(f'"{self.name}" unable to spill a record: {e}')
+
+    def _spill(self, record):
+        """
+        Appends a record to the spill file.  The caller must hold the lock.
+        """
+        if self._spill_file is None:
+            self._spill_file = open(self._spill_path, "ab")
+
+        if self._backlog == 0:
+            self._logger.warning(
+                f'"{self.name}" queue is full, spilling to "{self._spill_path}"'
+            )
+
+        data = pickle.dumps(thaw(record), protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_file.write(data)
+        self._spill_file.flush()
+
+        self._backlog += 1
+        self._spilled += 1
+
+    def _count_spilled(self) -> int:
+        """
+        Returns the number of records within a spill file left behind by \
+        a previous sink, removing a record which was partially written.
+        """
+        count = 0
+        end = 0
+        try:
+            with open(self._spill_path, "rb") as f:
+                while True:
+                    try:
+                        pickle.load(f)
+                    except EOFError:
+                        break
+                    except Exception as e:
+                        self._logger.warning(
+                            f'removing an unreadable record from "{self._spill_path}": {e}'
+                        )
+                        break
+                    count += 1
+                    end = f.tell()
+        except FileNotFoundError:
+            return 0
+
+        with open(self._spill_path, "r+b") as f:
+            f.truncate(end)
+
+        return count
+
+    def _unspill(self):
+        """
+        Reads the oldest record within the spill file, emptying the file \
+        once every record has been read.
+
+        :return: the data point, or ``None`` when it could not be read
+        """
+        try:
+            with open(self._spill_path, "rb") as f:
+                f.seek(self._spill_offset)
+                point = pickle.load(f)
+                offset = f.tell()
+        except Exception as e:
+            self._logger.error(
+                f'"{self.name}" unable to read "{self._spill_path}", '
+                f"discarding {self._backlog} records: {e}"
+            )
+            with self._lock:
+                self._errors += self._backlog
+                self._last_error = e
+                self._backlog = 0
+                self._empty_spill()
+            return None
+
+        with self._lock:
+            self._backlog -= 1
+            self._spill_offset = offset
+            if not self._backlog:
+                self._empty_spill()
+
+        return point
+
+    def _empty_spill(self):
+        """
+        Empties the spill file.  The caller must hold the lock.
+        """
+        if self._spill_file is None:
+            self._spill_file = open(self._spill_path, "ab")
+        self._spill_file.truncate(0)
+        self._spill_offset = 0
+
+    def _work(self):
+        """
+        Saves records until ``close()`` is called.
+        """
+        batch = getattr(self._target, "batch", None)
+
+        while True:
+            try:
+                records = [self._queue.get_nowait()]
+            except Empty:
+                # spilled records are only read once the queue is empty,
+                # since they were received after every queued record
+                if self._backlog:
+                    self._save(self._unspill())
+                    continue
+                records = [self._queue.get()]
+
+            while records[-1] is not _STOP:
+                try:
+                    records.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            if batch is not None and len(records) > 1:
+                with batch():
+                    stopping = self._save_all(records)
+            else:
+                stopping = self._save_all(records)
+
+            if stopping:
+                while self._backlog:
+                    self._save(self._unspill())
+                return
+
+    def _save_all(self, records: list) -> bool:
+        """
+        Saves records taken from the queue.
+
+        :return: True when ``close()`` has been called
+        """
+        for record in records:
+            if record is not _STOP:
+                self._save(record)
+            self._queue.task_done()
+        return records[-1] is _STOP
+
+    def _save(self, record):
+        if record is None:
+            return
+
+        try:
+            self._target.save(record)
+        except Exception as e:
+            self._errors += 1
+            self._last_error = e
+            self._logger.error(f'"{self.name}" unable to save a record: {e}')
+        else:
+            self._saved += 1
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Saves the records which are waiting, then closes the target.
+
+        :param timeout: the maximum time, in seconds, to wait for waiting \
+        records to be saved
+        :return: None
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except Full:
+            pass
+        self._worker.join(timeout)
+
+        if self._worker.is_alive():
+            self._logger.warning(
+                f'timed out while saving to "{self.name}", '
+                f"{self.pending} records were not saved"
+            )
+            return
+
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+            self._spill_file = None
+
+        close = getattr(self._target, "close", None)
+        if close is not None:
+            close()
+
+
+class ArchiveFanout:
+    """
+    Saves each execution of the test sequence to several sinks at once, \
+    such as a text file, an SQLite database, and a spool which is \
+    forwarded to a plant historian.  The fanout may be supplied as the \
+    ``archive_manager`` of a ``TestSequence``.
+
+    ``aggregate()`` builds a single read-only record of the execution \
+    which is shared by every sink.  Each sink saves the record from its \
+    own queue and worker thread, so a sink which is slow or failing only \
+    delays the test sequence when its policy is "block" and its queue is \
+    full.
+
+    .. code-block:: python
+
+        fanout = ArchiveFanout([
+            ArchiveManager(data_format=1, persistent=True),
+            ArchiveSink(ArchiveManager(data_format=2), policy='spill',
+                        spill_path='sqlite.spill'),
+        ])
+        TestSequence(sequence=[...], archive_manager=fanout)
+
+    :param sinks: instances of ``ArchiveSink``, or objects with a \
+    ``save(point)`` method, such as an ``ArchiveManager``, which are each \
+    wrapped within an ``ArchiveSink`` using the default policy
+    :param loglevel: the logging level
+    """
+
+    def __init__(self, sinks: Iterable, loglevel=logging.INFO):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self.sinks = []
+        names = set()
+        for sink in sinks:
+            if not isinstance(sink, ArchiveSink):
+                sink = ArchiveSink(sink, loglevel=loglevel)
+
+            # the statistics are keyed by name, so each name must be unique
+            name, count = sink.name, 1
+            while sink.name in names:
+                count += 1
+                sink.name = f"{name}-{count}"
+            names.add(sink.name)
+
+            self.sinks.append(sink)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of records waiting to be saved by all sinks
+
+        :return: the number of records
+        """
+        return sum(sink.pending for sink in self.sinks)
+
+    @property
+    def statistics(self) -> dict:
+        """
+        Returns the statistics of each sink; see ``ArchiveSink.statistics``
+
+        :return: a ``dict`` of statistics keyed by sink name
+        """
+        return {sink.name: sink.statistics for sink in self.sinks}
+
+    def aggregate(
+        self,
+        datetime: datetime,
+        is_passing: bool,
+        failed: list[str],
+        tests: list[Test],
+        timing: Optional[dict] = None,
+    ):
+        """
+        Collects one execution of the test sequence and passes it to \
+        every sink.  See ``ArchiveManager.aggregate()``.
+
+        :param datetime: the datetime that the test started
+        :param is_passing: True/False/None indicating if the test passed, \
+        failed, or was aborted
+        :param failed: a list of test monikers that failed
+        :param tests: a list of tests representing the test sequence
+        :param timing: additional columns containing the time, in \
+        nanoseconds, of each phase of the test sequence
+        :return: None
+        """
+        self.save(collect_point(datetime, is_passing, failed, tests, timing))
+
+    def save(self, point: dict):
+        """
+        Passes a data point to every sink.
+
+        :param point: a ``dict`` in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: None
+        """
+        record = freeze(point)
+        for sink in self.sinks:
+            sink.put(record)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Closes every sink, saving the records which are waiting.
+
+        :param timeout: the maximum time, in seconds, to wait for each sink
+        :return: None
+        """
+        for sink in self.sinks:
+            sink.close(timeout)
@@ -0,0 +1,233 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import logging
+from pathlib import Path
+from typing import Optional
+
+INDEX_SUFFIX = ".idx"
+
+
+def _index_text(value) -> str:
+    """
+    Converts a value into the text stored within the index.
+    """
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+class ArchiveIndex:
+    """
+    A sidecar index of a text data file, which maps the ``datetime`` and \
+    the values of the ``keys`` of each row to the offset, in bytes, at \
+    which the row begins.
+
+    The index is a tab-delimited file stored next to the data file as \
+    ``<fname>.idx``.  It contains a heading line followed by one line per \
+    row of data, so it is small in comparison to the data file and may \
+    always be rebuilt from the data file using ``rebuild()``.
+
+    :param path: a string or `Path` containing the path to the data file
+    :param keys: the headings of the values to index, such as a serial \
+    number saved using ``Test.save_dict()``
+    :param delimiter: the delimiter of the data file
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        keys: list[str],
+        delimiter: str = "\t",
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._data_path = Path(path)
+        self._path = self._data_path.with_name(self._data_path.name + INDEX_SUFFIX)
+        self._keys = list(keys)
+        self._delimiter = delimiter
+        self._heading = "\t".join(["offset", "datetime"] + self._keys) + "\n"
+
+        self._file = None
+        self._last_offset = None
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path to the index file
+
+        :return: the path
+        """
+        return self._path
+
+    def close(self):
+        """
+        Closes the index file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def open(self):
+        """
+        Opens the index for appending.  An index which is missing, \
+        which indexes different keys, or which is missing rows at the end \
+        of the data file is brought up to date, reading only the rows that \
+        have not yet been indexed.
+
+        :return: None
+        """
+        from mats.archiving.reader import ArchiveReader
+
+        self.close()
+        self._last_offset = None
+
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                if f.readline() == self._heading:
+                    self._last_offset = self._read_last_offset()
+                else:
+                    self._logger.info(f'"{self._path}" indexes different keys')
+                    raise FileNotFoundError
+        except FileNotFoundError:
+            with open(self._path, "w", encoding="utf-8") as f:
+                f.write(self._heading)
+
+        self._file = open(self._path, "a", encoding="utf-8")
+
+        reader = ArchiveReader(self._data_path, delimiter=self._delimiter)
+        records = reader.records(self._last_offset)
+        if self._last_offset is not None:
+            next(records, None)  # the last row indexed
+
+        count = 0
+        for offset, row in records:
+            self.append(offset, row)
+            count += 1
+
+        if count:
+            self._logger.info(f'added {count} rows to "{self._path}"')
+        self._file.flush()
+
+    def rebuild(self):
+        """
+        Discards the index and builds it again from the data file.
+
+        :return: None
+        """
+        self.close()
+        self._path.unlink(missing_ok=True)
+        self.open()
+        self.close()
+
+    def _read_last_offset(self) -> Optional[int]:
+        """
+        Returns the offset of the last complete line of the index, \
+        truncating a line left partially written.
+        """
+        with open(self._path, "rb+") as f:
+            size = f.seek(0, 2)
+            tail = b""
+            position = size
+            while position > 0 and tail.count(b"\n") < 2:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                tail = f.read(step) + tail
+
+            complete = tail.rfind(b"\n") + 1
+            if position + complete != size:
+                f.truncate(position + complete)
+
+            lines = tail[:complete].split(b"\n")
+            last = lines[-2] if len(lines) >= 2 else b""
+
+        field = last.split(b"\t")[0]
+        return int(field) if field.isdigit() else None
+
+    def append(self, offset: int, row: dict):
+        """
+        Adds one row of data to the index.
+
+        :param offset: the offset, in bytes, of the row within the data file
+        :param row: the row, in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: None
+        """
+        fields = [str(offset), _index_text(row.get("datetime", {}).get("value"))]
+        for key in self._keys:
+            fields.append(_index_text(row.get(key, {}).get("value")))
+
+        self._file.write("\t".join(fields) + "\n")
+        self._last_offset = offset
+
+    def flush(self):
+        """
+        Writes buffered index entries to the index file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.flush()
+
+    def offsets(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        keys: Optional[dict] = None,
+    ) -> list[int]:
+        """
+        Returns the offsets of the rows which match all of the supplied \
+        conditions.
+
+        :param start: when defined, rows must be at or after this datetime
+        :param end: when defined, rows must be at or before this datetime
+        :param keys: when defined, a ``dict`` of heading: value pairs that \
+        rows must match; values are compared as text
+        :return: a list of offsets in the order of the data file
+        """
+        keys = keys or {}
+        unknown = [key for key in keys if key not in self._keys]
+        if unknown:
+            raise KeyError(f"{unknown} are not indexed")
+
+        columns = [2 + self._keys.index(key) for key in keys]
+        targets = [_index_text(value) for value in keys.values()]
+
+        offsets, dts = [], []
+        with open(self._path, "r", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                fields = line.rstrip("\n").split("\t")
+                if all(fields[c] == t for c, t in zip(columns, targets)):
+                    offsets.append(int(fields[0]))
+                    dts.append(fields[1])
+
+        if start is None and end is None:
+            return offsets
+
+        parsed = []
+        for dt in dts:
+            try:
+                parsed.append(datetime.fromisoformat(dt))
+            except ValueError:
+                parsed.append(None)
+
+        if None not in parsed and parsed == sorted(parsed):
+            # rows are normally appended in time order, so the range may
+            # be found using a binary search
+            first = 0 if start is None else bisect_left(parsed, start)
+            last = len(parsed) if end is None else bisect_right(parsed, end)
+            return offsets[first:last]
+
+        return [
+            offset
+            for offset, dt in zip(offsets, parsed)
+            if dt is not None
+            and (start is None or dt >= start)
+            and (end is None or dt <= end)
+        ]
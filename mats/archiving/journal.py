@@ -0,0 +1,200 @@
+import logging
+from os import fsync
+from pathlib import Path
+from struct import Struct
+from zlib import crc32
+
+JOURNAL_SUFFIX = ".journal"
+
+# each entry begins with the offset within the data file and the length of
+# the payload, followed by a checksum of both along with the payload
+_HEAD = Struct("<QI")
+_CHECKSUM = Struct("<I")
+
+
+class Journal:
+    """
+    A write-ahead journal of the bytes appended to a data file.
+
+    Each entry records the offset at which the bytes are about to be \
+    written to the data file along with their length and a CRC-32 \
+    checksum, and is forced to disk before the data file is written.  Once \
+    the data file has been forced to disk, the journal is emptied using \
+    ``commit()``, so the journal only ever describes the tail of the data \
+    file.
+
+    After a crash, ``recover()`` compares each complete entry against the \
+    data file, writing the entries which did not reach the data file and \
+    removing any partially-written row.  An entry which was itself only \
+    partially written is discarded, since the data file was not yet \
+    modified.
+
+    :param path: a string or `Path` containing the path to the journal file
+    :param loglevel: the logging level
+    """
+
+    def __init__(self, path: str | Path, loglevel=logging.INFO):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._path = Path(path)
+        self._file = None
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path to the journal file
+
+        :return: the path
+        """
+        return self._path
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the size of the journal, in bytes
+
+        :return: the size
+        """
+        try:
+            return self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def close(self):
+        """
+        Closes the journal file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def append(self, offset: int, payload: bytes):
+        """
+        Records that ``payload`` is about to be written to the data file \
+        at ``offset``, forcing the entry to disk before returning.
+
+        :param offset: the offset, in bytes, within the data file
+        :param payload: the bytes which will be written
+        :return: None
+        """
+        if self._file is None:
+            self._file = open(self._path, "ab", buffering=0)
+
+        head = _HEAD.pack(offset, len(payload))
+        entry = head + _CHECKSUM.pack(crc32(payload, crc32(head))) + payload
+
+        data = memoryview(entry)
+        while data:
+            data = data[self._file.write(data) :]
+
+        # the entry must reach the disk before the data file is modified,
+        # otherwise a partial row could be left without an entry to repair it
+        fsync(self._file.fileno())
+
+    def commit(self):
+        """
+        Empties the journal.  The data file must already have been forced \
+        to disk.
+
+        :return: None
+        """
+        if self._file is None:
+            self._file = open(self._path, "ab", buffering=0)
+        self._file.truncate(0)
+
+    def entries(self) -> list[tuple[int, bytes]]:
+        """
+        Returns each complete entry of the journal.
+
+        :return: a list of ``(offset, payload)`` tuples
+        """
+        try:
+            with open(self._path, "rb") as f:
+                journal = f.read()
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        position = 0
+        while position + _HEAD.size + _CHECKSUM.size <= len(journal):
+            head = journal[position : position + _HEAD.size]
+            offset, length = _HEAD.unpack(head)
+            (checksum,) = _CHECKSUM.unpack_from(journal, position + _HEAD.size)
+
+            start = position + _HEAD.size + _CHECKSUM.size
+            payload = journal[start : start + length]
+            if len(payload) != length or crc32(payload, crc32(head)) != checksum:
+                break
+
+            entries.append((offset, payload))
+            position = start + length
+
+        if position != len(journal):
+            self._logger.warning(
+                f'discarding {len(journal) - position} bytes of a partial '
+                f'entry at the end of "{self._path}"'
+            )
+
+        return entries
+
+    def recover(self, data_path: str | Path) -> int:
+        """
+        Brings the data file into agreement with the journal, then empties \
+        the journal.
+
+        :param data_path: a string or `Path` containing the path to the \
+        data file
+        :return: the number of entries which were written to the data file
+        """
+        entries = self.entries()
+        if not entries:
+            if self.size:
+                self.commit()
+            return 0
+
+        data_path = Path(data_path)
+        if not data_path.exists():
+            if entries[0][0] != 0:
+                self._logger.error(
+                    f'"{data_path}" is missing, discarding "{self._path}"'
+                )
+                self.commit()
+                return 0
+            data_path.touch()
+
+        replayed = 0
+        with open(data_path, "r+b") as f:
+            end = None
+            for i, (offset, payload) in enumerate(entries):
+                size = f.seek(0, 2)
+                if offset > size:
+                    self._logger.error(
+                        f'"{data_path}" ends before offset {offset}, discarding '
+                        f"the remaining {len(entries) - i} entries"
+                    )
+                    break
+
+                f.seek(offset)
+                if f.read(len(payload)) != payload:
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(payload)
+                    replayed += 1
+                end = offset + len(payload)
+
+            # anything beyond the last entry is a partially-written row
+            if end is not None and f.seek(0, 2) > end:
+                self._logger.warning(f'removing a partial row from "{data_path}"')
+                f.truncate(end)
+
+            f.flush()
+            fsync(f.fileno())
+
+        if replayed:
+            self._logger.warning(f'recovered {replayed} rows into "{data_path}"')
+
+        self.commit()
+        return replayed
@@ -0,0 +1,116 @@
+import logging
+from pathlib import Path
+from time import sleep
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_SUFFIX = ".lock"
+
+
+class FileLock:
+    """
+    An advisory lock, held on a file, which excludes other processes that \
+    use the same lock file.  The lock is not re-entrant and does not \
+    exclude other threads of the same process, which must be excluded \
+    separately.
+
+    The lock file itself is never moved or removed, so it remains valid \
+    while the files which it protects are moved aside.
+
+    .. code-block:: python
+
+        with FileLock('data.txt.lock'):
+            ...
+
+    :param path: a string or `Path` containing the path to the lock file
+    :param loglevel: the logging level
+    """
+
+    def __init__(self, path: str | Path, loglevel=logging.INFO):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._path = Path(path)
+        self._file = None
+        self._held = False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path to the lock file
+
+        :return: the path
+        """
+        return self._path
+
+    @property
+    def held(self) -> bool:
+        """
+        Returns True while the lock is held
+
+        :return: True if held
+        """
+        return self._held
+
+    def acquire(self):
+        """
+        Waits until the lock is available, then takes it.
+
+        :return: None
+        """
+        if self._file is None:
+            self._file = open(self._path, "a+b")
+
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            self._held = True
+            return
+
+        # msvcrt only retries for about 10 seconds before giving up
+        self._file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                self._held = True
+                return
+            except OSError:
+                self._logger.debug(f'waiting on "{self._path}"')
+                sleep(0.01)
+
+    def release(self):
+        """
+        Releases the lock.
+
+        :return: None
+        """
+        if not self._held:
+            return
+
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._held = False
+
+    def close(self):
+        """
+        Releases the lock, if held, and closes the lock file.
+
+        :return: None
+        """
+        self.release()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
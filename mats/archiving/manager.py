@@ -0,0 +1,1095 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from hashlib import sha1
+from io import SEEK_END, FileIO
+from locale import getpreferredencoding
+import logging
+from os import fstat, fsync, linesep, remove, rename, stat
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Optional
+
+from mats.archiving.blobs import BLOBS_DIR, BlobStore, payload_size
+from mats.archiving.columnar import STRINGS_SUFFIX, ColumnarSchema, StringTable
+from mats.archiving.compression import Compressor
+from mats.archiving.index import INDEX_SUFFIX, ArchiveIndex
+from mats.archiving.journal import JOURNAL_SUFFIX, Journal
+from mats.archiving.locking import LOCK_SUFFIX, FileLock
+from mats.archiving.serializer import BLOCK_PREFIX, RowSerializer, criteria_block
+from mats.archiving.sqlite import SqliteArchive
+from mats.test import Test
+
+# the file name used when none is supplied, by data_format
+_DEFAULT_FNAMES = {2: "data.db", 3: "data.bin"}
+
+# the size of the journal, in bytes, at which the data file is forced to
+# disk so that the journal may be emptied
+_JOURNAL_BYTES = 1024 * 1024
+
+
+def collect_point(
+    datetime: datetime,
+    is_passing: bool,
+    failed: list[str],
+    tests: list[Test],
+    timing: Optional[dict] = None,
+) -> dict:
+    """
+    Returns a snapshot of one execution of the test sequence in the form \
+    supplied to ``ArchiveManager.save()``.  The ``failed`` list and the \
+    criteria are copied, so the snapshot is not affected by the next \
+    execution.
+
+    :param datetime: the datetime that the test started
+    :param is_passing: True/False/None indicating if the test passed, \
+    failed, or was aborted
+    :param failed: a list of test monikers that failed
+    :param tests: a list of tests representing the test sequence
+    :param timing: additional columns containing the time, in \
+    nanoseconds, of each phase of the test sequence
+    :return: the data point
+    """
+    test_data = {
+        "datetime": {"value": datetime},
+        "pass": {"value": is_passing},
+        "failed": {"value": failed.copy()},
+    }
+
+    for t in tests:
+        test_data[t.moniker] = {"value": t.value}
+        if t.criteria is not None:
+            test_data[t.moniker]["criteria"] = t.criteria.copy()
+        for k, v in t.saved_data.items():
+            test_data.setdefault(k, {})["value"] = v
+
+    for heading, duration in (timing or {}).items():
+        test_data[heading] = {"value": duration}
+
+    return test_data
+
+
+class ArchiveManager:
+    """
+    The default data manager that saves data in a text format which is very flexible, \
+    yet maintains simplicity and compatibility with analysis tools such as pandas.
+
+    :param path: a string or `Path` containing the path to the data file
+    :param fname: data file name; defaults to "data.txt", "data.db" for \
+    the SQLite format, or "data.bin" for the columnar format
+    :param delimiter: the data delimiter
+    :param data_format: an integer that determines which data format; \
+    0 and 1 are text formats, 2 is an SQLite database, 3 is a \
+    columnar binary format, and 4 is data format 1 with the criteria \
+    written as a block above the rows, only when they change
+    :param preamble: a string that may be appended to the beginning of a data file
+    :param persistent: when True, a single append handle is kept open for the \
+    life of the manager and the header on disk is only re-checked when the \
+    header changes; call ``close()`` or use the manager as a context manager \
+    to release the handle
+    :param shared: when True, several processes may save to the same text \
+    data file at once; each row is written using a single append while \
+    holding an advisory lock on ``<fname>.lock``, and a file which another \
+    process has moved aside is detected and re-opened
+    :param journal: when True, each row is recorded within a write-ahead \
+    journal, ``<fname>.journal``, before it is written to the data file; \
+    when the manager is created, rows which did not reach the data file \
+    are written and partially-written rows are removed
+    :param asynchronous: when True, ``aggregate()`` places a snapshot of the \
+    row onto a bounded queue and returns immediately; a background thread \
+    writes queued rows in batches
+    :param queue_size: the maximum number of rows waiting to be written when \
+    ``asynchronous``; ``aggregate()`` blocks while the queue is full
+    :param fsync_rows: when defined, data is forced to disk after this many \
+    rows have been written; ``1`` forces every row to disk
+    :param fsync_interval: when defined, data is forced to disk when this \
+    many seconds have passed since the last time data was forced to disk
+    :param rotate_bytes: when defined, the data file is moved aside once it \
+    reaches this size, in bytes
+    :param rotate_rows: when defined, the data file is moved aside once it \
+    contains this many rows
+    :param rotate_daily: when True, the data file is moved aside on the \
+    first save of each day
+    :param compression: when defined, files which have been moved aside \
+    are compressed on a background thread using "gzip" or "lzma"
+    :param index_keys: when defined, a sidecar index of the text formats is \
+    maintained which maps the datetime and the values of these headings, \
+    such as a serial number saved using ``Test.save_dict()``, to the \
+    location of each row; an empty list indexes only the datetime
+    :param blob_bytes: when defined, values which are ``bytes``, \
+    ``bytearray``, ``memoryview``, or NumPy arrays, and which are at least \
+    this many bytes, are saved once within the content-addressed \
+    ``BlobStore`` at ``<path>/blobs`` and the row contains a reference
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ".",
+        fname: Optional[str] = None,
+        delimiter: str = "\t",
+        data_format: int = 0,
+        preamble: Optional[str] = None,
+        persistent: bool = False,
+        shared: bool = False,
+        journal: bool = False,
+        asynchronous: bool = False,
+        queue_size: int = 1000,
+        fsync_rows: Optional[int] = None,
+        fsync_interval: Optional[float] = None,
+        rotate_bytes: Optional[int] = None,
+        rotate_rows: Optional[int] = None,
+        rotate_daily: bool = False,
+        compression: Optional[str] = None,
+        index_keys: Optional[list[str]] = None,
+        blob_bytes: Optional[int] = None,
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._fname = fname if fname else _DEFAULT_FNAMES.get(data_format, "data.txt")
+        self._path = Path(path)
+        self._delimiter = delimiter
+        self._format = data_format
+        self._preamble = preamble
+        self._persistent = persistent
+
+        if shared and data_format == 3:
+            raise ValueError("data_format 3 may not be shared")
+        self._shared = shared
+        self._file_lock = None
+        self._encoding = getpreferredencoding(False)
+
+        self._fsync_rows = fsync_rows
+        self._fsync_interval = fsync_interval
+
+        self._rotate_bytes = rotate_bytes
+        self._rotate_rows = rotate_rows
+        self._rotate_daily = rotate_daily
+        self._compressor = (
+            Compressor(compression, loglevel=loglevel) if compression else None
+        )
+
+        # size, row count, and day of the current data file, which
+        # are measured when the file is first opened
+        self._file_bytes = None
+        self._file_rows = None
+        self._file_day = None
+
+        self._lock = Lock()
+        self._file = None
+        self._header = None
+        self._header_hash = None
+        self._serializer = None
+        self._file_criteria = None
+        self._database = None
+        self._schema = None
+        self._strings = None
+        self._index_keys = index_keys
+        self._index = None
+        self._blob_bytes = blob_bytes
+        self._blobs = (
+            BlobStore(self._path / BLOBS_DIR, loglevel=loglevel)
+            if blob_bytes is not None
+            else None
+        )
+        self._batching = False
+        self._unsynced_rows = 0
+        self._last_sync = monotonic()
+
+        self._asynchronous = asynchronous
+        self._queue = Queue(maxsize=queue_size)
+        self._flusher = None
+
+        if journal and data_format == 2:
+            raise ValueError("data_format 2 maintains its own journal")
+        self._journal = None
+        if journal:
+            self._journal = Journal(
+                self._path / (self._fname + JOURNAL_SUFFIX), loglevel=loglevel
+            )
+            self._recover()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of rows which have been aggregated, but not \
+        yet written, when the manager is ``asynchronous``
+
+        :return: the number of rows waiting to be written
+        """
+        return self._queue.unfinished_tasks
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Writes any queued rows and releases any file handle held by the \
+        manager.  Safe to call more than once; a later ``save()`` will \
+        simply re-open the data file.
+
+        :param timeout: the maximum time, in seconds, to wait for queued \
+        rows to be written
+        :return: None
+        """
+        if self._flusher is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except Full:
+                pass
+            self._flusher.join(timeout)
+
+            if self._flusher.is_alive():
+                self._logger.warning(
+                    f"timed out while writing queued data, "
+                    f"{self.pending} rows were not written"
+                )
+            self._flusher = None
+
+        with self._lock:
+            if self._unsynced_rows and (
+                self._fsync_rows or self._fsync_interval or self._journal
+            ):
+                self._sync()
+            self._close_file()
+            self._close_companions()
+
+            if self._journal is not None:
+                self._journal.close()
+
+            if self._file_lock is not None:
+                self._file_lock.close()
+            self._file_lock = None
+
+            if self._database is not None:
+                self._database.close()
+            self._database = None
+
+        if self._compressor is not None:
+            self._compressor.join(timeout)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._logger.debug(f'closing "{self._file.name}"')
+            self._file.close()
+        self._file = None
+        self._header = None
+        self._header_hash = None
+        self._file_criteria = None
+
+    def aggregate(
+        self,
+        datetime: datetime,
+        is_passing: bool,
+        failed: list[str],
+        tests: list[Test],
+        timing: Optional[dict] = None,
+    ):
+        """
+        Collects data set from provided information and from the tests \
+        and organizes the data into a dict in preparation for saving \
+        a row of data.
+
+        :param datetime: the datetime that the test started
+        :param is_passing: True/False/None indicating if the test passed, \
+        failed, or was aborted
+        :param failed: a list of test monikers that failed
+        :param tests: a list of tests representing the test sequence
+        :param timing: additional columns containing the time, in \
+        nanoseconds, of each phase of the test sequence
+        :return:
+        """
+        test_data = collect_point(datetime, is_passing, failed, tests, timing)
+
+        if not self._asynchronous:
+            self.save(test_data)
+            return
+
+        if self._flusher is None:
+            self._flusher = Thread(target=self._flush_queue, daemon=True)
+            self._flusher.start()
+
+        if self._queue.full():
+            self._logger.warning("archive queue is full, waiting to write data")
+        self._queue.put(test_data)
+
+    def _flush_queue(self):
+        """
+        Writes queued rows in batches until ``close()`` is called.
+        """
+        while True:
+            try:
+                point = self._queue.get(timeout=self._fsync_interval)
+            except Empty:
+                # idle, but data written at the end of the last batch
+                # may still be waiting on the time-based policy
+                with self._lock:
+                    if self._unsynced_rows:
+                        self._sync()
+                continue
+
+            batch = [point]
+            while point is not None:
+                try:
+                    point = self._queue.get_nowait()
+                    batch.append(point)
+                except Empty:
+                    break
+
+            with self.batch():
+                for point in batch:
+                    if point is None:
+                        continue
+                    try:
+                        self.save(point)
+                    except Exception as e:
+                        self._logger.error(f"unable to save queued data: {e}")
+
+            for _ in batch:
+                self._queue.task_done()
+
+            if batch[-1] is None:
+                return
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers flushing the data file, the index, and the SQLite \
+        transaction until the end of the ``with`` block, so that several \
+        rows saved from one thread are written together.
+
+        .. code-block:: python
+
+            with am.batch():
+                for point in points:
+                    am.save(point)
+
+        :return: a context manager
+        """
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+
+            with self._lock:
+                if self._file is not None:
+                    self._file.flush()
+                if self._database is not None:
+                    self._database.commit()
+                if self._index is not None:
+                    self._index.flush()
+
+    def save(self, point: dict):
+        """
+        Data save function
+
+        Takes a point of data supplied as a dict and, depending on existing
+        conditions, will archive the data point on the disk.  Each ``point``
+        represents a single row of data representing the execution of a
+        single instance of the test execution.  Each key of the ``dict`` has
+        will represent the parameter being measured.
+
+        Three conditions possible at save time:
+
+         * Data file does not exist
+         * Data file exists and is compatible with the current data point \
+         (the headings and header strings match)
+         * Data file exists, but is not compatible with the current data \
+         point (the heading and header strings do not match)
+
+        When the data file does not exist, then the ``save()`` method will
+        create the new data file at ``<fname>.<extension>``.
+
+        When the data file exists at ``<fname>.<extension>`` and is compatible
+        with the current data point, then the ``save()`` method will simply
+        append the new data point to previous data in a tabular data_format.
+
+        Finally, when the current data point is deemed incompatible with the
+        previous data, then the ``save()`` method will rename the old file to
+        ``<fname>_<date>.<extension>`` and then create a new file at
+        ``<fname>.<extension>`` under which data will be collected until a new
+        data_format is once again detected.  The same occurs when the
+        ``rotate_bytes``, ``rotate_rows``, or ``rotate_daily`` limits are
+        reached.
+
+        :param point: a ``dict`` containing key: value pairs which specify \
+        the data to be saved in {'heading': {'value': value}}; the inner \
+        dictionary may also contain a ``dict`` called ``criteria`` which \
+        will contain the ``pass_if``, ``min``, or ``max`` values allowed
+        :return: None
+        """
+        if self._blobs is not None:
+            point = self._store_blobs(point)
+
+        if self._format == 0:
+            self._save_fmt0(point)
+        elif self._format == 1:
+            self._save_fmt1(point)
+        elif self._format == 2:
+            self._save_sqlite(point)
+        elif self._format == 3:
+            self._save_columnar(point)
+        elif self._format == 4:
+            self._save_fmt4(point)
+        else:
+            raise ValueError(f'data_format "{self._format}" invalid')
+
+    def _store_blobs(self, point: dict) -> dict:
+        """
+        Moves large values into the ``BlobStore``.
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        :return: the point, with each large value replaced by a reference
+        """
+        stored = None
+        for heading, entry in point.items():
+            value = entry.get("value")
+            size = payload_size(value)
+            if size is None or size < self._blob_bytes:
+                continue
+
+            if stored is None:
+                stored = dict(point)
+            stored[heading] = {**entry, "value": self._blobs.put(value)}
+
+        return point if stored is None else stored
+
+    def _save_fmt0(self, point: dict):
+        """
+        Saves data with pass/fail criteria embedded into each header according
+        to "data_format 0"
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        """
+        serializer = self._serializer_for(point)
+        self._save_file(serializer.header, serializer.serialize(point), point)
+
+    def _save_fmt1(self, point: dict):
+        """
+        Saves data with pass/fail criteria embedded into each header according
+        to "data_format 1"
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        """
+        serializer = self._serializer_for(point)
+        self._save_file(serializer.header, serializer.serialize(point), point)
+
+    def _save_fmt4(self, point: dict):
+        """
+        Saves data according to "data_format 4", which writes the rows of \
+        "data_format 1" without their criteria.  The criteria are written \
+        as a block above the first row of the file and above each row \
+        whose criteria differ from those of the previous block.
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        """
+        serializer = self._serializer_for(point)
+
+        # copied, since the caller may modify the criteria in place
+        criteria = {
+            heading: dict(entry["criteria"])
+            for heading, entry in point.items()
+            if entry.get("criteria") is not None
+        }
+        self._save_file(serializer.header, serializer.serialize(point), point, criteria)
+
+    def _serializer_for(self, point: dict) -> RowSerializer:
+        """
+        Returns the serializer of the current headings and criteria, \
+        which is only compiled again when the test sequence changes.
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        :return: the serializer
+        """
+        serializer = self._serializer
+        if serializer is None or not serializer.matches(point):
+            serializer = RowSerializer(
+                point,
+                data_format=self._format,
+                delimiter=self._delimiter,
+                preamble=self._preamble,
+            )
+            self._serializer = serializer
+        return serializer
+
+    def _save_sqlite(self, point: dict):
+        """
+        Saves data into an SQLite database according to "data_format 2"
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        """
+        with self._lock:
+            if self._database is None:
+                self._database = SqliteArchive(
+                    self._path / self._fname,
+                    preamble=self._preamble,
+                    synchronous="FULL" if self._fsync_rows == 1 else "NORMAL",
+                    loglevel=self._logger.level,
+                )
+
+            self._logger.info(f'inserting data into "{self._fname}"')
+            self._database.insert(point)
+            if not self._batching:
+                self._database.commit()
+
+    def _save_columnar(self, point: dict):
+        """
+        Saves data as fixed-width binary records according to \
+        "data_format 3"
+
+        :param point: a dict containing the name, value, and pass/fail \
+        criteria.
+        """
+        with self._lock:
+            if self._schema is None or not self._schema.fits(point):
+                self._schema = ColumnarSchema(point, preamble=self._preamble)
+
+            f = self._open_data_file(self._schema.header)
+            if self._strings is None:
+                destination_path = self._path / self._fname
+                self._strings = StringTable(
+                    destination_path.with_name(destination_path.name + STRINGS_SUFFIX)
+                )
+
+            self._logger.info(f'appending record to "{self._fname}"')
+            self._write_row(f, self._schema.pack(point, self._strings))
+            self._finish_row(f)
+
+    def _save_file(
+        self,
+        header_string: str,
+        data_string: str,
+        point: Optional[dict] = None,
+        criteria: Optional[dict] = None,
+    ):
+        """
+        Saves a new file if header has changed or appends to the old file.
+
+        :param header_string: the string containing the header
+        :param data_string: the string containing the data
+        :param point: the data point, which is required to maintain the index
+        :param criteria: the criteria of the row, when they are written as \
+        a block rather than within the row
+        """
+        with self._lock:
+            if self._shared:
+                self._acquire_file_lock()
+
+            try:
+                self._append_row(header_string, data_string, point, criteria)
+            finally:
+                if self._shared:
+                    self._file_lock.release()
+
+    def _acquire_file_lock(self):
+        """
+        Takes the lock which excludes other processes from the shared \
+        data file.
+        """
+        if self._file_lock is None:
+            self._file_lock = FileLock(
+                self._path / (self._fname + LOCK_SUFFIX), loglevel=self._logger.level
+            )
+        self._file_lock.acquire()
+
+    def _append_row(
+        self,
+        header_string: str,
+        data_string: str,
+        point: dict,
+        criteria: Optional[dict] = None,
+    ):
+        f = self._open_data_file(header_string)
+
+        # the block is written along with the row, so that a row is never
+        # separated from its criteria
+        block = ""
+        if criteria is not None and criteria != self._file_criteria:
+            block = criteria_block(criteria, self._delimiter)
+            self._file_criteria = criteria
+
+        if self._index_keys is not None and point is not None:
+            if self._index is None:
+                self._index = ArchiveIndex(
+                    self._path / self._fname,
+                    keys=self._index_keys,
+                    delimiter=self._delimiter,
+                    loglevel=self._logger.level,
+                )
+                self._index.open()
+            offset = f.tell() + len(self._encode(block))
+
+        # the row is only stripped and formatted when it will be logged
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info('appending data: "%s"', data_string.strip())
+        self._write_row(f, block + data_string)
+
+        if self._index is not None and point is not None:
+            self._index.append(offset, point)
+            if self._shared or not self._batching:
+                self._index.flush()
+
+        self._finish_row(f)
+
+    def _write_row(self, f, data: str | bytes):
+        """
+        Writes one row to a file object acquired from \
+        ``_open_data_file()``, recording it within the journal first.
+
+        :param f: the file object
+        :param data: the row
+        """
+        if self._journal is None and not self._shared:
+            f.write(data)
+            return
+
+        payload = self._encode(data)
+        if self._journal is not None:
+            self._journal.append(f.tell(), payload)
+
+        if self._shared:
+            # a single write of the entire row, which the file's append
+            # mode places at the end of the file
+            payload = memoryview(payload)
+            while payload:
+                payload = payload[f.write(payload) :]
+        else:
+            f.write(data)
+
+    def _encode(self, data: str | bytes) -> bytes:
+        """
+        Returns the bytes which a text-mode file writes for ``data``.
+
+        :param data: the text; ``bytes`` are returned unchanged
+        :return: the bytes
+        """
+        if isinstance(data, bytes):
+            return data
+        if linesep != "\n":
+            data = data.replace("\n", linesep)
+        return data.encode(self._encoding)
+
+    def _recover(self):
+        """
+        Applies the journal left behind by a previous manager and removes \
+        a partially-written row from the end of a text data file.  Only \
+        the tail of the data file is examined.
+        """
+        if self._shared:
+            self._acquire_file_lock()
+
+        try:
+            destination_path = self._path / self._fname
+            self._journal.recover(destination_path)
+            if self._format in (0, 1, 4):
+                self._repair_tail(destination_path)
+        finally:
+            if self._shared:
+                self._file_lock.release()
+
+    def _repair_tail(self, destination_path: Path):
+        """
+        Truncates a text data file after its last complete line.
+
+        :param destination_path: the path to the data file
+        """
+        try:
+            f = open(destination_path, "r+b")
+        except FileNotFoundError:
+            return
+
+        with f:
+            size = f.seek(0, SEEK_END)
+            f.seek(max(size - 1, 0))
+            if f.read(1) in (b"\n", b""):
+                return
+
+            end = 0
+            position = size
+            while position > 0:
+                step = min(64 * 1024, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    end = position + newline + 1
+                    break
+
+            self._logger.warning(
+                f'removing {size - end} bytes of a partial row from "{destination_path}"'
+            )
+            f.truncate(end)
+            f.flush()
+            fsync(f.fileno())
+
+        if end == 0:
+            remove(destination_path)
+
+    def _open_data_file(self, header: str | bytes):
+        """
+        Returns a file object, opened for appending, of a data file which \
+        begins with ``header``.  Binary files are opened when ``header`` \
+        is ``bytes``.
+
+        When the manager is ``persistent``, the append handle is retained \
+        between calls and the header is fingerprinted so that the file on \
+        disk is only examined when the header actually changes.
+
+        :param header: the header of the data file
+        :return: the file object
+        """
+        mode = "ab" if isinstance(header, bytes) else "a"
+
+        if self._shared:
+            return self._open_shared_file(header)
+
+        if not self._persistent:
+            self._prepare_file(header)
+            return open(self._path / self._fname, mode)
+
+        # serializers and schemas reuse the same header object, so the
+        # header only needs to be fingerprinted when a new one is supplied
+        if header is self._header:
+            header_hash = self._header_hash
+        else:
+            header_hash = sha1(
+                header if isinstance(header, bytes) else header.encode()
+            ).digest()
+
+        if (
+            self._file is None
+            or header_hash != self._header_hash
+            or self._rotation_due()
+        ):
+            self._close_file()
+            self._prepare_file(header)
+            self._file = open(self._path / self._fname, mode)
+
+        self._header = header
+        self._header_hash = header_hash
+
+        return self._file
+
+    def _open_shared_file(self, header: str) -> FileIO:
+        """
+        Returns an unbuffered file object, opened for appending, of a data \
+        file which begins with ``header`` and which may also be written by \
+        other processes.  The caller must hold the file lock.
+
+        :param header: the header of the data file
+        :return: the file object
+        """
+        destination_path = self._path / self._fname
+
+        if self._file is not None:
+            try:
+                moved = stat(destination_path).st_ino != fstat(self._file.fileno()).st_ino
+            except FileNotFoundError:
+                moved = True
+
+            if moved:
+                self._logger.info(f'"{destination_path}" was moved by another process')
+                self._close_file()
+                self._close_companions()
+            else:
+                self._measure_appended()
+
+        if self._file is None or header is not self._header or self._rotation_due():
+            self._close_file()
+
+            # other processes may have written to the file since it was measured
+            self._file_rows = None
+            self._prepare_file(header)
+
+            self._file = open(destination_path, "ab", buffering=0)
+            self._header = header
+
+        self._file.seek(0, SEEK_END)
+        return self._file
+
+    def _measure_appended(self):
+        """
+        Accounts for rows appended to the shared data file by other \
+        processes since this process last wrote to it.
+        """
+        size = fstat(self._file.fileno()).st_size
+        if self._file_bytes is None or size == self._file_bytes:
+            return
+
+        # the other processes may have written different criteria
+        self._file_criteria = None
+
+        if self._rotate_rows is not None and self._file_rows is not None:
+            with open(self._path / self._fname, "rb") as f:
+                f.seek(self._file_bytes)
+                self._file_rows += f.read(size - self._file_bytes).count(b"\n")
+
+        self._file_bytes = size
+
+    def _finish_row(self, f):
+        """
+        Completes the writing of a row to a file object acquired from \
+        ``_open_data_file()``.
+
+        :param f: the file object to which the row was written
+        """
+        self._count_row(f)
+
+        if self._file_rows is not None:
+            self._file_rows += 1
+            self._file_bytes = f.tell()
+
+        if f is not self._file:
+            f.close()
+        elif not self._batching:
+            f.flush()
+
+    def _count_row(self, f):
+        """
+        Applies the ``fsync_rows`` and ``fsync_interval`` policies after \
+        a row has been written to ``f``.
+
+        :param f: the file object to which the row was written
+        """
+        self._unsynced_rows += 1
+
+        if self._fsync_rows is not None and self._unsynced_rows >= self._fsync_rows:
+            self._sync(f)
+        elif (
+            self._fsync_interval is not None
+            and monotonic() - self._last_sync >= self._fsync_interval
+        ):
+            self._sync(f)
+        elif self._journal is not None and self._journal.size >= _JOURNAL_BYTES:
+            # keeps the journal, and so the time taken to recover, small
+            self._sync(f)
+
+    def _sync(self, f=None):
+        """
+        Forces written data to disk.
+
+        :param f: the file object to synchronize; when not supplied, the \
+        data file is opened in order to synchronize it
+        """
+        if f is None and self._file is not None:
+            f = self._file
+
+        if f is not None:
+            f.flush()
+            fsync(f.fileno())
+        else:
+            try:
+                with open(self._path / self._fname, "a") as f:
+                    fsync(f.fileno())
+            except OSError as e:
+                self._logger.warning(f"unable to synchronize data: {e}")
+
+        # other processes may be writing to the journal of a shared file
+        if self._journal is not None and (
+            not self._shared or (self._file_lock is not None and self._file_lock.held)
+        ):
+            self._journal.commit()
+
+        self._unsynced_rows = 0
+        self._last_sync = monotonic()
+
+    def _prepare_file(self, header_string: str | bytes):
+        """
+        Ensures that the data file exists and begins with ``header_string``, \
+        moving any incompatible file out of the way.
+
+        :param header_string: the string containing the header; binary \
+        files are examined and created when supplied as ``bytes``
+        """
+        destination_path = self._path / self._fname
+        binary = "b" if isinstance(header_string, bytes) else ""
+
+        # check for the header string
+        header_changed = False
+        try:
+            # if the header strings do not match, then set the
+            # 'create_new_file' flag
+            with open(destination_path, "r" + binary) as f:
+                len_new_header_string = len(header_string)
+                old_header_string = f.read(len_new_header_string)
+
+                if old_header_string != header_string:
+                    self._logger.info("header strings do not match")
+                    header_changed = True
+        except FileNotFoundError:
+            # if the file is not found, then create a new file
+            self._logger.info(f'file "{destination_path}" not found...')
+
+        if header_changed or not destination_path.exists():
+            self._close_companions()
+
+        if not header_changed and destination_path.exists():
+            if self._file_rows is None:
+                self._measure_file(header_string)
+            if self._rotation_due():
+                header_changed = True
+
+        if header_changed:
+            self._rotate()
+
+        # write the header string
+        if not destination_path.exists():
+            self._logger.info(
+                f'"{destination_path}" does not exist, creating' f" with new heading"
+            )
+            # companion files left behind do not describe the new file
+            for suffix in self._companion_suffixes():
+                companion = destination_path.with_name(destination_path.name + suffix)
+                if companion.exists():
+                    remove(companion)
+
+            if self._journal is not None:
+                self._journal.append(0, self._encode(header_string))
+
+            with open(destination_path, "w" + binary) as f:
+                f.write(header_string)
+
+            self._file_bytes = len(header_string)
+            self._file_rows = 0
+            self._file_day = date.today()
+            self._file_criteria = None
+
+    def _measure_file(self, header_string: str | bytes):
+        """
+        Determines the size, row count, and day of an existing data file \
+        which begins with ``header_string``.  The file is only read when \
+        a row count of a text file is required by ``rotate_rows``.
+
+        :param header_string: the header of the data file
+        """
+        destination_path = self._path / self._fname
+        stat = destination_path.stat()
+
+        self._file_bytes = stat.st_size
+        self._file_day = date.fromtimestamp(stat.st_mtime)
+
+        if self._rotate_rows is None:
+            self._file_rows = 0
+        elif isinstance(header_string, bytes):
+            self._file_rows = (stat.st_size - len(header_string)) // self._schema.size
+        else:
+            # the criteria blocks of data format 4 are not rows
+            marker = f"\n{BLOCK_PREFIX}{self._delimiter}".encode(self._encoding)
+            lines = blocks = 0
+            tail = b""
+            with open(destination_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    lines += chunk.count(b"\n")
+                    if self._format == 4:
+                        blocks += (tail + chunk).count(marker)
+                        tail = chunk[1 - len(marker) :]
+            self._file_rows = lines - blocks - header_string.count("\n")
+
+    def _rotation_due(self) -> bool:
+        """
+        Returns True when the current data file must be moved aside \
+        according to ``rotate_bytes``, ``rotate_rows``, or ``rotate_daily``.
+
+        :return: True if the data file is due to be moved aside
+        """
+        if self._file_rows is None:
+            return False
+        if self._rotate_bytes is not None and self._file_bytes >= self._rotate_bytes:
+            return True
+        if self._rotate_rows is not None and self._file_rows >= self._rotate_rows:
+            return True
+        if self._rotate_daily and self._file_day != date.today():
+            return True
+        return False
+
+    def _rotate(self):
+        """
+        Moves the data file, along with its companion files, aside to \
+        ``<fname>_<date>.<extension>``.  Each file is renamed rather than \
+        copied, so the time taken does not depend on the size of the file.
+        """
+        destination_path = self._path / self._fname
+        self._close_companions()
+
+        # the journal only describes the current data file
+        if self._journal is not None:
+            self._sync()
+
+        # rename the old file using ISO8601 timestamp, adding a counter
+        # when more than one file is moved aside within the same second
+        now = datetime.now().strftime("%Y-%m-%dT%H%M%S")
+        parts = self._fname.split(".")
+        stem = f"{parts[0]}_{now}"
+        count = 0
+        while True:
+            parts[0] = stem if not count else f"{stem}-{count}"
+            new_path = self._path / ".".join(parts)
+            if not any(p.exists() for p in self._rotated_paths(new_path)):
+                break
+            count += 1
+
+        self._logger.info(f'moving "{destination_path}" to "{new_path}"...')
+        rename(destination_path, new_path)
+
+        for suffix in self._companion_suffixes():
+            companion = destination_path.with_name(destination_path.name + suffix)
+            if companion.exists():
+                rename(companion, new_path.with_name(new_path.name + suffix))
+
+        self._file_bytes = None
+        self._file_rows = None
+        self._file_day = None
+
+        if self._compressor is not None:
+            self._compressor.submit(new_path)
+
+    def _rotated_paths(self, path: Path) -> list[Path]:
+        """
+        Returns every path that a file moved aside to ``path`` may occupy, \
+        including its companions and its compressed form.
+
+        :param path: the path of the file which has been moved aside
+        :return: a list of paths
+        """
+        paths = [path]
+        for suffix in [".gz", ".xz"] + self._companion_suffixes():
+            paths.append(path.with_name(path.name + suffix))
+        return paths
+
+    def _companion_suffixes(self) -> list[str]:
+        """
+        Returns the suffixes of the files which accompany the data file \
+        and which must move along with it.
+
+        :return: a list of suffixes appended to the data file name
+        """
+        if self._format == 3:
+            return [STRINGS_SUFFIX]
+        if self._index_keys is not None:
+            return [INDEX_SUFFIX]
+        return []
+
+    def _close_companions(self):
+        """
+        Releases the handles to companion files so that they may be moved.
+        """
+        if self._strings is not None:
+            self._strings.close()
+        self._strings = None
+
+        if self._index is not None:
+            self._index.close()
+        self._index = None
@@ -0,0 +1,468 @@
+from ast import literal_eval
+from datetime import datetime
+import json
+import logging
+from pathlib import Path
+import re
+from typing import Iterator, Optional
+
+from mats.archiving.blobs import BLOB_PREFIX, BLOBS_DIR, BlobRef, BlobStore
+from mats.archiving.serializer import BLOCK_PREFIX
+
+# suffixes of the data format 1 headings which contain criteria
+_CRITERIA_SUFFIXES = ((" =", "pass_if"), (" >=", "min"), (" <=", "max"))
+
+# separates the criteria within a data format 0 criteria line
+_CRITERIA_SPLIT = re.compile(r",(?=(?:pass_if|min|max)=)")
+_CRITERIA_LINE = re.compile(r"^(.*?):((?:pass_if|min|max)=.*)$")
+
+_CONSTANTS = {"True": True, "False": False, "None": None}
+
+
+def parse_value(text: str):
+    """
+    Converts text written by the ``ArchiveManager`` back into a value.
+
+    :param text: the text of a single value
+    :return: a ``bool``, ``None``, ``int``, ``float``, a ``list`` for \
+    arrays, or the original text
+    """
+    if text in _CONSTANTS:
+        return _CONSTANTS[text]
+    if "_" in text or text != text.strip():
+        return text
+
+    # arrays are written as compact JSON, which contains no spaces
+    if text[:1] == "[" and text[-1:] == "]" and " " not in text:
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    try:
+        return int(text)
+    except ValueError:
+        pass
+
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_failed(text: str) -> list[str]:
+    """
+    Converts the text of the ``failed`` column back into a list.  Data \
+    format 0 writes the list itself, while data format 1 joins the \
+    monikers using semicolons.
+
+    :param text: the text of the ``failed`` column
+    :return: a list of the monikers which failed
+    """
+    if text.startswith("[") and text.endswith("]"):
+        try:
+            return list(literal_eval(text))
+        except (SyntaxError, ValueError):
+            pass
+    return text.split(";") if text else []
+
+
+def parse_criteria(text: str) -> dict:
+    """
+    Converts the criteria portion of a data format 0 criteria line, such \
+    as ``min=5.6,max=6.4``, into a ``dict``.
+
+    :param text: the criteria text
+    :return: the criteria
+    """
+    criteria = {}
+    for fragment in _CRITERIA_SPLIT.split(text):
+        key, _, value = fragment.partition("=")
+        criteria[key] = parse_value(value)
+    return criteria
+
+
+class ArchiveReader:
+    """
+    Reads the text files written by ``ArchiveManager`` using data format \
+    0, 1, or 4.
+
+    The header is parsed when the reader is created.  Iterating over the \
+    reader yields one ``dict`` per row in the same form that is supplied \
+    to ``ArchiveManager.save()``, with the values converted back into \
+    their types and the criteria attached.  The criteria blocks of data \
+    format 4 are not yielded; instead, each row carries the criteria of \
+    the block above it.  The file is read in chunks \
+    of ``chunk_size`` bytes, so the memory used does not depend on the \
+    size of the file.
+
+    The format is determined from the header.  A file which begins with \
+    a heading line containing the delimiter is assumed not to have a \
+    preamble, so a preamble must not contain the delimiter.
+
+    .. code-block:: python
+
+        for row in ArchiveReader('data.txt'):
+            print(row['pump flow test']['value'])
+
+    :param path: a string or `Path` containing the path to the data file
+    :param delimiter: the data delimiter
+    :param chunk_size: the number of bytes read from the file at a time
+    :param encoding: the text encoding of the file
+    :param blob_path: the path to the ``BlobStore`` which contains the \
+    large values referred to by the file; defaults to ``blobs`` next to \
+    the file.  References are returned as a ``BlobRef``, which maps the \
+    value into memory using ``load()``
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        delimiter: str = "\t",
+        chunk_size: int = 1024 * 1024,
+        encoding: str = "utf-8",
+        blob_path: Optional[str | Path] = None,
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._path = Path(path)
+        self._delimiter = delimiter
+        self._chunk_size = chunk_size
+        self._encoding = encoding
+        self._blobs = BlobStore(
+            self._path.parent / BLOBS_DIR if blob_path is None else blob_path,
+            loglevel=loglevel,
+        )
+
+        self.preamble = None
+        self.data_format = None
+        self.headings = []
+        self.criteria = {}
+        self.data_offset = 0
+
+        # the most recent data format 4 block found by reading backwards,
+        # as (block offset, offset reached, criteria)
+        self._block_cache = None
+
+        self._parse_header()
+
+    def __iter__(self) -> Iterator[dict]:
+        for _, row in self.records():
+            yield row
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path to the data file
+
+        :return: the path
+        """
+        return self._path
+
+    def _parse_header(self):
+        """
+        Reads the preamble, criteria, and headings from the top of the file.
+        """
+        with open(self._path, "rb") as f:
+            # data format 0 always separates the headings from the lines
+            # above them using a blank line, while data format 1 only
+            # does so when there is a preamble
+            lines = []
+            line = self._decode(f.readline())
+            blank_found = self._delimiter not in line
+            while blank_found and line:
+                lines.append(line)
+                raw = f.readline()
+                if not raw:
+                    raise ValueError(f'"{self._path}" does not contain headings')
+                line = self._decode(raw)
+
+            heading_line = self._decode(f.readline()) if blank_found else line
+            self.data_offset = f.tell()
+
+            # data format 4 places a criteria block above the first row
+            first_line = self._decode(f.readline())
+
+        preamble = []
+        for line in lines:
+            match = _CRITERIA_LINE.match(line)
+            if match is None:
+                preamble.append(line)
+            else:
+                self.criteria[match.group(1)] = parse_criteria(match.group(2))
+
+        self.preamble = "\n".join(preamble) if preamble else None
+        columns = heading_line.split(self._delimiter)
+
+        # each data format 1 criteria column follows the column that it
+        # describes, such as "flow", "flow >=", and "flow <="
+        self._layout = []
+        for i, column in enumerate(columns):
+            for suffix, key in _CRITERIA_SUFFIXES:
+                if column.endswith(suffix) and self._layout:
+                    heading = column[: -len(suffix)]
+                    if self._layout[-1][0] == heading:
+                        self._layout[-1][2][key] = i
+                        break
+            else:
+                self._layout.append((column, i, {}))
+
+        self.headings = [heading for heading, _, _ in self._layout]
+        if first_line.startswith(BLOCK_PREFIX + self._delimiter):
+            self.data_format = 4
+            self.criteria = self._parse_block(first_line) or {}
+        elif not blank_found or any(criteria for _, _, criteria in self._layout):
+            self.data_format = 1
+        else:
+            self.data_format = 0
+
+        self._width = len(columns)
+
+    def _decode(self, line: bytes) -> str:
+        return line.decode(self._encoding).rstrip("\r\n")
+
+    def _parse_block(self, line: str) -> Optional[dict]:
+        """
+        Converts a data format 4 criteria block into the criteria of each \
+        heading, or ``None`` if the block is malformed.
+        """
+        try:
+            criteria = json.loads(line[len(BLOCK_PREFIX) + len(self._delimiter) :])
+        except ValueError:
+            return None
+        return criteria if isinstance(criteria, dict) else None
+
+    def _criteria_at(self, offset: int) -> dict:
+        """
+        Returns the data format 4 criteria in effect for the row at \
+        ``offset`` by reading backwards to the nearest criteria block.  \
+        The block found is retained, so that reading the rows of a file \
+        in order only reads each part of the file once.
+
+        :param offset: the offset of the start of a row
+        :return: the criteria
+        """
+        marker = ("\n" + BLOCK_PREFIX + self._delimiter).encode(self._encoding)
+
+        # the line feed which ends the headings precedes the first block
+        floor = self.data_offset - 1
+        known = None
+        if self._block_cache is not None:
+            block_offset, reached, criteria = self._block_cache
+            if block_offset < offset <= reached:
+                return criteria
+            if reached < offset:
+                # only the rows since the offset reached are examined
+                floor = reached - 1
+                known = (block_offset, criteria)
+
+        with open(self._path, "rb") as f:
+            end = offset
+            while end > floor:
+                position = max(floor, end - self._chunk_size)
+                f.seek(position)
+                chunk = f.read(end - position + len(marker) - 1)
+                found = chunk.rfind(marker)
+                if found >= 0:
+                    f.seek(position + found + 1)
+                    criteria = self._parse_block(self._decode(f.readline()))
+                    if criteria is not None:
+                        self._block_cache = (position + found + 1, offset, criteria)
+                        return criteria
+                    # a malformed block is ignored, as it is when reading forwards
+                    end = position + found
+                    continue
+                end = position
+
+        if known is None:
+            return self.criteria
+
+        self._block_cache = (known[0], offset, known[1])
+        return known[1]
+
+    def lines(self, offset: Optional[int] = None) -> Iterator[tuple[int, str]]:
+        """
+        Yields each complete line of data along with the offset, in bytes, \
+        at which it begins.  A final line which does not end with a line \
+        feed was only partially written and is not yielded.
+
+        :param offset: the offset at which to begin reading, which must be \
+        the start of a line; defaults to the first row of data
+        :return: a generator of ``(offset, line)`` tuples
+        """
+        offset = self.data_offset if offset is None else offset
+
+        with open(self._path, "rb") as f:
+            f.seek(offset)
+            remainder = b""
+
+            for chunk in iter(lambda: f.read(self._chunk_size), b""):
+                chunk = remainder + chunk
+                start = 0
+                end = chunk.find(b"\n")
+                while end >= 0:
+                    yield offset, self._decode(chunk[start : end + 1])
+                    offset += end + 1 - start
+                    start = end + 1
+                    end = chunk.find(b"\n", start)
+                remainder = chunk[start:]
+
+        if remainder:
+            self._logger.warning(
+                f'ignoring partial row at offset {offset} of "{self._path}"'
+            )
+
+    def records(self, offset: Optional[int] = None) -> Iterator[tuple[int, dict]]:
+        """
+        Yields each row along with the offset, in bytes, at which it begins.
+
+        :param offset: the offset at which to begin reading, which must be \
+        the start of a row; defaults to the first row
+        :return: a generator of ``(offset, row)`` tuples
+        """
+        blocks = self.data_format == 4
+        criteria = self.criteria
+        if blocks and offset is not None and offset > self.data_offset:
+            criteria = self._criteria_at(offset)
+
+        for row_offset, line in self.lines(offset):
+            if blocks and line.startswith(BLOCK_PREFIX + self._delimiter):
+                block = self._parse_block(line)
+                if block is None:
+                    self._logger.warning(
+                        f'ignoring malformed criteria at offset {row_offset} of "{self._path}"'
+                    )
+                else:
+                    criteria = block
+                continue
+
+            row = self.parse_line(line, criteria)
+            if row is None:
+                self._logger.warning(
+                    f'ignoring malformed row at offset {row_offset} of "{self._path}"'
+                )
+                continue
+            yield row_offset, row
+
+    def search(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        keys: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """
+        Yields the rows which match all of the supplied conditions.
+
+        When the data file has a sidecar index (see the ``index_keys`` of \
+        ``ArchiveManager``) which contains the ``keys``, only the matching \
+        rows are read from the data file.  A missing index is rebuilt \
+        using the ``keys`` requested.  Otherwise, every row is examined.
+
+        .. code-block:: python
+
+            reader = ArchiveReader('data.txt')
+            for row in reader.search(keys={'serial': 'SN1234'}):
+                ...
+
+        :param start: when defined, rows must be at or after this datetime
+        :param end: when defined, rows must be at or before this datetime
+        :param keys: when defined, a ``dict`` of heading: value pairs that \
+        rows must match; values are compared as text
+        :return: a generator of rows
+        """
+        from mats.archiving.index import INDEX_SUFFIX, ArchiveIndex
+
+        keys = keys or {}
+
+        index_path = self._path.with_name(self._path.name + INDEX_SUFFIX)
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                indexed = f.readline().rstrip("\n").split("\t")[2:]
+        else:
+            indexed = list(keys)
+
+        if not all(key in indexed for key in keys):
+            self._logger.info(f'"{index_path}" does not index {list(keys)}')
+            for row in self:
+                dt = row.get("datetime", {}).get("value")
+                if start is not None and not (isinstance(dt, datetime) and dt >= start):
+                    continue
+                if end is not None and not (isinstance(dt, datetime) and dt <= end):
+                    continue
+                if all(
+                    str(row.get(k, {}).get("value")) == str(v) for k, v in keys.items()
+                ):
+                    yield row
+            return
+
+        index = ArchiveIndex(self._path, keys=indexed, delimiter=self._delimiter)
+        if not index_path.exists():
+            index.rebuild()
+
+        with open(self._path, "rb") as f:
+            for offset in index.offsets(start, end, keys):
+                f.seek(offset)
+                row = self.parse_line(
+                    self._decode(f.readline()),
+                    self._criteria_at(offset) if self.data_format == 4 else None,
+                )
+                if row is not None:
+                    yield row
+
+    def parse_line(self, line: str, criteria: Optional[dict] = None) -> Optional[dict]:
+        """
+        Converts a single line of data into a row.
+
+        :param line: the line, without its line feed
+        :param criteria: the criteria of each heading which are not written \
+        within the line; defaults to the criteria of the header, or of the \
+        first criteria block of data format 4
+        :return: the row, or ``None`` if the line does not match the headings
+        """
+        if criteria is None:
+            criteria = self.criteria
+
+        fields = line.split(self._delimiter)
+        if len(fields) != self._width:
+            return None
+
+        row = {}
+        for heading, i, criteria_columns in self._layout:
+            text = fields[i]
+            if heading == "failed":
+                value = parse_failed(text)
+            elif heading == "datetime":
+                try:
+                    value = datetime.fromisoformat(text)
+                except ValueError:
+                    value = parse_value(text)
+            elif text.startswith(BLOB_PREFIX):
+                value = BlobRef(text, self._blobs)
+            else:
+                value = parse_value(text)
+
+            entry = {"value": value}
+            if criteria_columns:
+                entry["criteria"] = {
+                    key: parse_value(fields[j]) for key, j in criteria_columns.items()
+                }
+            elif heading in criteria:
+                entry["criteria"] = criteria[heading]
+
+            row[heading] = entry
+
+        return row
+
+
+def read_archive(path: str | Path, **kwargs) -> Iterator[dict]:
+    """
+    Yields each row of a data file written using data format 0, 1, or 4.  \
+    See ``ArchiveReader`` for the available keyword arguments.
+
+    :param path: a string or `Path` containing the path to the data file
+    :return: a generator of rows
+    """
+    yield from ArchiveReader(path, **kwargs)
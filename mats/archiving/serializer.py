@@ -0,0 +1,255 @@
+import json
+from operator import itemgetter
+from typing import Optional
+
+# the order in which the criteria of a value are written
+CRITERIA_KEYS = ("pass_if", "min", "max")
+
+# data format 1 heading suffixes of each criteria key
+_CRITERIA_SUFFIXES = {"pass_if": " =", "min": " >=", "max": " <="}
+
+# the text which begins a data format 4 criteria block
+BLOCK_PREFIX = "#criteria"
+
+
+def criteria_block(criteria: dict, delimiter: str = "\t") -> str:
+    """
+    Returns the data format 4 line which sets the criteria of the rows \
+    that follow it.
+
+    :param criteria: the criteria of each heading which has criteria
+    :param delimiter: the data delimiter
+    :return: the line, including its line feed
+    """
+    return f"{BLOCK_PREFIX}{delimiter}{json.dumps(criteria, default=str)}\n"
+
+
+def format_array(v) -> str:
+    """
+    Converts an array, such as a NumPy array or a limit containing a \
+    value per element, into compact JSON, which unlike the text of a \
+    NumPy array is never abbreviated and never spans several lines.
+
+    :param v: a NumPy array, or a tuple
+    :return: the text
+    """
+    if hasattr(v, "tolist"):
+        v = v.tolist()
+    return json.dumps(v, separators=(",", ":"), default=str)
+
+
+def format_value(v) -> str:
+    """
+    Converts a single value into the text written to a data file.
+
+    :param v: the value
+    :return: the text
+    """
+    t = type(v)
+    if t is str:
+        return v
+    if t is float or t is int or t is bool:
+        return str(v)
+
+    if isinstance(v, str):
+        return v
+    if isinstance(v, (int, float)):
+        return f"{v}"
+
+    try:
+        # convert from pint-style values
+        return f"{v.magnitude}"
+    except AttributeError:
+        pass
+
+    if isinstance(v, tuple) or hasattr(v, "ndim") and hasattr(v, "tolist"):
+        return format_array(v)
+    return str(v)  # this is the catch-all
+
+
+def _format_quantity(v) -> str:
+    """
+    Converts a value of a column which contains pint-style values, \
+    falling back to ``format_value()`` for any other value.
+    """
+    try:
+        m = v.magnitude
+    except AttributeError:
+        return format_value(v)
+
+    if type(m) is float or type(m) is int:
+        return str(m)
+    return f"{m}"
+
+
+def _format_criterion(v) -> str:
+    """
+    Converts the value of a criteria, such as a limit, which is written as \
+    formatted unless it contains a value per element.
+    """
+    if isinstance(v, tuple) or getattr(v, "ndim", 0) and hasattr(v, "tolist"):
+        return format_array(v)
+    return f"{v}"
+
+
+def _format_failed(v) -> str:
+    """
+    Converts the ``failed`` list into its data format 1 representation.
+    """
+    return ";".join(v)
+
+
+def _criteria_getter(keys: tuple):
+    """
+    Returns a function which extracts the values of ``keys`` from the \
+    criteria as a tuple, or ``None`` when there are no keys.
+    """
+    if not keys:
+        return None
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda criteria: (criteria[key],)
+    return itemgetter(*keys)
+
+
+class RowSerializer:
+    """
+    Converts data points into the text of data format 0, 1, or 4.
+
+    The header and the method of converting each column depend only upon \
+    the headings and the criteria of a point, so they are determined once \
+    when the serializer is created.  The serializer is then reused for \
+    every point that ``matches()`` until the test sequence changes.
+
+    :param point: a ``dict`` in the same form supplied to \
+    ``ArchiveManager.save()``
+    :param data_format: 0, 1, or 4; data format 4 rows are the rows of \
+    data format 1 without the criteria, which are written separately \
+    using ``criteria_block()``
+    :param delimiter: the data delimiter
+    :param preamble: a string that is written above the headings
+    """
+
+    def __init__(
+        self,
+        point: dict,
+        data_format: int = 0,
+        delimiter: str = "\t",
+        preamble: Optional[str] = None,
+    ):
+        if data_format not in (0, 1, 4):
+            raise ValueError(f'data_format "{data_format}" invalid')
+
+        self._format = data_format
+        self._delimiter = delimiter
+
+        self._headings = list(point.keys())
+
+        # the criteria are part of the data format 0 header, while only
+        # the presence of each criteria affects the data format 1 header and
+        # the criteria are not part of the data format 4 header at all
+        self._criteria = []
+        self._columns = []
+        self._keys = []
+        for heading, entry in point.items():
+            criteria = entry.get("criteria")
+            if criteria is None or data_format == 4:
+                self._criteria.append(None)
+            elif data_format == 0:
+                self._criteria.append(dict(criteria))
+            else:
+                self._criteria.append(set(criteria))
+
+            keys = ()
+            if criteria is not None and data_format == 1:
+                keys = tuple(k for k in CRITERIA_KEYS if k in criteria)
+
+            if heading == "failed" and data_format in (1, 4):
+                formatter = _format_failed
+            elif hasattr(entry.get("value"), "magnitude"):
+                formatter = _format_quantity
+            else:
+                formatter = format_value
+
+            # the text of the most recent criteria values is retained, since
+            # the criteria rarely change from one row to the next
+            self._columns.append((formatter, _criteria_getter(keys), [(None, None)]))
+            self._keys.append(keys)
+
+        self._columns = tuple(self._columns)
+        self.header = self._header(point, preamble)
+
+    def _header(self, point: dict, preamble: Optional[str]) -> str:
+        headings = list(point.keys())
+
+        if self._format == 0:
+            criteria_lines = ""
+            for heading in headings:
+                criteria = point[heading].get("criteria")
+                if criteria is not None:
+                    fragments = [
+                        f"{key}={_format_criterion(criteria[key])}"
+                        for key in CRITERIA_KEYS
+                        if key in criteria
+                    ]
+                    criteria_lines += heading + ":" + ",".join(fragments) + "\n"
+
+            preamble = "" if not preamble else f"{preamble}\n"
+            return preamble + criteria_lines + f"\n{self._delimiter.join(headings)}\n"
+
+        columns = []
+        for heading, keys in zip(headings, self._keys):
+            columns.append(heading)
+            for key in keys:
+                columns.append(heading + _CRITERIA_SUFFIXES[key])
+
+        preamble = "" if not preamble else f"{preamble}\n\n"
+        return preamble + "\t".join(columns) + "\n"
+
+    def matches(self, point: dict) -> bool:
+        """
+        Returns True when ``point`` has the same headings and criteria as \
+        the point from which the serializer was created.  For data format \
+        1, only the presence of each criteria matters, since the values \
+        of the criteria are written on every row, while the criteria do \
+        not matter to data format 4.
+
+        :param point: a ``dict`` in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: True if ``serialize()`` may be used for ``point``
+        """
+        if list(point) != self._headings:
+            return False
+        if self._format == 4:
+            return True
+
+        criteria = [entry.get("criteria") for entry in point.values()]
+        if self._format == 0:
+            return criteria == self._criteria
+
+        # a set compares equal to the keys of a dict containing its members
+        return [None if c is None else c.keys() for c in criteria] == self._criteria
+
+    def serialize(self, point: dict) -> str:
+        """
+        Returns ``point`` as a single line of text.
+
+        :param point: a ``dict`` which ``matches()`` this serializer
+        :return: the line, including its line feed
+        """
+        delimiter = self._delimiter
+
+        data = []
+        append = data.append
+        for entry, (formatter, getter, cache) in zip(point.values(), self._columns):
+            append(formatter(entry.get("value")))
+
+            if getter is not None:
+                values = getter(entry["criteria"])
+                cached_values, text = cache[0]
+                if values != cached_values:
+                    text = delimiter.join([_format_criterion(value) for value in values])
+                    cache[0] = (values, text)
+                append(text)
+
+        return delimiter.join(data) + "\n"
@@ -0,0 +1,229 @@
+import json
+import logging
+from pathlib import Path
+import sqlite3
+from typing import Optional
+
+from mats.archiving.serializer import format_value
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schemas (
+    id INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL UNIQUE,
+    headings TEXT NOT NULL,
+    preamble TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    schema_id INTEGER NOT NULL REFERENCES schemas(id),
+    datetime TEXT,
+    pass INTEGER,
+    failed TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    moniker TEXT NOT NULL,
+    value,
+    pass_if,
+    min,
+    max
+);
+CREATE INDEX IF NOT EXISTS runs_datetime ON runs(datetime);
+CREATE INDEX IF NOT EXISTS measurements_run ON measurements(run_id);
+CREATE INDEX IF NOT EXISTS measurements_moniker ON measurements(moniker, run_id);
+"""
+
+_RUN_COLUMNS = ("datetime", "pass", "failed")
+
+
+def _to_sql(value):
+    """
+    Converts ``value`` into a type that SQLite is able to store natively.
+    """
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+
+    try:
+        # convert from pint-style values
+        return value.magnitude
+    except AttributeError:
+        return format_value(value)  # this is the catch-all
+
+
+class SqliteArchive:
+    """
+    Stores test sequence data within an SQLite database, which is the \
+    storage used by ``ArchiveManager(data_format=2)``.
+
+    The database contains one row per test sequence execution within the \
+    ``runs`` table and one row per measurement, along with its criteria, \
+    within the ``measurements`` table.  Each distinct set of headings and \
+    criteria is recorded once within the ``schemas`` table, so a change \
+    to the test sequence does not require a new file.
+
+    :param path: a string or `Path` containing the path to the database
+    :param preamble: a string that is saved alongside each schema
+    :param synchronous: the SQLite ``synchronous`` setting, such as \
+    "NORMAL" or "FULL"
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        preamble: Optional[str] = None,
+        synchronous: str = "NORMAL",
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        self._path = Path(path)
+        self._preamble = preamble
+        self._schema_ids = {}
+
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Commits any outstanding data and closes the database.
+
+        :return: None
+        """
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+        self._conn = None
+
+    def commit(self):
+        """
+        Commits all data inserted since the last commit.
+
+        :return: None
+        """
+        self._conn.commit()
+
+    def insert(self, point: dict):
+        """
+        Inserts one execution of the test sequence.  The data is not \
+        visible to other connections until ``commit()`` is called, which \
+        allows several executions to be written within one transaction.
+
+        :param point: a ``dict`` in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: None
+        """
+        schema_id = self._schema_id(point)
+
+        failed = point.get("failed", {}).get("value")
+        cursor = self._conn.execute(
+            "INSERT INTO runs (schema_id, datetime, pass, failed) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                schema_id,
+                _to_sql(point.get("datetime", {}).get("value")),
+                point.get("pass", {}).get("value"),
+                None if failed is None else json.dumps(list(failed)),
+            ),
+        )
+        run_id = cursor.lastrowid
+
+        rows = []
+        for moniker, entry in point.items():
+            if moniker in _RUN_COLUMNS:
+                continue
+            criteria = entry.get("criteria") or {}
+            rows.append(
+                (
+                    run_id,
+                    moniker,
+                    _to_sql(entry.get("value")),
+                    _to_sql(criteria.get("pass_if")),
+                    _to_sql(criteria.get("min")),
+                    _to_sql(criteria.get("max")),
+                )
+            )
+
+        self._conn.executemany(
+            "INSERT INTO measurements (run_id, moniker, value, pass_if, min, max) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def results(self, moniker: str, limit: Optional[int] = None) -> list[dict]:
+        """
+        Returns the most recent results for a single measurement, newest \
+        first.
+
+        :param moniker: the name of the test or saved value
+        :param limit: the maximum number of results to return
+        :return: a list of ``dict`` containing the ``datetime``, ``pass``, \
+        ``value``, and ``criteria`` of each result
+        """
+        cursor = self._conn.execute(
+            "SELECT r.datetime, r.pass, m.value, m.pass_if, m.min, m.max "
+            "FROM measurements m JOIN runs r ON r.id = m.run_id "
+            "WHERE m.moniker = ? ORDER BY m.run_id DESC LIMIT ?",
+            (moniker, -1 if limit is None else limit),
+        )
+
+        results = []
+        for dt, is_passing, value, pass_if, min_value, max_value in cursor:
+            criteria = {}
+            if pass_if is not None:
+                criteria["pass_if"] = pass_if
+            if min_value is not None:
+                criteria["min"] = min_value
+            if max_value is not None:
+                criteria["max"] = max_value
+
+            results.append(
+                {
+                    "datetime": dt,
+                    "pass": None if is_passing is None else bool(is_passing),
+                    "value": value,
+                    "criteria": criteria if criteria else None,
+                }
+            )
+
+        return results
+
+    def _schema_id(self, point: dict) -> int:
+        """
+        Returns the id of the schema describing ``point``, recording a new \
+        schema when the headings or criteria have not been seen before.
+        """
+        headings = [
+            [heading, entry.get("criteria")] for heading, entry in point.items()
+        ]
+        signature = json.dumps(headings, default=str)
+
+        schema_id = self._schema_ids.get(signature)
+        if schema_id is not None:
+            return schema_id
+
+        row = self._conn.execute(
+            "SELECT id FROM schemas WHERE signature = ?", (signature,)
+        ).fetchone()
+        if row is None:
+            self._logger.info("recording new schema")
+            row = (
+                self._conn.execute(
+                    "INSERT INTO schemas (signature, headings, preamble) "
+                    "VALUES (?, ?, ?)",
+                    (signature, json.dumps(list(point.keys())), self._preamble),
+                ).lastrowid,
+            )
+
+        self._schema_ids[signature] = row[0]
+        return row[0]
@@ -0,0 +1,425 @@
+from datetime import date, datetime
+import http.client
+from io import SEEK_END
+import json
+import logging
+from os import replace
+from pathlib import Path
+from random import random
+import socket
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Optional
+from urllib.parse import urlsplit
+
+from mats.archiving.manager import collect_point
+from mats.test import Test
+
+# the file, next to the spool, which contains the offset of the first
+# record which has not been uploaded
+CURSOR_SUFFIX = ".cursor"
+
+
+def _to_json(value):
+    """
+    Converts the values which ``json`` does not support, such as \
+    pint-style values and NumPy arrays.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "magnitude"):
+        return value.magnitude
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+
+class SpoolUploader:
+    """
+    Forwards each data point to a remote collector, such as an MES, \
+    without ever waiting on the network.
+
+    ``save()`` appends the point, as one line of JSON, to a spool file \
+    on disk and returns immediately.  A background thread uploads the \
+    spooled points in batches of up to ``batch_size`` over a single \
+    connection which is reused between batches.  When an upload fails, \
+    the connection is closed and the batch is attempted again after a \
+    delay which doubles after each failure, up to ``max_retry_delay``.
+
+    The offset of the first point which has not been uploaded is kept \
+    within ``<spool_path>.cursor``, which is only replaced once the \
+    collector has accepted a batch, so points spooled before a restart \
+    are uploaded by the next uploader which uses the same spool.  A point \
+    may therefore be uploaded more than once.  The spool is emptied once \
+    every point within it has been uploaded.
+
+    The ``url`` determines how batches are uploaded:
+
+     * ``http://host:port/path`` or ``https://...`` - each batch is sent \
+       as a JSON array using ``POST`` and any ``2xx`` status accepts it
+     * ``tcp://host:port`` - each batch is sent as a JSON array on a \
+       single line and the collector must reply with a line beginning \
+       with ``OK`` to accept it
+
+    The uploader may be used as an ``archive_manager``, or as one of the \
+    sinks of an ``ArchiveFanout``:
+
+    .. code-block:: python
+
+        TestSequence(
+            sequence=[...],
+            archive_manager=[ArchiveManager(data_format=1),
+                             SpoolUploader('http://mes:8080/results')],
+        )
+
+    :param url: the address of the collector
+    :param spool_path: a string or `Path` containing the path to the spool
+    :param batch_size: the maximum number of points uploaded at once
+    :param interval: the time, in seconds, to wait for more points before \
+    the spool is examined again
+    :param timeout: the time, in seconds, allowed for each upload
+    :param retry_delay: the time, in seconds, to wait after the first \
+    failed upload
+    :param max_retry_delay: the maximum time, in seconds, to wait after \
+    a failed upload
+    :param headers: additional HTTP headers, such as an authorization
+    :param loglevel: the logging level
+    """
+
+    def __init__(
+        self,
+        url: str,
+        spool_path: str | Path = "upload.spool",
+        batch_size: int = 100,
+        interval: float = 1.0,
+        timeout: float = 10.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+        headers: Optional[dict] = None,
+        loglevel=logging.INFO,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._logger.setLevel(loglevel)
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https", "tcp") or not parts.hostname:
+            raise ValueError(f'url "{url}" invalid')
+        if parts.scheme == "tcp" and parts.port is None:
+            raise ValueError(f'url "{url}" does not contain a port')
+
+        self._url = url
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._headers = {"Content-Type": "application/json", **(headers or {})}
+        self._connection = None
+
+        self._batch_size = batch_size
+        self._interval = interval
+        self._timeout = timeout
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+
+        self._spool_path = Path(spool_path)
+        self._cursor_path = self._spool_path.with_name(
+            self._spool_path.name + CURSOR_SUFFIX
+        )
+        self._lock = Lock()
+        self._wake = Event()
+        self._stop = Event()
+
+        self._uploaded = 0
+        self._batches = 0
+        self._failures = 0
+        self._last_error = None
+        self._latencies = []
+        self._retrying = False
+
+        self._cursor, self._depth = self._open_spool()
+        if self._depth:
+            self._logger.info(
+                f'{self._depth} points remain to be uploaded from "{self._spool_path}"'
+            )
+        self._spool = open(self._spool_path, "ab")
+
+        self._thread = Thread(target=self._upload, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def statistics(self) -> dict:
+        """
+        Returns the metrics of the uploader: the ``spool_depth``, which is \
+        the number of points waiting to be uploaded, along with the number \
+        of points ``uploaded``, the number of ``batches`` and ``failures``, \
+        the ``last_error``, whether the uploader is ``retrying``, and the \
+        ``latency`` of recent uploads, in seconds, as ``last``, ``mean``, \
+        and ``max``
+
+        :return: a ``dict`` of metrics
+        """
+        latencies = list(self._latencies)
+        return {
+            "spool_depth": self._depth,
+            "uploaded": self._uploaded,
+            "batches": self._batches,
+            "failures": self._failures,
+            "last_error": None if self._last_error is None else str(self._last_error),
+            "retrying": self._retrying,
+            "latency": {
+                "last": latencies[-1] if latencies else None,
+                "mean": sum(latencies) / len(latencies) if latencies else None,
+                "max": max(latencies) if latencies else None,
+            },
+        }
+
+    def _open_spool(self) -> tuple[int, int]:
+        """
+        Reads the cursor and counts the points which have not yet been \
+        uploaded, removing a point which was only partially written.
+
+        :return: a tuple containing the cursor and the number of points
+        """
+        try:
+            cursor = int(self._cursor_path.read_text())
+        except (FileNotFoundError, ValueError):
+            cursor = 0
+
+        try:
+            f = open(self._spool_path, "r+b")
+        except FileNotFoundError:
+            return 0, 0
+
+        with f:
+            size = f.seek(0, SEEK_END)
+            if cursor > size:
+                # the spool was emptied before the cursor was replaced
+                cursor = 0
+
+            f.seek(cursor)
+            count = 0
+            end = cursor
+            position = cursor
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                count += chunk.count(b"\n")
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    end = position + newline + 1
+                position += len(chunk)
+
+            if end != size:
+                self._logger.warning(
+                    f'removing a partially-written point from "{self._spool_path}"'
+                )
+                f.truncate(end)
+
+        return cursor, count
+
+    def aggregate(
+        self,
+        datetime: datetime,
+        is_passing: bool,
+        failed: list[str],
+        tests: list[Test],
+        timing: Optional[dict] = None,
+    ):
+        """
+        Collects one execution of the test sequence and spools it to be \
+        uploaded.  See ``ArchiveManager.aggregate()``.
+
+        :param datetime: the datetime that the test started
+        :param is_passing: True/False/None indicating if the test passed, \
+        failed, or was aborted
+        :param failed: a list of test monikers that failed
+        :param tests: a list of tests representing the test sequence
+        :param timing: additional columns containing the time, in \
+        nanoseconds, of each phase of the test sequence
+        :return: None
+        """
+        self.save(collect_point(datetime, is_passing, failed, tests, timing))
+
+    def save(self, point: dict):
+        """
+        Appends a data point to the spool, to be uploaded by the \
+        background thread.
+
+        :param point: a ``dict`` in the same form supplied to \
+        ``ArchiveManager.save()``
+        :return: None
+        """
+        line = json.dumps(
+            {h: dict(e) for h, e in point.items()}, default=_to_json
+        ).encode()
+
+        with self._lock:
+            self._spool.write(line + b"\n")
+            self._spool.flush()
+            self._depth += 1
+
+        self._wake.set()
+
+    def _read_batch(self) -> tuple[list[bytes], int]:
+        """
+        Returns up to ``batch_size`` spooled points from the cursor, \
+        along with the offset which follows them.
+        """
+        lines = []
+        with open(self._spool_path, "rb") as f:
+            f.seek(self._cursor)
+            while len(lines) < self._batch_size:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                lines.append(line[:-1])
+            return lines, f.tell() if lines else self._cursor
+
+    def _advance(self, offset: int, count: int):
+        """
+        Records that the points before ``offset`` have been uploaded.
+        """
+        with self._lock:
+            self._depth -= count
+
+            if (
+                not self._depth
+                and not self._spool.closed
+                and self._spool.seek(0, SEEK_END) == offset
+            ):
+                # the spool is emptied before the cursor is reset, so the
+                # cursor never refers to points which were not uploaded
+                self._spool.truncate(0)
+                offset = 0
+
+            partial = self._cursor_path.with_name(self._cursor_path.name + ".partial")
+            partial.write_text(str(offset))
+            replace(partial, self._cursor_path)
+            self._cursor = offset
+
+    def _upload(self):
+        """
+        Uploads spooled points until ``close()`` is called.
+        """
+        delay = self._retry_delay
+
+        while True:
+            self._wake.clear()
+            lines, offset = self._read_batch() if self._depth else ([], self._cursor)
+            if not lines:
+                if self._stop.is_set():
+                    break
+                self._wake.wait(self._interval)
+                continue
+
+            body = b"[" + b",".join(lines) + b"]"
+            start = perf_counter()
+            try:
+                self._send(body)
+            except Exception as e:
+                self._close_connection()
+                self._failures += 1
+                self._last_error = e
+                self._retrying = True
+                if self._stop.is_set():
+                    break
+
+                # the delay is varied so that many stations which lost the
+                # collector at the same time do not retry in step
+                wait = delay * (0.5 + random() / 2)
+                self._logger.warning(
+                    f'unable to upload to "{self._url}", retrying in {wait:.1f}s: {e}'
+                )
+                self._stop.wait(wait)
+                delay = min(delay * 2, self._max_retry_delay)
+                continue
+
+            self._latencies = (self._latencies + [perf_counter() - start])[-100:]
+            self._uploaded += len(lines)
+            self._batches += 1
+            self._retrying = False
+            delay = self._retry_delay
+
+            self._advance(offset, len(lines))
+            self._logger.debug(f'uploaded {len(lines)} points to "{self._url}"')
+
+        self._close_connection()
+
+    def _send(self, body: bytes):
+        """
+        Sends one batch over the current connection, connecting first \
+        when there is no connection.  Raises an exception unless the \
+        collector accepted the batch.
+        """
+        if self._scheme == "tcp":
+            if self._connection is None:
+                sock = socket.create_connection((self._host, self._port), self._timeout)
+                self._connection = (sock, sock.makefile("rb"))
+
+            sock, reply = self._connection
+            sock.sendall(body + b"\n")
+            answer = reply.readline()
+            if not answer.startswith(b"OK"):
+                raise ConnectionError(f"batch refused: {answer.strip()!r}")
+            return
+
+        if self._connection is None:
+            cls = (
+                http.client.HTTPSConnection
+                if self._scheme == "https"
+                else http.client.HTTPConnection
+            )
+            self._connection = cls(self._host, self._port, timeout=self._timeout)
+
+        self._connection.request("POST", self._target, body=body, headers=self._headers)
+        response = self._connection.getresponse()
+        response.read()  # the connection may only be reused once read
+        if not 200 <= response.status < 300:
+            raise ConnectionError(f"batch refused: {response.status} {response.reason}")
+
+    def _close_connection(self):
+        if self._connection is None:
+            return
+
+        try:
+            if self._scheme == "tcp":
+                sock, reply = self._connection
+                reply.close()
+                sock.close()
+            else:
+                self._connection.close()
+        except OSError:
+            pass
+        self._connection = None
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Uploads the spooled points, while uploads succeed and for up to \
+        ``timeout`` seconds, then stops the background thread.  Points \
+        which were not uploaded remain within the spool.
+
+        :param timeout: the maximum time, in seconds, to wait
+        :return: None
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+        if self._thread.is_alive():
+            self._logger.warning(
+                f"timed out while uploading, {self._depth} points remain spooled"
+            )
+
+        with self._lock:
+            self._spool.close()
+
+        if self._depth:
+            self._logger.info(
+                f'{self._depth} points remain within "{self._spool_path}"'
+            )
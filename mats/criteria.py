@@ -0,0 +1,381 @@
+import logging
+import sys
+from typing import Callable, Optional
+
+from mats.events import emit, enabled
+
+# the types which are never arrays, examined before anything else since
+# nearly every value is one of them
+_SCALAR_TYPES = (int, float, bool, str, type(None))
+
+
+def as_array(value):
+    """
+    Returns ``value`` as a NumPy array when it is an array of numbers, \
+    such as a NumPy array, an ``array.array``, or any other object which \
+    supports the buffer protocol, else None.  ``bytes``, ``bytearray``, \
+    views of bytes, and NumPy scalars, such as ``numpy.bool_``, are not \
+    arrays of numbers.
+
+    :param value: the value
+    :return: a NumPy array or None
+    """
+    if type(value) in _SCALAR_TYPES or isinstance(value, (bytes, bytearray)):
+        return None
+
+    # NumPy is only examined when the application has already imported it
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray):
+        return value if value.dtype.kind in "biufc" else None
+
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return None
+    if view.format in ("B", "c") or view.ndim == 0:
+        return None  # bytes, or a scalar such as numpy.float64
+
+    import numpy as np
+
+    return np.asarray(view)
+
+
+def _is_array_limit(limit) -> bool:
+    return isinstance(limit, (list, tuple)) or as_array(limit) is not None
+
+
+def freeze_limit(limit):
+    """
+    Returns a limit which contains a value per element, such as a NumPy \
+    array, as nested tuples, which may be compared and copied like any \
+    other limit; other limits are returned unchanged.
+
+    :param limit: the limit
+    :return: the limit
+    """
+    if isinstance(limit, (list, tuple)):
+        return tuple(freeze_limit(v) for v in limit)
+
+    array = as_array(limit)
+    if array is None:
+        return limit
+    return freeze_limit(array.tolist())
+
+
+class Verdict:
+    """
+    The outcome of applying the criteria of a ``Test`` to its value.
+
+    :param passing: True if the value meets every criteria
+    :param failed: the criteria which the value did not meet, such as \
+    ``("min",)``
+    :param limit: the ``"min"`` or ``"max"`` limit nearest to the value, \
+    or None when there are no limits
+    :param margin: the distance from the value to ``limit``, which is \
+    negative when the value is beyond it, or None when it cannot be \
+    calculated; for arrays, the least margin of any element
+    :param indices: for arrays, the indices of the elements which did not \
+    meet the criteria, counted as though the array were flattened
+    :param index: for arrays, the index of the element with the least \
+    margin
+    """
+
+    __slots__ = ("passing", "failed", "limit", "margin", "indices", "index")
+
+    def __init__(
+        self,
+        passing: bool,
+        failed: tuple = (),
+        limit: Optional[str] = None,
+        margin=None,
+        indices: Optional[tuple] = None,
+        index: Optional[int] = None,
+    ):
+        self.passing = passing
+        self.failed = failed
+        self.limit = limit
+        self.margin = margin
+        self.indices = indices
+        self.index = index
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(passing={self.passing}, "
+            f"failed={self.failed}, limit={self.limit!r}, margin={self.margin}"
+            + (
+                ""
+                if self.indices is None
+                else f", indices={self.indices}, index={self.index}"
+            )
+            + ")"
+        )
+
+
+def compile_criteria(
+    criteria: Optional[dict], logger: logging.Logger, moniker: Optional[str] = None
+) -> Optional[Callable[[object], Verdict]]:
+    """
+    Returns a function which applies ``criteria`` to a value.
+
+    The criteria are examined once, here, rather than on each execution \
+    of the test.  Each comparison is emitted as a ``limit_check`` event, \
+    which is only formatted when ``logger`` emits it.  Arrays of values, along with \
+    limits which contain a limit per element, are compared using NumPy.
+
+    :param criteria: a ``dict`` which may contain ``pass_if``, ``min``, \
+    and ``max``
+    :param logger: the logger of the test
+    :param moniker: the moniker of the test, included within each event
+    :return: a function which accepts the value and returns a \
+    ``Verdict``, or None when there are no criteria
+    """
+    criteria = {k: v for k, v in (criteria or {}).items() if v is not None}
+    if not criteria:
+        return None
+
+    has_pass_if = "pass_if" in criteria
+    has_min = "min" in criteria
+    has_max = "max" in criteria
+    pass_if = criteria.get("pass_if")
+    minimum = criteria.get("min")
+    maximum = criteria.get("max")
+
+    def check(level, template, key, value, limit, passing):
+        if not enabled(logger, level):
+            return
+        emit(
+            logger,
+            level,
+            "limit_check",
+            template,
+            moniker=moniker,
+            criteria=key,
+            value=value,
+            limit=limit,
+            passing=passing,
+        )
+
+    array_limits = any(_is_array_limit(v) for v in criteria.values())
+    evaluate_array = None
+
+    def evaluate(value) -> Verdict:
+        nonlocal evaluate_array
+        if array_limits or as_array(value) is not None:
+            if evaluate_array is None:
+                evaluate_array = _compile_array(criteria, logger, moniker)
+            return evaluate_array(value)
+
+        failed = []
+        limit = margin = None
+
+        if has_pass_if:
+            if value != pass_if:
+                check(
+                    logging.WARNING,
+                    '"{value}" != pass_if requirement "{limit}", failing',
+                    "pass_if",
+                    value,
+                    pass_if,
+                    False,
+                )
+                failed.append("pass_if")
+            else:
+                check(
+                    logging.INFO,
+                    '"{value}" == pass_if requirement "{limit}"',
+                    "pass_if",
+                    value,
+                    pass_if,
+                    True,
+                )
+
+        if has_min:
+            if value < minimum:
+                check(
+                    logging.WARNING,
+                    '"{value}" is below the minimum "{limit}", failing',
+                    "min",
+                    value,
+                    minimum,
+                    False,
+                )
+                failed.append("min")
+            else:
+                check(
+                    logging.INFO,
+                    '"{value}" is above the minimum "{limit}"',
+                    "min",
+                    value,
+                    minimum,
+                    True,
+                )
+
+            limit = "min"
+            try:
+                margin = value - minimum
+            except TypeError:
+                pass
+
+        if has_max:
+            if value > maximum:
+                check(
+                    logging.WARNING,
+                    '"{value}" is above the maximum "{limit}"',
+                    "max",
+                    value,
+                    maximum,
+                    False,
+                )
+                failed.append("max")
+            else:
+                check(
+                    logging.INFO,
+                    '"{value}" is below the maximum "{limit}"',
+                    "max",
+                    value,
+                    maximum,
+                    True,
+                )
+
+            try:
+                to_max = maximum - value
+            except TypeError:
+                to_max = None
+            if limit is None or (
+                to_max is not None and (margin is None or to_max < margin)
+            ):
+                limit, margin = "max", to_max
+
+        return Verdict(not failed, tuple(failed), limit, margin)
+
+    return evaluate
+
+
+def _compile_array(
+    criteria: dict, logger: logging.Logger, moniker: Optional[str]
+) -> Callable:
+    """
+    Returns a function which applies ``criteria`` to an array of values.
+    """
+    import numpy as np
+
+    def limit(key):
+        value = criteria.get(key)
+        if isinstance(value, (list, tuple)):
+            return np.asarray(value)
+        array = as_array(value)
+        return value if array is None else array
+
+    has_pass_if = "pass_if" in criteria
+    has_min = "min" in criteria
+    has_max = "max" in criteria
+    pass_if = limit("pass_if")
+    minimum = limit("min")
+    maximum = limit("max")
+
+    def check(level, template, key, value, limit, outside):
+        if not enabled(logger, level):
+            return
+        emit(
+            logger,
+            level,
+            "limit_check",
+            template,
+            moniker=moniker,
+            criteria=key,
+            value=value,
+            limit=limit,
+            passing=not outside.any(),
+            count=int(np.count_nonzero(outside)),
+            size=outside.size,
+        )
+
+    def evaluate(value) -> Verdict:
+        array = as_array(value)
+        value = np.asarray(value) if array is None else array
+
+        failed = []
+        failing = np.zeros(value.shape, dtype=bool)
+        margins = {}
+
+        # unsigned values would wrap around when subtracted from the limits
+        numeric = value.astype(np.float64) if value.dtype.kind == "u" else value
+
+        if has_pass_if:
+            outside = value != pass_if
+            if outside.any():
+                check(
+                    logging.WARNING,
+                    '{count} of {size} values != pass_if requirement "{limit}", '
+                    "failing",
+                    "pass_if",
+                    value,
+                    pass_if,
+                    outside,
+                )
+                failed.append("pass_if")
+            else:
+                check(
+                    logging.INFO,
+                    'values == pass_if requirement "{limit}"',
+                    "pass_if",
+                    value,
+                    pass_if,
+                    outside,
+                )
+            failing = failing | outside
+
+        for key, bound, sign, text in (
+            ("min", minimum, 1, "below the minimum"),
+            ("max", maximum, -1, "above the maximum"),
+        ):
+            if not (has_min if key == "min" else has_max):
+                continue
+
+            try:
+                margins[key] = (numeric - bound) * sign
+            except TypeError:
+                outside = numeric < bound if key == "min" else numeric > bound
+            else:
+                outside = margins[key] < 0
+
+            if outside.any():
+                check(
+                    logging.WARNING,
+                    "{count} of {size} values are " + text + ' "{limit}", failing',
+                    key,
+                    value,
+                    bound,
+                    outside,
+                )
+                failed.append(key)
+            else:
+                check(
+                    logging.INFO,
+                    "values are not " + text + ' "{limit}"',
+                    key,
+                    value,
+                    bound,
+                    outside,
+                )
+            failing = failing | outside
+
+        limit_key = margin = index = None
+        if margins:
+            keys = list(margins)
+            least = margins[keys[0]]
+            nearest = np.zeros(least.shape, dtype=int)
+            if len(keys) == 2:
+                nearest = (margins[keys[1]] < least).astype(int)
+                least = np.minimum(least, margins[keys[1]])
+            least = np.broadcast_to(least, failing.shape)
+            nearest = np.broadcast_to(nearest, failing.shape)
+            if least.size:
+                index = int(np.argmin(least))
+                margin = least.flat[index].item()
+                limit_key = keys[int(nearest.flat[index])]
+
+        indices = tuple(np.flatnonzero(failing).tolist())
+        return Verdict(not failed, tuple(failed), limit_key, margin, indices, index)
+
+    return evaluate
@@ -0,0 +1,144 @@
+import logging
+from threading import Lock
+from time import time
+from typing import Callable, Iterable, Optional
+
+_lock = Lock()
+
+# each subscriber along with the kinds of events it receives, or None for
+# every kind; the tuple is replaced rather than modified, so that events
+# may be emitted from any thread without holding the lock
+_subscribers = ()
+
+_logger = logging.getLogger(__name__)
+
+
+class Event:
+    """
+    A structured record of something which happened during a test \
+    sequence, such as ``test_setup`` or ``limit_check``.
+
+    An event is passed to the logger of the ``Test`` or ``TestSequence`` \
+    which emitted it in place of a message, and is only rendered into \
+    text when a handler formats it, so that events which are not logged \
+    cost little more than their creation.  Subscribers receive every \
+    event, regardless of the logging level, and may read the ``fields`` \
+    without parsing any text.
+
+    :param kind: the kind of event, such as ``test_setup``
+    :param level: the logging level of the event
+    :param template: the text of the event, into which the ``fields`` \
+    are substituted using ``str.format()``
+    :param fields: the values which describe the event
+    """
+
+    __slots__ = ("kind", "level", "template", "fields", "created", "_text")
+
+    def __init__(self, kind: str, level: int, template: str, fields: dict):
+        self.kind = kind
+        self.level = level
+        self.template = template
+        self.fields = fields
+        self.created = time()
+        self._text = None
+
+    def render(self) -> str:
+        """
+        Returns the text of the event
+
+        :return: the text
+        """
+        if self._text is None:
+            self._text = self.template.format(**self.fields)
+        return self._text
+
+    __str__ = render
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.kind!r}, {self.fields!r})"
+
+
+def subscribe(
+    subscriber: Callable[[Event], None], kinds: Optional[Iterable[str]] = None
+):
+    """
+    Passes every event, or only the events of the given kinds, to \
+    ``subscriber``.  The subscriber is called on the thread which emitted \
+    the event, so it should return quickly.
+
+    .. code-block:: python
+
+        mats.events.subscribe(
+            lambda event: dashboard.update(event.fields),
+            kinds=['limit_check'],
+        )
+
+    :param subscriber: a function which accepts an ``Event``
+    :param kinds: the kinds of events to receive, or None for every kind
+    :return: None
+    """
+    global _subscribers
+
+    kinds = None if kinds is None else frozenset(kinds)
+    with _lock:
+        _subscribers = _subscribers + ((subscriber, kinds),)
+
+
+def unsubscribe(subscriber: Callable[[Event], None]):
+    """
+    Stops passing events to ``subscriber``.
+
+    :param subscriber: a function previously passed to ``subscribe()``
+    :return: None
+    """
+    global _subscribers
+
+    with _lock:
+        _subscribers = tuple(s for s in _subscribers if s[0] != subscriber)
+
+
+def enabled(logger: logging.Logger, level: int) -> bool:
+    """
+    Returns True when an event emitted to ``logger`` at ``level`` would be \
+    received by a subscriber or by the logger, so that the fields of an \
+    event which is emitted very often need only be gathered when required.
+
+    :param logger: the logger of the emitter
+    :param level: the logging level of the event
+    :return: True or False
+    """
+    return bool(_subscribers) or logger.isEnabledFor(level)
+
+
+def emit(logger: logging.Logger, level: int, kind: str, template: str, **fields):
+    """
+    Passes an event to the subscribers and to ``logger``.  Nothing is \
+    created when there are no subscribers and ``logger`` would discard it.
+
+    :param logger: the logger of the emitter
+    :param level: the logging level of the event
+    :param kind: the kind of event
+    :param template: the text of the event; see ``Event``
+    :param fields: the values which describe the event
+    :return: None
+    """
+    subscribers = _subscribers
+    enabled = logger.isEnabledFor(level)
+    if not subscribers and not enabled:
+        return
+
+    event = Event(kind, level, template, fields)
+
+    for subscriber, kinds in subscribers:
+        if kinds is not None and kind not in kinds:
+            continue
+        try:
+            subscriber(event)
+        except Exception as e:
+            _logger.warning(
+                f'event subscriber "{subscriber}" raised an exception: {e}'
+            )
+
+    if enabled:
+        # the record names the caller of emit(), rather than emit() itself
+        logger.log(level, event, stacklevel=2)
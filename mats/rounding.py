@@ -0,0 +1,141 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from numbers import Integral, Real
+
+# the Decimal of each power of ten to which values have been rounded
+_QUANTA = {}
+
+_INFINITIES = (float("inf"), float("-inf"))
+
+# the largest power of ten, and the most significant figures, which
+# round_array() handles without falling back to round_significant()
+_EXACT_POWER = 22
+_SCALED_FIGURES = 9
+
+
+def round_significant(value, significant_figures: int):
+    """
+    Rounds a number to a number of significant figures in the same way \
+    as ``sigfig.round()``: the number is rounded as it is written, rather \
+    than as it is stored, so that ``1.005`` becomes ``1.01``, halves are \
+    rounded away from zero, and the type of the number is retained.
+
+    :param value: an ``int``, ``float``, ``Decimal``, or NumPy number
+    :param significant_figures: the number of significant figures, or \
+    None to return the number unchanged
+    :return: the rounded number
+    :raises ValueError: when ``value`` is not a finite real number, \
+    although NaN is returned unchanged
+    """
+    if significant_figures is None:
+        return value
+    if significant_figures < 1:
+        raise ValueError(f"{significant_figures} significant figures invalid")
+
+    cls = type(value)
+    if cls is float:
+        if value != value or not value:
+            return value  # NaN and zero
+        if value in _INFINITIES:
+            raise ValueError(f'unable to round "{value}"')
+        if significant_figures >= 17:
+            return value  # a float has no more significant figures
+
+        # floats are written using the shortest text which reads back as
+        # the same float, which is also how sigfig sees them
+        return float(_quantize(Decimal(repr(value)), significant_figures))
+
+    if cls is int:
+        return _round_int(value, significant_figures)
+
+    if cls is bool or not isinstance(value, Real) and cls is not Decimal:
+        raise ValueError(f'unable to round "{value}"')
+    if isinstance(value, Integral):
+        return cls(_round_int(int(value), significant_figures))
+
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'unable to round "{value}"') from None
+
+    if not number.is_finite():
+        if number.is_nan():
+            return value
+        raise ValueError(f'unable to round "{value}"')
+    if not number or len(number.as_tuple().digits) <= significant_figures:
+        return value
+
+    rounded = _quantize(number, significant_figures)
+    return rounded if cls is Decimal else cls(float(rounded))
+
+
+def _round_int(number: int, significant_figures: int) -> int:
+    digits = len(str(abs(number)))
+    if digits <= significant_figures:
+        return number
+
+    quantum = 10 ** (digits - significant_figures)
+    rounded = (abs(number) + quantum // 2) // quantum * quantum
+    return -rounded if number < 0 else rounded
+
+
+def _quantize(number: Decimal, significant_figures: int) -> Decimal:
+    exponent = number.adjusted() - significant_figures + 1
+    quantum = _QUANTA.get(exponent)
+    if quantum is None:
+        quantum = _QUANTA[exponent] = Decimal(f"1e{exponent}")
+
+    return number.quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def round_array(array, significant_figures: int):
+    """
+    Rounds each element of a NumPy array to a number of significant \
+    figures, rounding halves away from zero as ``round_significant()`` \
+    does.  Arrays which do not contain \
+    floating point numbers are returned unchanged, as are NaN and \
+    infinite elements.
+
+    :param array: the NumPy array
+    :param significant_figures: the number of significant figures
+    :return: a new array of the same shape and type
+    """
+    import numpy as np
+
+    if array.dtype.kind not in "fc" or significant_figures is None:
+        return array
+    if array.dtype.kind == "c":
+        return round_array(array.real, significant_figures) + 1j * round_array(
+            array.imag, significant_figures
+        )
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        magnitude = np.abs(array)
+        exponent = np.floor(np.log10(np.where(magnitude > 0, magnitude, 1.0)))
+        decimals = significant_figures - 1 - exponent
+
+        # the scale is applied by multiplication or division so that it is
+        # exact while it is a power of ten that a float holds exactly
+        scale = 10.0 ** np.abs(decimals)
+        scaled = np.where(decimals >= 0, array * scale, array / scale)
+
+        # the binary error of the scaled value is removed before the
+        # halves are found, so that 1.005 is treated as written
+        scaled = np.round(scaled, 6)
+        scaled = np.copysign(np.floor(np.abs(scaled) + 0.5), scaled)
+
+        rounded = np.where(decimals >= 0, scaled / scale, scaled * scale)
+
+    rounded = np.where(np.isfinite(array), rounded, array).astype(array.dtype)
+
+    # beyond 1e22 the scale is not exact, and beyond 9 significant figures
+    # the scaled value has too few decimals left to remove the binary error
+    inexact = np.isfinite(array) & (
+        (np.abs(decimals) > _EXACT_POWER) | (significant_figures > _SCALED_FIGURES)
+    )
+    if inexact.any():
+        rounded[inexact] = [
+            round_significant(x, significant_figures)
+            for x in array[inexact].tolist()
+        ]
+
+    return rounded
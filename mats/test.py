@@ -1,8 +1,33 @@
+from concurrent.futures import Future, wait
 import logging
 from numbers import Number
-from typing import Optional, Union
+from threading import Thread
+from time import perf_counter_ns
+from types import MappingProxyType
+from typing import Optional, Sequence, Union
 
-from sigfig import round
+from mats.criteria import Verdict, as_array, compile_criteria, freeze_limit
+from mats.events import emit
+from mats.rounding import round_array, round_significant
+
+# the phases of a test, each of which may be given a timeout
+PHASES = ("setup", "execute", "teardown")
+
+
+class PhaseTimeoutError(TimeoutError):
+    """
+    Raised when a phase of a ``Test`` does not complete within its timeout.
+
+    :param moniker: the moniker of the test
+    :param phase: the phase, such as ``"execute"``
+    :param timeout: the timeout, in seconds
+    """
+
+    def __init__(self, moniker: str, phase: str, timeout: float):
+        super().__init__(f'{phase} of "{moniker}" did not complete within {timeout}s')
+        self.moniker = moniker
+        self.phase = phase
+        self.timeout = timeout
 
 
 class Test:
@@ -14,23 +39,53 @@ class Test:
     teardown() method.  Only the `execute()` method is required \
     to be overridden.
 
+    The time, in nanoseconds, spent within each of these methods during \
+    the most recent execution is kept within ``timing``, keyed by \
+    ``"setup"``, ``"execute"``, and ``"teardown"``, while the ``Verdict`` \
+    of the criteria, including the margin of the value to the nearest \
+    limit, is kept within ``verdict``.
+
+    ``execute()`` may return a NumPy array, or any other array of numbers \
+    which supports the buffer protocol, such as an ``array.array``, in \
+    order to measure many values at once, such as a frequency sweep.  The \
+    value is then kept as a NumPy array, which is rounded and compared to \
+    the criteria element by element, and ``verdict`` contains the indices \
+    of the elements which failed.
+
+    When a ``timeout`` is given, each phase to which it applies is \
+    executed by a separate thread while the test sequence waits for it, \
+    so that an instrument which never responds cannot stall the test \
+    sequence.  When the phase does not complete in time, the remainder of \
+    the phase is skipped, ``timed_out`` names the phase, and \
+    ``PhaseTimeoutError`` is raised to the ``TestSequence``, which fails \
+    the test and tears it down; see ``TestSequence``.  Python cannot stop \
+    the thread, so the method which timed out continues in the background \
+    until it returns, and anything that it returns is discarded.
+
     :param moniker: a shortcut name for this particular test
     :param min_value: the minimum value that is to be considered a pass, \
-    if defined
+    if defined; when ``execute()`` returns an array, this may also be a \
+    sequence containing the minimum of each element
     :param max_value: the maximum value that is to be considered a pass, \
-    if defined
+    if defined; when ``execute()`` returns an array, this may also be a \
+    sequence containing the maximum of each element
     :param pass_if: the value that must be present in order to pass, if defined
     :param significant_figures: the number of significant figures appropriate to the measurement
+    :param timeout: the maximum time, in seconds, for each of the \
+    ``setup()``, ``execute()``, and ``teardown()`` methods, or a ``dict`` \
+    containing the timeout of individual phases, such as \
+    ``{"execute": 5.0}``; None for no timeout
     :param loglevel: the logging level to apply such as `logging.INFO`
     """
 
     def __init__(
         self,
         moniker: str,
-        min_value: Optional[Number] = None,
-        max_value: Optional[Number] = None,
+        min_value: Optional[Number | Sequence[Number]] = None,
+        max_value: Optional[Number | Sequence[Number]] = None,
         pass_if: Optional[Union[str, bool, int]] = None,
         significant_figures: int = 4,
+        timeout: Optional[float | dict[str, float]] = None,
         loglevel=logging.INFO,
     ):
         self._logger = logging.getLogger(self.__class__.__name__)
@@ -45,13 +100,29 @@ class Test:
             criteria["max"] = max_value
 
         self.moniker = moniker
-        self._criteria = criteria if criteria else None
+        self._criteria = None
+        self._evaluate = None
+        self.criteria = criteria
         self._significant_figures = significant_figures
 
+        if timeout is None:
+            timeout = {}
+        elif not isinstance(timeout, dict):
+            timeout = {phase: timeout for phase in PHASES}
+        for phase, seconds in timeout.items():
+            if phase not in PHASES:
+                raise ValueError(f'phase "{phase}" invalid')
+            if seconds is not None and seconds <= 0:
+                raise ValueError(f'timeout "{seconds}" invalid')
+        self.timeouts = {k: v for k, v in timeout.items() if v is not None}
+        self.timed_out = None
+
         self._test_is_passing = None
         self.value = None
+        self.verdict: Optional[Verdict] = None
         self.aborted = False
         self.status = "waiting"
+        self.timing = {}
 
         self.saved_data = {}
 
@@ -67,11 +138,29 @@ class Test:
     @property
     def criteria(self):
         """
-        Returns the test criteria as a `dict`
+        Returns the test criteria as a read-only mapping; the criteria are \
+        changed by assigning a new `dict` to ``criteria``
 
-        :return: test criteria as a `dict`
+        :return: test criteria as a read-only mapping, or None
         """
-        return self._criteria
+        if self._criteria is None:
+            return None
+        return MappingProxyType(self._criteria)
+
+    @criteria.setter
+    def criteria(self, criteria: Optional[dict]):
+        """
+        Replaces the test criteria, such as when the limits are loaded \
+        from a file after the test has been created
+
+        :param criteria: a `dict` which may contain ``pass_if``, ``min``, \
+        and ``max``, or None
+        """
+        criteria = {
+            k: freeze_limit(v) for k, v in (criteria or {}).items() if v is not None
+        }
+        self._criteria = criteria if criteria else None
+        self._evaluate = compile_criteria(self._criteria, self._logger, self.moniker)
 
     def abort(self):
         """
@@ -89,15 +178,27 @@ class Test:
         point, else False
         :return:
         """
-        self._logger.info(f'setting up "{self.moniker}"')
-
-        self._test_is_passing = True
-        self.value = None
-        self.status = "running" if not self.aborted else "aborted"
-
-        self.aborted = False
-        self.setup(is_passing=is_passing)
-        self.status = "running" if not self.aborted else "aborted"
+        start = perf_counter_ns()
+        try:
+            emit(
+                self._logger,
+                logging.INFO,
+                "test_setup",
+                'setting up "{moniker}"',
+                moniker=self.moniker,
+            )
+
+            self._test_is_passing = True
+            self.value = None
+            self.verdict = None
+            self.timed_out = None
+            self.status = "running" if not self.aborted else "aborted"
+
+            self.aborted = False
+            self._call("setup", self.setup, is_passing=is_passing)
+            self.status = "running" if not self.aborted else "aborted"
+        finally:
+            self.timing["setup"] = perf_counter_ns() - start
 
     def _execute(self, is_passing: bool):
         """
@@ -109,64 +210,96 @@ class Test:
         """
         self.status = "running" if not self.aborted else "aborted"
         if self.aborted:
-            self._logger.warning("aborted, not executing")
+            self._emit_aborted("execute")
             return
 
-        self._logger.info(f'executing test "{self.moniker}"')
+        start = perf_counter_ns()
+        try:
+            return self._execute_and_evaluate(is_passing)
+        finally:
+            self.timing["execute"] = perf_counter_ns() - start
+
+    def _execute_and_evaluate(self, is_passing: bool):
+        """
+        Executes the test and applies the criteria to its value.
+
+        :param is_passing: True if the test sequence is passing up to this \
+        point, else False
+        :return: the value
+        """
+        emit(
+            self._logger,
+            logging.INFO,
+            "test_execute",
+            'executing test "{moniker}"',
+            moniker=self.moniker,
+        )
 
         # execute the test and perform appropriate rounding
-        value = self.execute(is_passing=is_passing)
+        value = self._call("execute", self.execute, is_passing=is_passing)
         if isinstance(value, Number):
             try:
-                value = round(value, self._significant_figures)
+                value = round_significant(value, self._significant_figures)
             except ValueError:
-                self._logger.debug(f'could not apply significant digits to "{value}"')
+                emit(
+                    self._logger,
+                    logging.DEBUG,
+                    "rounding_skipped",
+                    'could not apply significant digits to "{value}"',
+                    moniker=self.moniker,
+                    value=value,
+                )
+        else:
+            array = as_array(value)
+            if array is not None:
+                value = round_array(array, self._significant_figures)
         self.value = value
 
-        if self._criteria is not None:
-            if self._criteria.get("pass_if") is not None:
-                if self.value != self._criteria["pass_if"]:
-                    self._logger.warning(
-                        f'"{self.value}" != pass_if requirement '
-                        f'"{self._criteria["pass_if"]}", failing'
-                    )
-                    self.fail()
-                else:
-                    self._logger.info(
-                        f'"{self.value}" == pass_if requirement '
-                        f'"{self._criteria["pass_if"]}"'
-                    )
-
-            if self._criteria.get("min") is not None:
-                if self.value < self._criteria["min"]:
-                    self._logger.warning(
-                        f'"{self.value}" is below the minimum '
-                        f'"{self._criteria["min"]}", failing'
-                    )
-                    self.fail()
-                else:
-                    self._logger.info(
-                        f'"{self.value}" is above the minimum '
-                        f'"{self._criteria["min"]}"'
-                    )
-
-            if self._criteria.get("max") is not None:
-                if self.value > self._criteria["max"]:
-                    self._logger.warning(
-                        f'"{self.value}" is above the maximum '
-                        f'"{self._criteria["max"]}"'
-                    )
-                    self.fail()
-                else:
-                    self._logger.info(
-                        f'"{self.value}" is below the maximum '
-                        f'"{self._criteria["max"]}"'
-                    )
+        if self._evaluate is not None:
+            self.verdict = self._evaluate(value)
+            if not self.verdict.passing:
+                self.fail()
 
         self.status = "running" if not self.aborted else "aborted"
 
         return self.value
 
+    def _call(self, phase: str, method: callable, *args, **kwargs):
+        """
+        Calls ``method``, which is ``phase`` of the test, within a \
+        separate thread when the phase has a timeout.
+
+        :raises PhaseTimeoutError: when the phase does not complete in time
+        """
+        timeout = self.timeouts.get(phase)
+        if timeout is None:
+            return method(*args, **kwargs)
+
+        future = Future()
+
+        def watched():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(method(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        Thread(target=watched, name=f"{self.moniker} {phase}", daemon=True).start()
+        if not wait((future,), timeout).done:
+            self.timed_out = phase
+            raise PhaseTimeoutError(self.moniker, phase, timeout)
+        return future.result()
+
+    def _emit_aborted(self, phase: str):
+        emit(
+            self._logger,
+            logging.WARNING,
+            "test_aborted",
+            "aborted, not executing",
+            moniker=self.moniker,
+            phase=phase,
+        )
+
     def _teardown(self, is_passing: bool):
         """
         Pre-execution method used for logging and housekeeping.
@@ -177,13 +310,23 @@ class Test:
         """
         if self.aborted:
             self.status = "aborted"
-            self._logger.warning("aborted, not executing")
+            self._emit_aborted("teardown")
             return
 
-        self._logger.info(f'tearing down "{self.moniker}"')
-
-        self.teardown(is_passing)
-        self.status = "complete"
+        start = perf_counter_ns()
+        try:
+            emit(
+                self._logger,
+                logging.INFO,
+                "test_teardown",
+                'tearing down "{moniker}"',
+                moniker=self.moniker,
+            )
+
+            self._call("teardown", self.teardown, is_passing)
+            self.status = "complete"
+        finally:
+            self.timing["teardown"] = perf_counter_ns() - start
 
     def reset(self):
         """
@@ -191,6 +334,8 @@ class Test:
         :return: None
         """
         self.status = "waiting"
+        self.timing = {}
+        self.timed_out = None
 
     def save_dict(self, data: dict):
         """
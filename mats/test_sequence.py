@@ -1,28 +1,97 @@
+import asyncio
 import atexit
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from enum import Enum
 import logging
-from threading import Thread
+from threading import BoundedSemaphore, Condition, Lock, Thread
 import traceback
-from time import sleep
+from time import perf_counter, perf_counter_ns
 from typing import Optional
 
-from mats.test import Test
-from mats.archiving import ArchiveManager
-
-# State Machine - Using strings b/c we can relatively easily look
-# for valid substrings to give more information in a concise way.
-# For instance, one may be looking for the substring 'ready', but
-# another function may look for the substring 'abort'.
-# valid states:
-#  - ready
-#  - starting
-#  - setting up
-#  - executing tests
-#  - tearing down
-#  - complete / ready
-#  - aborting
-#  - aborted / ready
-#  - exiting
+from mats.events import emit
+from mats.test import PhaseTimeoutError, Test
+from mats.archiving import ArchiveFanout, ArchiveManager
+
+
+class SequenceState(Enum):
+    """
+    The states of a ``TestSequence``.  The value of each state is the \
+    text which describes it.
+    """
+
+    READY = "ready"
+    STARTING = "starting"
+    SETTING_UP = "setting up"
+    EXECUTING = "executing tests"
+    TEARING_DOWN = "tearing down"
+    COMPLETE = "complete / ready"
+    ABORTING = "aborting"
+    ABORTED = "aborted / ready"
+    EXITING = "exiting"
+
+    @property
+    def ready(self) -> bool:
+        """
+        Returns True when a test sequence may be started from this state
+
+        :return: True or False
+        """
+        return self in _READY_STATES
+
+
+_READY_STATES = frozenset(
+    {SequenceState.READY, SequenceState.COMPLETE, SequenceState.ABORTED}
+)
+
+# the states which may follow each state; a sequence may be closed from
+# any state and aborted from any state in which it is not ready
+_S = SequenceState
+_TRANSITIONS = {
+    _S.READY: frozenset({_S.STARTING, _S.EXITING}),
+    _S.STARTING: frozenset({_S.SETTING_UP, _S.ABORTING, _S.EXITING}),
+    _S.SETTING_UP: frozenset({_S.EXECUTING, _S.ABORTING, _S.EXITING}),
+    _S.EXECUTING: frozenset({_S.TEARING_DOWN, _S.ABORTING, _S.EXITING}),
+    _S.TEARING_DOWN: frozenset({_S.COMPLETE, _S.ABORTING, _S.EXITING}),
+    _S.COMPLETE: frozenset({_S.STARTING, _S.EXITING}),
+    _S.ABORTING: frozenset({_S.ABORTED, _S.EXITING}),
+    _S.ABORTED: frozenset({_S.STARTING, _S.EXITING}),
+    _S.EXITING: frozenset(),
+}
+del _S
+
+# what becomes of the test sequence when a phase of a test times out
+TIMEOUT_POLICIES = ("abort", "fail")
+
+# the line which separates the log of each run of the test sequence
+_SEPARATOR = "-" * 80
+
+
+class _ReadOnlyDict(dict):
+    """
+    A ``dict`` which may not be modified, so that it may be shared with \
+    code running on other threads.  Being a ``dict``, it may still be \
+    converted using ``json.dumps()``.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} may not be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+def _summarize(samples) -> dict:
+    """
+    Returns the ``last``, ``mean``, and ``max`` of a series of durations.
+    """
+    samples = list(samples)
+    return {
+        "last": samples[-1] if samples else None,
+        "mean": sum(samples) / len(samples) if samples else None,
+        "max": max(samples) if samples else None,
+    }
 
 
 class TestSequence:
@@ -36,34 +105,57 @@ class TestSequence:
 
     :param sequence: a list of Tests
     :param archive_manager: an instance of ``ArchiveManager`` which will \
-    contain the path and data_format-specific information
+    contain the path and data_format-specific information, an \
+    ``ArchiveFanout``, or a list of sinks which are saved to at once \
+    using an ``ArchiveFanout``
     :param auto_run: an integer that determines how many times a test \
     sequence will be executed before stopping
     :param callback: function to call on each test sequence completion; \
     callback will be required to accept one parameter, which is the \
     dictionary of values collected over that test iteration
+    :param callback_workers: when greater than zero, the callback is \
+    executed by this many worker threads so that the next test sequence \
+    may begin while it executes; the callback then receives a read-only \
+    snapshot of the values, in which ``failed`` is a tuple
+    :param callback_queue_size: the maximum number of callbacks waiting \
+    to be executed by the workers; the test sequence waits while the \
+    queue is full
     :param setup: function to call before the test sequence
     :param teardown: function to call after the test sequence is complete, \
     even if there was a problem; common to have safety issues addressed here
     :param on_close: function to call when the functionality is complete; \
     for instance, when a GUI closes, test hardware may need to be de-allocated
+    :param archive_timing: when True, the time of each phase of the test \
+    sequence, in nanoseconds, is saved along with the data; see ``timing``
+    :param on_timeout: what becomes of the test sequence when a phase of \
+    a ``Test`` exceeds its ``timeout``; in every case the test fails and \
+    its ``teardown()`` is executed, unless it was the teardown which timed \
+    out, then the test sequence is aborted (``"abort"``) or continues \
+    with the next test (``"fail"``)
     :param loglevel: the logging level
     """
 
     def __init__(
         self,
         sequence: list[Test],
-        archive_manager: Optional[ArchiveManager] = None,
+        archive_manager: Optional[ArchiveManager | ArchiveFanout | list] = None,
         auto_run: Optional[int] = None,
         callback: Optional[callable] = None,
+        callback_workers: int = 0,
+        callback_queue_size: int = 16,
         setup: Optional[callable] = None,
         teardown: Optional[callable] = None,
         on_close: Optional[callable] = None,
+        archive_timing: bool = False,
+        on_timeout: str = "abort",
         loglevel=logging.INFO,
     ):
         self._logger = logging.getLogger(self.__class__.__name__)
         self._logger.setLevel(loglevel)
 
+        if on_timeout not in TIMEOUT_POLICIES:
+            raise ValueError(f'on_timeout "{on_timeout}" invalid')
+
         # protection just in case one or more of the instances contained
         # within the sequence were not instantiated properly, this will
         # instantiate them
@@ -74,14 +166,44 @@ class TestSequence:
         if not TestSequence.__validate_sequence(sequence):
             raise ValueError("test monikers are not uniquely identified")
 
+        if isinstance(archive_manager, (list, tuple)):
+            archive_manager = ArchiveFanout(archive_manager, loglevel=loglevel)
+
         self._sequence = sequence
         self._archive_manager = archive_manager
         self._callback = callback
+        self._callback_executor = None
+        if callback is not None and callback_workers > 0:
+            self._callback_executor = ThreadPoolExecutor(
+                max_workers=callback_workers, thread_name_prefix="callback"
+            )
+            # the executor does not limit its queue, so each callback
+            # holds a slot until it completes
+            self._callback_slots = BoundedSemaphore(
+                callback_queue_size + callback_workers
+            )
+        self._callback_lock = Lock()
+        self._callback_queued = 0
+        self._callback_completed = 0
+        self._callback_failures = 0
+        self._callback_last_error = None
+        self._callback_latencies = deque(maxlen=100)
+        self._callback_durations = deque(maxlen=100)
         self._setup = setup
         self._teardown = teardown
         self._on_close = on_close
         self._auto_run = auto_run
-        self._state = "ready" if not auto_run else "starting"
+        self._archive_timing = archive_timing
+        self._on_timeout = on_timeout
+        self._timing = {}
+        self._last_timing = None
+
+        # the runner waits upon the condition until the state changes
+        self._condition = Condition()
+        self._state = SequenceState.READY if not auto_run else SequenceState.STARTING
+        self._start_requested = perf_counter_ns()
+        self._start_latency = None
+        self._future = Future()
 
         self._test_data = {
             "datetime": str(datetime.now()),
@@ -146,6 +268,15 @@ class TestSequence:
         """
         return [test.moniker for test in self._sequence]
 
+    @property
+    def state(self) -> SequenceState:
+        """
+        Returns the current state of the test sequence
+
+        :return: the ``SequenceState``
+        """
+        return self._state
+
     @property
     def ready(self) -> bool:
         """
@@ -154,7 +285,7 @@ class TestSequence:
 
         :return: True or False
         """
-        return "ready" in self._state
+        return self._state.ready
 
     @property
     def is_passing(self) -> bool:
@@ -172,7 +303,7 @@ class TestSequence:
 
         :return: True or False
         """
-        return "abort" in self._state
+        return self._state in (SequenceState.ABORTING, SequenceState.ABORTED)
 
     @property
     def failed_tests(self) -> list[str]:
@@ -203,13 +334,81 @@ class TestSequence:
 
         :return: True if the test sequence is currently in progress, else False
         """
-        return "ready" not in self._state
+        return not self._state.ready
+
+    @property
+    def start_latency(self) -> Optional[float]:
+        """
+        Returns the time, in seconds, from the most recent call to \
+        ``start()`` until the test sequence began to set up
+
+        :return: the latency, or None before the first test sequence
+        """
+        if self._start_latency is None:
+            return None
+        return self._start_latency / 1e9
+
+    @property
+    def timing(self) -> Optional[dict]:
+        """
+        Returns the time, in nanoseconds, spent within each phase of the \
+        most recent test sequence, which is also found within its result \
+        record.  The ``dict`` contains the sequence ``setup``, the \
+        ``setup``, ``execute``, and ``teardown`` of each test within \
+        ``tests``, the sequence ``teardown``, the ``callback``, the \
+        ``archive``, the ``total``, and the ``overhead`` of the \
+        ``TestSequence`` between the phases.  The phases which were not \
+        executed, such as those following an abort, are absent.
+
+        When ``archive_timing`` is set, the phases which precede the \
+        archive are saved as the columns ``sequence setup ns``, \
+        ``<moniker> execute ns``, and so on.
+
+        :return: a ``dict`` of durations, or None before the first test \
+        sequence has completed
+        """
+        return self._last_timing
+
+    @property
+    def callback_statistics(self) -> dict:
+        """
+        Returns the number of callbacks ``queued`` or executing, \
+        ``completed``, and which raised an exception (``failures``), the \
+        ``last_error``, the ``latency`` from the end of the test sequence \
+        to the completion of recent callbacks, and the ``duration`` of \
+        recent callbacks, each in seconds as ``last``, ``mean``, and ``max``
+
+        :return: a ``dict`` of statistics
+        """
+        with self._callback_lock:
+            return {
+                "queued": self._callback_queued,
+                "completed": self._callback_completed,
+                "failures": self._callback_failures,
+                "last_error": (
+                    None
+                    if self._callback_last_error is None
+                    else str(self._callback_last_error)
+                ),
+                "latency": _summarize(self._callback_latencies),
+                "duration": _summarize(self._callback_durations),
+            }
 
     def close(self):
         """
         Allows higher level code to call the close functionality.
         """
-        self._state = "exiting"
+        with self._condition:
+            # callbacks already dispatched, such as printing a label, finish
+            # while any later callback is executed by the sequence itself
+            executor, self._callback_executor = self._callback_executor, None
+            self._transition(SequenceState.EXITING)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        # archive managers supplied by the user may not have close()
+        close = getattr(self._archive_manager, "close", None)
+        if close is not None:
+            close()
         if self._on_close is not None:
             self._on_close()
 
@@ -228,24 +427,125 @@ class TestSequence:
 
         :return: None
         """
-        if "ready" not in self._state:
-            self._state = "aborting"
-            [test.abort() for test in self._sequence]
+        with self._condition:
+            if self._state.ready or self._state in (
+                SequenceState.ABORTING,
+                SequenceState.EXITING,
+            ):
+                return
+            self._transition(SequenceState.ABORTING)
 
-    def start(self):
+        [test.abort() for test in self._sequence]
+
+    def start(self) -> Future:
         """
         Start a test sequence.  Will only work if a test sequence isn't \
         already in progress.
 
-        :return: None
+        The returned ``Future`` resolves to the result record of the test \
+        sequence once it has completed and the ``TestSequence`` is ready \
+        again; the record is a read-only ``dict`` containing the \
+        ``datetime``, ``pass``, which is ``None`` when the test sequence \
+        was aborted, and the tuple of ``failed`` tests.  The ``Future`` is \
+        cancelled when the ``TestSequence`` is closed before the test \
+        sequence begins.
+
+        .. code-block:: python
+
+            result = ts.start().result()
+
+        :return: a ``Future`` of the test sequence, or of the test \
+        sequence in progress when one is already in progress
         """
-        if self.in_progress:
-            self._logger.warning(
-                "cannot begin another test when test is " "currently in progress"
+        with self._condition:
+            if self.in_progress:
+                emit(
+                    self._logger,
+                    logging.WARNING,
+                    "start_rejected",
+                    "cannot begin another test when test is currently in progress",
+                    state=self._state.value,
+                )
+                return self._future
+
+            self._start_requested = perf_counter_ns()
+            self._future = Future()
+            self._transition(SequenceState.STARTING)
+            return self._future
+
+    async def run(self) -> dict:
+        """
+        Starts a test sequence and waits, without blocking the event loop, \
+        for its result record; see ``start()``.
+
+        .. code-block:: python
+
+            result = await ts.run()
+
+        :return: the result record of the test sequence
+        """
+        return await asyncio.wrap_future(self.start())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the test sequence in progress, along with any runs \
+        remaining due to ``auto_run``, has completed.
+
+        :param timeout: the maximum time, in seconds, to wait, or None to \
+        wait indefinitely
+        :return: True if the ``TestSequence`` is ready, False if the \
+        timeout expired or the ``TestSequence`` was closed
+        """
+
+        def finished():
+            if self._state is SequenceState.EXITING:
+                return True
+            if self._state is SequenceState.ABORTED:
+                return True
+            return self._state.ready and not self._auto_run
+
+        with self._condition:
+            self._condition.wait_for(finished, timeout)
+            return finished() and self._state.ready
+
+    def _transition(self, state: SequenceState) -> bool:
+        """
+        Changes the state of the test sequence and wakes any thread which \
+        waits upon it.  The runner does not leave the ``ABORTING`` or \
+        ``EXITING`` states except to finish the test sequence, since \
+        ``abort()`` and ``close()`` may be called at any time.
+
+        :param state: the new state
+        :return: True if the state was changed, False if the test \
+        sequence is aborting or exiting
+        """
+        with self._condition:
+            if state is self._state:
+                return True
+
+            if state not in _TRANSITIONS[self._state]:
+                if self._state in (SequenceState.ABORTING, SequenceState.EXITING):
+                    return False
+                raise ValueError(
+                    f'cannot change state from "{self._state.value}" '
+                    f'to "{state.value}"'
+                )
+
+            emit(
+                self._logger,
+                logging.DEBUG,
+                "state_changed",
+                'state "{previous}" -> "{state}"',
+                previous=self._state.value,
+                state=state.value,
             )
-            return
+            self._state = state
+            self._condition.notify_all()
+            return True
 
-        self._state = "starting"
+    @property
+    def _stopping(self) -> bool:
+        return self._state in (SequenceState.ABORTING, SequenceState.EXITING)
 
     def _teardown_function(self):
         self._logger.info(
@@ -271,53 +571,93 @@ class TestSequence:
 
         :return: None
         """
-        while self._state != "exiting":
+        while self._state is not SequenceState.EXITING:
             # wait at the ready (unless in auto-run mode)
-            while "ready" in self._state:
-                if self._auto_run and "abort" not in self._state:
-                    self._logger.info(
-                        '"auto_run" flag is set, ' "beginning test sequence"
-                    )
-                    self.start()
-                else:
-                    sleep(0.1)
-
-            if self._state == "exiting":
+            with self._condition:
+                while self._state.ready:
+                    if self._auto_run and self._state is not SequenceState.ABORTED:
+                        emit(
+                            self._logger,
+                            logging.INFO,
+                            "auto_run",
+                            '"auto_run" flag is set, beginning test sequence',
+                            remaining=self._auto_run,
+                        )
+                        self.start()
+                    else:
+                        self._condition.wait()
+
+                self._start_latency = perf_counter_ns() - self._start_requested
+                future = self._future
+
+            if self._state is SequenceState.EXITING:
+                future.cancel()
                 self._sequence_teardown()
                 return
 
-            self._sequence_setup()
-            self._sequence_executing_tests()
-            self._sequence_teardown()
-
-            if "abort" not in self._state:
-                if self._archive_manager is not None:
-                    self._archive_manager.aggregate(
-                        datetime=self._test_data["datetime"],
-                        is_passing=self._test_data["pass"],
-                        failed=self._test_data["failed"],
-                        tests=self._sequence,
-                    )
+            # a future which was cancelled only discards the result
+            future.set_running_or_notify_cancel()
+            begun = perf_counter_ns()
+            self._timing = {}
+            self._test_data = {
+                "datetime": str(datetime.now()),
+                "pass": True,
+                "failed": [],
+            }
+            try:
+                self._timed("setup", self._sequence_setup)
+                self._sequence_executing_tests()
+                if self._stopping:
+                    # including a test sequence aborted before it began
+                    self._test_data["pass"] = None
+                self._sequence_teardown()
+
+                if not self._stopping:
+                    if self._archive_manager is not None:
+                        timing = {}
+                        if self._archive_timing:
+                            timing["timing"] = self._timing_columns()
+
+                        self._timed(
+                            "archive",
+                            self._archive_manager.aggregate,
+                            datetime=self._test_data["datetime"],
+                            is_passing=self._test_data["pass"],
+                            failed=self._test_data["failed"],
+                            tests=self._sequence,
+                            **timing,
+                        )
+            except BaseException as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+                raise
 
             if self._auto_run:
                 self._auto_run -= 1
 
-            if "abort" in self._state:
-                self._state = "aborted / ready"
-            else:
-                self._state = "complete / ready"
+            self._last_timing = self._collect_timing(perf_counter_ns() - begun)
+            record = self._snapshot(self._last_timing)
+            with self._condition:
+                if self._state is SequenceState.ABORTING:
+                    self._transition(SequenceState.ABORTED)
+                else:
+                    self._transition(SequenceState.COMPLETE)
+
+            if not future.cancelled():
+                future.set_result(record)
 
     def _sequence_setup(self):
-        if "abort" in self._state:
+        if not self._transition(SequenceState.SETTING_UP):
             return
 
-        self._state = "setting up"
-        self._logger.info("-" * 80)
-        self._test_data = {
-            "datetime": str(datetime.now()),
-            "pass": True,
-            "failed": [],
-        }
+        emit(
+            self._logger,
+            logging.INFO,
+            "sequence_started",
+            _SEPARATOR,
+            datetime=self._test_data["datetime"],
+            tests=len(self._sequence),
+        )
 
         self._current_test_number = 0
 
@@ -328,16 +668,21 @@ class TestSequence:
             self._setup()
 
     def _sequence_executing_tests(self):
-        if "abort" in self._state:
+        if not self._transition(SequenceState.EXECUTING):
             return
 
         # begin the test sequence
         for i, test in enumerate(self._sequence):
             self._current_test_number = i
 
-            if "abort" in self._state:
-                self._logger.warning(
-                    f"abort detected on test " f"{i}, exiting test sequence"
+            if self._stopping:
+                emit(
+                    self._logger,
+                    logging.WARNING,
+                    "sequence_aborted",
+                    "abort detected on test {index}, exiting test sequence",
+                    index=i,
+                    moniker=test.moniker,
                 )
                 break
 
@@ -345,6 +690,10 @@ class TestSequence:
 
             try:
                 test._setup(is_passing=self.is_passing)
+            except PhaseTimeoutError as e:
+                if self._timed_out(test, e):
+                    break
+                continue
             except Exception as e:
                 self._logger.critical(
                     f"critical error during " f'setup of "{test}": {e}'
@@ -359,6 +708,10 @@ class TestSequence:
 
             try:
                 test._execute(is_passing=self.is_passing)
+            except PhaseTimeoutError as e:
+                if self._timed_out(test, e):
+                    break
+                continue
             except Exception as e:
                 self._logger.critical(
                     f"critical error during " f'execution of "{test}": {e}'
@@ -374,6 +727,10 @@ class TestSequence:
 
             try:
                 test._teardown(is_passing=self.is_passing)
+            except PhaseTimeoutError as e:
+                if self._timed_out(test, e):
+                    break
+                continue
             except Exception as e:
                 self._logger.critical(
                     f"critical error during " f'teardown of "{test}": {e}'
@@ -390,8 +747,44 @@ class TestSequence:
                 self._test_data["pass"] = False
                 self._test_data["failed"].append(test.moniker)
 
-        if "abort" in self._state:
-            self._test_data["pass"] = None
+    def _timed_out(self, test: Test, error: PhaseTimeoutError) -> bool:
+        """
+        Fails a test of which a phase timed out, tears the test down, and \
+        applies the ``on_timeout`` policy.
+
+        :param test: the test
+        :param error: the exception raised by the test
+        :return: True if the test sequence is to stop
+        """
+        emit(
+            self._logger,
+            logging.ERROR,
+            "test_timeout",
+            "{error}",
+            moniker=test.moniker,
+            phase=error.phase,
+            timeout=error.timeout,
+            error=error,
+        )
+        test.fail()
+
+        if error.phase != "teardown":
+            try:
+                test._teardown(is_passing=self.is_passing)
+            except Exception as e:
+                self._logger.critical(
+                    f"critical error during " f'teardown of "{test}": {e}'
+                )
+                self._logger.critical(str(traceback.format_exc()))
+
+        self._test_data["pass"] = False
+        self._test_data["failed"].append(test.moniker)
+
+        if self._on_timeout == "abort":
+            self.abort()
+            test.status = "aborted"
+            return True
+        return False
 
     def _sequence_teardown(self):
         """
@@ -399,15 +792,28 @@ class TestSequence:
         sequence, along with user callbacks.
         :return:
         """
-        if "abort" not in self._state:
-            self._state = "tearing down"
-
-        self._logger.info("test sequence complete")
-        self._logger.debug(f"test results: {self._test_data}")
+        self._transition(SequenceState.TEARING_DOWN)
+
+        emit(
+            self._logger,
+            logging.INFO,
+            "sequence_complete",
+            "test sequence complete",
+            datetime=self._test_data["datetime"],
+            passing=self._test_data["pass"],
+            failed=tuple(self._test_data["failed"]),
+        )
+        emit(
+            self._logger,
+            logging.DEBUG,
+            "sequence_results",
+            "test results: {results}",
+            results=self._test_data,
+        )
 
         if self._teardown is not None:
             try:
-                self._teardown()
+                self._timed("teardown", self._teardown)
             except Exception as e:
                 self._logger.critical(
                     f"an exception has occurred which "
@@ -416,12 +822,145 @@ class TestSequence:
                 )
 
         if self._callback is not None:
-            self._logger.info(
-                f"executing user-supplied callback function " f'"{self._callback}"'
-            )
-            try:
-                self._callback(self._test_data)
-            except Exception as e:
-                self._logger.warning(
-                    f"an exception occurred during the callback sequence: {e}"
+            self._timed("callback", self._dispatch_callback)
+
+    def _timed(self, phase: str, function: callable, *args, **kwargs):
+        """
+        Executes ``function``, recording the time that it takes as \
+        ``phase`` of the current test sequence.
+        """
+        start = perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._timing[phase] = perf_counter_ns() - start
+
+    def _collect_timing(self, total: int) -> dict:
+        """
+        Combines the time of each phase of the sequence with the time of \
+        each phase of its tests.
+
+        :param total: the time of the whole test sequence, in nanoseconds
+        :return: the ``dict`` described by ``timing``
+        """
+        tests = {test.moniker: dict(test.timing) for test in self._sequence}
+        measured = sum(self._timing.values()) + sum(
+            sum(phases.values()) for phases in tests.values()
+        )
+
+        # the sequence setup remains ahead of the tests
+        return {
+            "setup": self._timing["setup"],
+            "tests": tests,
+            **self._timing,
+            "total": total,
+            "overhead": total - measured,
+        }
+
+    def _timing_columns(self) -> dict:
+        """
+        Returns the time of each phase which precedes the archive, as the \
+        columns which are saved when ``archive_timing`` is set.
+        """
+        columns = {"sequence setup ns": self._timing.get("setup")}
+        for test in self._sequence:
+            for phase in ("setup", "execute", "teardown"):
+                columns[f"{test.moniker} {phase} ns"] = test.timing.get(phase)
+        for phase in ("teardown", "callback"):
+            columns[f"sequence {phase} ns"] = self._timing.get(phase)
+        return columns
+
+    def _snapshot(self, timing: Optional[dict] = None) -> dict:
+        """
+        Returns a read-only copy of the test data, along with the timing \
+        of the test sequence when supplied.
+        """
+        snapshot = {**self._test_data, "failed": tuple(self._test_data["failed"])}
+        if timing is not None:
+            snapshot["timing"] = timing
+        return _ReadOnlyDict(snapshot)
+
+    def _dispatch_callback(self):
+        """
+        Executes the user-supplied callback, or passes it to the callback \
+        workers along with a read-only snapshot of the test data.
+        """
+        if self._callback_executor is not None:
+            snapshot = self._snapshot()
+
+            if not self._callback_slots.acquire(blocking=False):
+                emit(
+                    self._logger,
+                    logging.WARNING,
+                    "callback_queue_full",
+                    "callback queue is full, waiting",
                 )
+                self._callback_slots.acquire()
+
+            # close() detaches the executor under the same lock, so it is
+            # never shut down between this test and the submission
+            with self._condition:
+                executor = self._callback_executor
+                if executor is not None:
+                    emit(
+                        self._logger,
+                        logging.INFO,
+                        "callback_dispatched",
+                        'dispatching user-supplied callback function "{callback}"',
+                        callback=self._callback,
+                    )
+                    with self._callback_lock:
+                        self._callback_queued += 1
+                    executor.submit(
+                        self._execute_callback, snapshot, perf_counter(), True
+                    )
+                    return
+
+            self._callback_slots.release()
+
+        emit(
+            self._logger,
+            logging.INFO,
+            "callback_started",
+            'executing user-supplied callback function "{callback}"',
+            callback=self._callback,
+        )
+        self._execute_callback(self._test_data, perf_counter())
+
+    def _execute_callback(self, data: dict, dispatched: float, queued: bool = False):
+        """
+        Executes the user-supplied callback, recording its latency and any \
+        exception which it raises.
+
+        :param data: the test data
+        :param dispatched: the ``perf_counter()`` when the test sequence \
+        completed
+        :param queued: True when executed by the callback workers
+        """
+        start = perf_counter()
+        error = None
+        try:
+            self._callback(data)
+        except Exception as e:
+            error = e
+            emit(
+                self._logger,
+                logging.WARNING,
+                "callback_failed",
+                "an exception occurred during the callback sequence: {error}",
+                error=e,
+            )
+
+        end = perf_counter()
+        with self._callback_lock:
+            if queued:
+                self._callback_queued -= 1
+            self._callback_completed += 1
+            if error is not None:
+                self._callback_failures += 1
+                self._callback_last_error = error
+            self._callback_latencies.append(end - dispatched)
+            self._callback_durations.append(end - start)
+
+        if queued:
+            self._callback_slots.release()
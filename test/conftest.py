@@ -0,0 +1,47 @@
+"""
+Fixtures shared by the automated test suite for the Automated Test
+Environment.
+"""
+from pathlib import Path
+from os import remove
+from shutil import rmtree
+
+import pytest
+
+
+@pytest.fixture
+def data_point():
+    """
+    Returns a function which builds the data point saved by execution ``i`` \
+    of a test sequence, in the form supplied to ``ArchiveManager.save()``. \
+    Keyword arguments replace or add the value of a column, such as \
+    ``serial=f'SN{i}'``, while ``limit`` replaces the maximum of ``flow``.
+    """
+    def point(i, limit=6.4, **columns):
+        point = {
+            'datetime': {'value': f'2022-05-26 10:00:{i:02}'},
+            'pass': {'value': True},
+            'failed': {'value': []},
+            'flow': {'value': 5.5 + i, 'criteria': {'min': 5.6, 'max': limit}},
+        }
+        point.update({heading: {'value': v} for heading, v in columns.items()})
+        return point
+
+    return point
+
+
+@pytest.fixture
+def clean():
+    """
+    Removes the data files which a test leaves behind, along with their \
+    companion files, spills, spools, and blobs.
+    """
+    yield
+
+    rmtree('blobs', ignore_errors=True)
+    for p in Path('.').iterdir():
+        if not p.is_file():
+            continue
+        if any(name in p.name for name in ('data', 'merged', 'upload.spool')) \
+                or p.suffix == '.spill':
+            remove(p)
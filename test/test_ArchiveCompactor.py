@@ -0,0 +1,126 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``ArchiveCompactor`` class.
+"""
+from pathlib import Path
+from shutil import copy
+
+import pytest
+
+import mats
+from mats.archiving import ArchiveCompactor, compact_archives
+from mats.archiving.compression import compress_file
+
+
+@pytest.fixture
+def rotated(clean, data_point):
+    """Data files moved aside each time that the limits changed."""
+    # every other execution failed
+    with mats.ArchiveManager(data_format=0) as am:
+        for i in range(0, 3):
+            am.save(data_point(i, failed=[] if i % 2 else ['flow']))
+        for i in range(3, 6):
+            am.save(data_point(i, limit=7.0, failed=[] if i % 2 else ['flow']))
+
+    with mats.ArchiveManager(data_format=1, fname='data1.txt',
+                             preamble='station 4') as am:
+        for i in range(6, 9):
+            am.save(data_point(i, failed=[] if i % 2 else ['flow'], serial=f'SN{i}'))
+
+    yield sorted(p for p in Path('.').iterdir()
+                 if 'data' in str(p) and '.txt' in p.name)
+
+
+def test_ac_merge(rotated):
+    summary = compact_archives(rotated, 'merged.txt', processes=2)
+    assert summary == {'files': 3, 'rows': 9, 'duplicates': 0}
+
+    reader = mats.ArchiveReader('merged.txt')
+    assert reader.data_format == 1
+    assert reader.headings == ['datetime', 'pass', 'failed', 'flow', 'serial']
+
+    rows = list(reader)
+    assert [r['flow']['value'] for r in rows] == [5.5 + i for i in range(9)]
+    assert rows[0]['flow']['criteria'] == {'min': 5.6, 'max': 6.4}
+    assert rows[4]['flow']['criteria'] == {'min': 5.6, 'max': 7.0}
+    assert rows[0]['failed']['value'] == ['flow']
+    assert rows[0]['serial']['value'] is None
+    assert rows[8]['serial']['value'] == 'SN8'
+
+
+def test_ac_duplicates(rotated):
+    copy(rotated[0], 'data_copy.txt')
+
+    summary = compact_archives(rotated + [Path('data_copy.txt')], 'merged.txt')
+    assert summary['duplicates'] == 3
+    assert len(list(mats.ArchiveReader('merged.txt'))) == 9
+
+
+def test_ac_incremental(rotated, data_point):
+    compactor = ArchiveCompactor('merged.txt', processes=1)
+    compactor.compact(rotated[:1])
+    assert compactor.pending(rotated) == rotated[1:]
+
+    # the later files contain columns that the output does not
+    summary = compactor.compact(rotated)
+    assert summary['files'] == 2
+
+    summary = ArchiveCompactor('merged.txt').compact(rotated)
+    assert summary == {'files': 0, 'rows': 0, 'duplicates': 0}
+
+    # rows added to a file which was merged are found by the next run
+    with mats.ArchiveManager(data_format=1, fname='data1.txt',
+                             preamble='station 4') as am:
+        am.save(data_point(9, serial='SN9'))
+
+    summary = ArchiveCompactor('merged.txt').compact(rotated)
+    assert summary == {'files': 1, 'rows': 1, 'duplicates': 3}
+
+    rows = list(mats.ArchiveReader('merged.txt'))
+    assert [r['flow']['value'] for r in rows] == [5.5 + i for i in range(10)]
+
+
+def test_ac_compressed(rotated):
+    paths = [compress_file(rotated[0])] + rotated[1:]
+
+    summary = compact_archives(paths, 'merged.txt')
+    assert summary['rows'] == 9
+
+
+def test_ac_unreadable(rotated):
+    with open('data_bad.txt', 'wb') as f:
+        f.write(b'\xff\xfe\x00\n')
+
+    compactor = ArchiveCompactor('merged.txt')
+    summary = compactor.compact(rotated + [Path('data_bad.txt')])
+    assert summary['files'] == 3
+
+    # the file is attempted again by the next run
+    assert compactor.pending([Path('data_bad.txt')]) == [Path('data_bad.txt')]
+
+
+def test_ac_criteria_blocks(rotated):
+    summary = compact_archives(rotated, 'merged.txt', data_format=4)
+    assert summary['rows'] == 9
+
+    reader = mats.ArchiveReader('merged.txt')
+    assert reader.data_format == 4
+
+    rows = list(reader)
+    assert [r['flow']['criteria']['max'] for r in rows] == [6.4] * 3 + [7.0] * 3 + [6.4] * 3
+
+
+def test_ac_sqlite(rotated):
+    summary = compact_archives(rotated, 'merged.db', data_format=2)
+    assert summary['rows'] == 9
+
+    with mats.SqliteArchive('merged.db') as database:
+        results = database.results('flow')
+    assert len(results) == 9
+    assert results[0]['criteria'] == {'min': 5.6, 'max': 6.4}
+
+
+def test_ac_invalid_format():
+    with pytest.raises(ValueError):
+        ArchiveCompactor('merged.txt', data_format=0)
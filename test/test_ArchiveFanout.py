@@ -0,0 +1,134 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``ArchiveFanout`` and ``ArchiveSink`` \
+classes.
+"""
+from pathlib import Path
+from threading import Event
+from time import monotonic
+
+import pytest
+
+import mats
+from mats.archiving import ArchiveFanout, ArchiveSink
+
+
+class _Target:
+    """A sink target which waits for ``gate`` before each save."""
+
+    def __init__(self, gate=None, fail=False):
+        self.gate = gate
+        self.fail = fail
+        self.points = []
+        self.closed = False
+
+    def save(self, point):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail:
+            raise OSError('historian unavailable')
+        self.points.append(point)
+
+    def close(self):
+        self.closed = True
+
+
+def test_af_every_sink(clean, data_point):
+    fanout = ArchiveFanout([
+        mats.ArchiveManager(data_format=1),
+        mats.ArchiveManager(data_format=2),
+    ])
+    for i in range(5):
+        fanout.save(data_point(i))
+    fanout.close()
+
+    assert len(list(mats.read_archive('data.txt'))) == 5
+    with mats.SqliteArchive('data.db') as database:
+        assert len(database.results('flow')) == 5
+
+    assert list(fanout.statistics) == ['ArchiveManager', 'ArchiveManager-2']
+    assert fanout.statistics['ArchiveManager-2']['saved'] == 5
+
+
+def test_af_record_read_only(data_point):
+    target = _Target()
+    point = data_point(0)
+    with ArchiveFanout([target]) as fanout:
+        fanout.save(point)
+    point['flow']['criteria']['max'] = 7.0
+
+    record = target.points[0]
+    with pytest.raises(TypeError):
+        record['flow']['value'] = 1.0
+    assert record['flow']['criteria'] == {'min': 5.6, 'max': 6.4}
+    assert target.closed
+
+
+def test_af_failing_sink_isolated(data_point):
+    failing, working = _Target(fail=True), _Target()
+    with ArchiveFanout([ArchiveSink(failing, name='historian'), working]) as fanout:
+        for i in range(3):
+            fanout.save(data_point(i))
+
+    assert len(working.points) == 3
+    assert fanout.statistics['historian']['errors'] == 3
+    assert fanout.statistics['historian']['last_error'] == 'historian unavailable'
+
+
+def test_af_drop(data_point):
+    gate = Event()
+    slow, fast = _Target(gate), _Target()
+    fanout = ArchiveFanout([ArchiveSink(slow, queue_size=2, policy='drop'), fast])
+
+    start = monotonic()
+    for i in range(10):
+        fanout.save(data_point(i))
+    assert monotonic() - start < 1.0
+
+    gate.set()
+    fanout.close()
+
+    statistics = fanout.sinks[0].statistics
+    assert statistics['dropped'] > 0
+    assert statistics['saved'] + statistics['dropped'] == 10
+    assert len(fast.points) == 10
+
+
+def test_af_spill(clean, data_point):
+    gate = Event()
+    target = _Target(gate)
+    sink = ArchiveSink(target, queue_size=2, policy='spill', spill_path='flow.spill')
+    for i in range(10):
+        sink.put(data_point(i))
+    assert sink.statistics['spilled'] > 0
+
+    gate.set()
+    sink.close()
+
+    # records are saved in the order received
+    assert [p['flow']['value'] for p in target.points] == [5.5 + i for i in range(10)]
+    assert Path('flow.spill').stat().st_size == 0
+
+
+def test_af_spill_recovered(clean, data_point):
+    # the target of the abandoned sink never completes a save
+    abandoned = ArchiveSink(_Target(Event()), queue_size=1, policy='spill',
+                            spill_path='flow.spill')
+    for i in range(5):
+        abandoned.put(data_point(i))
+    spilled = abandoned.statistics['spill_backlog']
+    assert spilled >= 3
+
+    # a sink created after the process ended saves the spilled records
+    target = _Target()
+    with ArchiveSink(target, policy='spill', spill_path='flow.spill'):
+        pass
+    assert len(target.points) == spilled
+
+
+def test_af_invalid_policy():
+    with pytest.raises(ValueError):
+        ArchiveSink(_Target(), policy='ignore')
+    with pytest.raises(ValueError):
+        ArchiveSink(_Target(), policy='spill')
@@ -0,0 +1,114 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``ArchiveIndex`` class along with the \
+index maintained by the ``ArchiveManager``.
+"""
+from datetime import datetime
+from pathlib import Path
+from os import remove
+
+import pytest
+
+import mats
+from mats.archiving import ArchiveIndex
+
+
+def _data_files():
+    return sorted(f for f in Path('.').iterdir() if 'data' in str(f))
+
+
+@pytest.fixture(params=[(0, False), (1, False), (1, True), (4, False)])
+def archive(request, clean, data_point):
+    data_format, persistent = request.param
+
+    with mats.ArchiveManager(data_format=data_format, persistent=persistent,
+                             index_keys=['serial']) as am:
+        for i in range(12):
+            # four executions each hour, of three serial numbers in turn
+            when = datetime(2022, 5, 26, 10 + i // 4, i % 4 * 15)
+            am.save(data_point(i, datetime=str(when), serial=f'SN{i % 3}'))
+
+    yield mats.ArchiveReader('data.txt')
+
+
+def test_ai_created(archive):
+    with open('data.txt.idx', 'r') as f:
+        lines = f.readlines()
+
+    assert lines[0] == 'offset\tdatetime\tserial\n'
+    assert len(lines) == 13
+
+
+def test_ai_search_keys(archive):
+    rows = list(archive.search(keys={'serial': 'SN1'}))
+    assert [r['flow']['value'] for r in rows] == [6.5, 9.5, 12.5, 15.5]
+    assert rows[0]['flow']['criteria'] == {'min': 5.6, 'max': 6.4}
+
+
+def test_ai_search_datetime(archive):
+    rows = list(archive.search(start=datetime(2022, 5, 26, 11),
+                               end=datetime(2022, 5, 26, 11, 59)))
+    assert [r['flow']['value'] for r in rows] == [9.5, 10.5, 11.5, 12.5]
+
+    rows = list(archive.search(start=datetime(2022, 5, 26, 11),
+                               end=datetime(2022, 5, 26, 11, 59),
+                               keys={'serial': 'SN0'}))
+    assert [r['flow']['value'] for r in rows] == [11.5]
+
+
+def test_ai_search_not_indexed(archive):
+    rows = list(archive.search(keys={'flow': 6.5}))
+    assert len(rows) == 1
+
+
+def test_ai_rebuilt_when_lost(archive):
+    remove('data.txt.idx')
+
+    rows = list(archive.search(keys={'serial': 'SN2'}))
+    assert len(rows) == 4
+    assert Path('data.txt.idx').exists()
+
+
+def test_ai_catches_up(archive, data_point):
+    """Rows written without the index are indexed on the next save."""
+    with mats.ArchiveManager(data_format=archive.data_format) as am:
+        am.save(data_point(12, datetime='2022-05-26 13:00:00', serial='SN0'))
+
+    with mats.ArchiveManager(data_format=archive.data_format,
+                             index_keys=['serial']) as am:
+        am.save(data_point(13, datetime='2022-05-26 13:15:00', serial='SN1'))
+
+    rows = list(mats.ArchiveReader('data.txt').search(keys={'serial': 'SN0'}))
+    assert [r['flow']['value'] for r in rows] == [5.5, 8.5, 11.5, 14.5, 17.5]
+
+
+def test_ai_partial_entry(archive):
+    with open('data.txt.idx', 'a') as f:
+        f.write('123\t2022')
+
+    index = ArchiveIndex('data.txt', keys=['serial'])
+    index.open()
+    index.close()
+
+    assert len(index.offsets()) == 12
+
+
+def test_ai_rotates_with_data(clean, data_point):
+    with mats.ArchiveManager(data_format=0, index_keys=[], rotate_rows=5) as am:
+        for i in range(12):
+            am.save(data_point(i))
+
+    paths = _data_files()
+    assert len([p for p in paths if p.suffix == '.idx']) == 3
+
+    for p in paths:
+        if p.suffix != '.idx':
+            rows = list(mats.ArchiveReader(p).search())
+            assert len(rows) == len(list(mats.ArchiveReader(p)))
+
+
+def test_ai_unknown_key(archive):
+    index = ArchiveIndex('data.txt', keys=['serial'])
+    with pytest.raises(KeyError):
+        index.offsets(keys={'flow': 1})
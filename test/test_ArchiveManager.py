@@ -3,8 +3,13 @@ Automated test suite for the Automated Test Environment.
 
 This file focuses on testing the ``ArchiveManager`` class.
 """
+from datetime import date, timedelta
+from multiprocessing import Process
+import gzip
+import lzma
 from pathlib import Path
 from os import remove
+from time import sleep
 
 import pint
 import pytest
@@ -56,7 +61,9 @@ def am1():
 def am2():
     path = Path('.')
 
-    yield mats.ArchiveManager(path=path, data_format=2)
+    am = mats.ArchiveManager(path=path, data_format=2)
+    yield am
+    am.close()
 
     data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
     for p in data_paths:
@@ -96,8 +103,75 @@ def test_am2_save(am2):
     length = 5
 
     for _ in range(length):
-        with pytest.raises(ValueError):
-            am2.save(data_point_1)
+        am2.save(data_point_1)
+
+    assert Path('data.db').exists()
+
+    results = am2._database.results('t1')
+    assert len(results) == length
+    assert results[0]['value'] == 10
+
+
+def test_am_invalid_format_save():
+    am = mats.ArchiveManager(data_format=99)
+
+    with pytest.raises(ValueError):
+        am.save(data_point_1)
+
+
+def test_am2_save_with_criteria(am2):
+    am2.save(data_point_3)
+    am2.save(data_point_3)
+    am2.close()
+
+    with mats.SqliteArchive('data.db') as db:
+        results = db.results('t2', limit=1)
+        assert len(results) == 1
+        assert results[0]['criteria'] == {'min': 9.0, 'max': 11.0}
+
+        # pint values are stored using their magnitude
+        assert db.results('t4')[0]['value'] == 1
+
+
+def test_am2_save_new_header(am2):
+    """Schema changes are recorded within the database, not a new file."""
+    length = 5
+
+    for _ in range(length):
+        am2.save(data_point_1)
+
+    for _ in range(length):
+        am2.save(data_point_2)
+
+    am2.close()
+
+    assert not [f for f in Path('.').iterdir()
+                if 'data_' in str(f)]
+
+    with mats.SqliteArchive('data.db') as db:
+        assert len(db.results('t1')) == 2 * length
+        assert len(db.results('t4')) == length
+
+        schemas = db._conn.execute('SELECT COUNT(*) FROM schemas').fetchone()
+        assert schemas[0] == 2
+
+
+def test_am2_asynchronous_aggregate():
+    length = 20
+    t1 = _T('t1', min_value=0.0)
+    t1.value = 1.0
+
+    am = mats.ArchiveManager(data_format=2, asynchronous=True)
+    for _ in range(length):
+        _aggregate(am, [t1])
+    am.close()
+
+    with mats.SqliteArchive('data.db') as db:
+        assert len(db.results('t1')) == length
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    for p in data_paths:
+        remove(p)
 
 
 def test_am0_save_with_criteria(am0):
@@ -154,3 +228,440 @@ def test_am1_save_new_header(am1):
     for p in data_paths:
         with open(p, 'r') as f:
             assert len(f.readlines()) == (length + 1)
+
+
+def test_am4_save_with_criteria():
+    point = {'t1': {'value': 10},
+             't2': {'value': 10.0, 'criteria': {'min': 9.0, 'max': 11.0}},
+             't5': {'value': True, 'criteria': {'pass_if': True}}}
+
+    with mats.ArchiveManager(data_format=4, persistent=True) as am:
+        am.save(point)
+        am.save(point)
+
+        # only a change of the criteria writes a new block, even when the
+        # criteria are modified in place
+        point['t2']['criteria']['min'] = 9.5
+        am.save(point)
+        am.save(point)
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    assert data_paths == [Path('data.txt')]
+
+    with Path('data.txt').open('r') as f:
+        lines = f.readlines()
+
+    assert lines[0] == 't1\tt2\tt5\n'
+    assert [line.startswith('#criteria\t') for line in lines[1:]] == \
+           [True, False, False, True, False, False]
+    assert lines[2] == '10\t10.0\tTrue\n'
+
+    rows = list(mats.ArchiveReader('data.txt'))
+    assert [r['t2']['criteria']['min'] for r in rows] == [9.0, 9.0, 9.5, 9.5]
+
+    remove('data.txt')
+
+
+@pytest.fixture
+def am0_persistent():
+    path = Path('.')
+
+    am = mats.ArchiveManager(path=path, data_format=0, persistent=True)
+    yield am
+    am.close()
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    for p in data_paths:
+        remove(p)
+
+
+def test_am0_persistent_save(am0_persistent):
+    length = 5
+
+    for _ in range(length):
+        am0_persistent.save(data_point_1)
+
+    # rows are flushed as they are written, even while the handle is open
+    with open(Path('data.txt'), 'r') as f:
+        assert len(f.readlines()) == (length + 2)
+
+    am0_persistent.close()
+    assert am0_persistent._file is None
+
+
+def test_am0_persistent_reuses_handle(am0_persistent):
+    am0_persistent.save(data_point_1)
+    handle = am0_persistent._file
+
+    am0_persistent.save(data_point_1)
+    assert am0_persistent._file is handle
+
+
+def test_am0_persistent_save_new_header(am0_persistent):
+    length = 5
+
+    for _ in range(length):
+        am0_persistent.save(data_point_1)
+
+    for _ in range(length):
+        am0_persistent.save(data_point_2)
+
+    am0_persistent.close()
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    assert len(data_paths) == 2
+
+    for p in data_paths:
+        with open(p, 'r') as f:
+            assert len(f.readlines()) == (length + 2)
+
+
+def test_am1_persistent_context_manager():
+    length = 5
+
+    with mats.ArchiveManager(data_format=1, persistent=True) as am:
+        for _ in range(length):
+            am.save(data_point_1)
+
+    assert am._file is None
+
+    with open(Path('data.txt'), 'r') as f:
+        assert len(f.readlines()) == (length + 1)
+
+    remove(Path('data.txt'))
+
+
+class _T(mats.Test):
+    def __init__(self, moniker, **kwargs):
+        super().__init__(moniker, **kwargs)
+
+    def execute(self, is_passing):
+        return 1.0
+
+
+def _aggregate(am, tests):
+    am.aggregate(datetime='2022-05-26 01:04:17.221758',
+                 is_passing=True,
+                 failed=[],
+                 tests=tests)
+
+
+def test_am0_aggregate_saved_data(am0):
+    t = _T('t1')
+    t.value = 1.0
+    t.save_dict({'serial': 'abc123'})
+    _aggregate(am0, [t])
+
+    with open(Path('data.txt'), 'r') as f:
+        lines = f.readlines()
+
+    assert lines[-2].split('\t')[-1].strip() == 'serial'
+    assert lines[-1].split('\t')[-1].strip() == 'abc123'
+
+
+def test_am0_asynchronous_aggregate():
+    length = 50
+    t1, t2 = _T('t1'), _T('t2', min_value=0.0)
+    t1.value, t2.value = 1.0, 2.0
+
+    am = mats.ArchiveManager(data_format=0, asynchronous=True,
+                             persistent=True, queue_size=8)
+    for _ in range(length):
+        _aggregate(am, [t1, t2])
+
+    am.close()
+    assert am.pending == 0
+
+    with open(Path('data.txt'), 'r') as f:
+        assert len(f.readlines()) == (length + 3)
+
+    remove(Path('data.txt'))
+
+
+def test_am0_asynchronous_snapshot():
+    """Changes to a test after aggregation must not alter the queued row."""
+    t1 = _T('t1', min_value=0.0)
+    t1.value = 1.0
+
+    am = mats.ArchiveManager(data_format=1, asynchronous=True)
+    _aggregate(am, [t1])
+    t1.value = 2.0
+    t1._criteria['min'] = 5.0
+    am.close()
+
+    with open(Path('data.txt'), 'r') as f:
+        row = f.readlines()[-1].strip().split('\t')
+
+    assert row[-2:] == ['1.0', '0.0']
+
+    remove(Path('data.txt'))
+
+
+def test_am0_fsync_rows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(mats.archiving.manager, 'fsync', lambda fd: calls.append(fd))
+
+    am = mats.ArchiveManager(data_format=0, persistent=True, fsync_rows=2)
+    for _ in range(5):
+        am.save(data_point_1)
+    assert len(calls) == 2
+
+    # the remaining row is forced to disk when closed
+    am.close()
+    assert len(calls) == 3
+
+    remove(Path('data.txt'))
+
+
+def test_am0_fsync_interval(monkeypatch):
+    calls = []
+    monkeypatch.setattr(mats.archiving.manager, 'fsync', lambda fd: calls.append(fd))
+
+    am = mats.ArchiveManager(data_format=0, asynchronous=True,
+                             fsync_interval=0.05)
+    t1 = _T('t1')
+    t1.value = 1.0
+    _aggregate(am, [t1])
+
+    # the background thread forces data to disk once the interval passes
+    # even when no further rows arrive
+    for _ in range(40):
+        if calls:
+            break
+        sleep(0.05)
+    assert len(calls) >= 1
+
+    am.close()
+    remove(Path('data.txt'))
+
+
+@pytest.fixture
+def am3():
+    path = Path('.')
+
+    am = mats.ArchiveManager(path=path, data_format=3)
+    yield am
+    am.close()
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    for p in data_paths:
+        remove(p)
+
+
+def test_am3_save(am3):
+    length = 5
+
+    for _ in range(length):
+        am3.save(data_point_3)
+
+    with open(Path('data.bin'), 'rb') as f:
+        assert f.readline() == mats.archiving.columnar.MAGIC
+        f.readline()
+        assert len(f.read()) == length * am3._schema.size
+
+
+def test_am3_save_new_header(am3):
+    length = 5
+
+    for _ in range(length):
+        am3.save(data_point_1)
+
+    for _ in range(length):
+        am3.save(data_point_2)
+
+    am3.close()
+
+    data_paths = [f for f in Path('.').iterdir()
+                  if 'data' in str(f) and f.suffix == '.bin']
+    assert len(data_paths) == 2
+
+    # each data file is accompanied by its own string table
+    for p in data_paths:
+        assert p.with_name(p.name + '.strings').exists()
+
+
+def test_am3_value_type_change(am3):
+    """A value which cannot be stored in the existing column starts a new file."""
+    am3.save({'t1': {'value': 10}})
+    am3.save({'t1': {'value': None}})
+    am3.save({'t1': {'value': 'string 10'}})
+    am3.close()
+
+    data_paths = [f for f in Path('.').iterdir()
+                  if 'data' in str(f) and f.suffix == '.bin']
+    assert len(data_paths) == 2
+
+
+def _data_files():
+    return sorted(f for f in Path('.').iterdir() if 'data' in str(f))
+
+
+@pytest.mark.parametrize('persistent', [False, True])
+def test_am0_rotate_rows(persistent):
+    am = mats.ArchiveManager(data_format=0, rotate_rows=3, persistent=persistent)
+    for _ in range(7):
+        am.save(data_point_1)
+    am.close()
+
+    # several files moved aside within the same second have unique names
+    data_paths = _data_files()
+    assert len(data_paths) == 3
+
+    lines = []
+    for p in data_paths:
+        with open(p, 'r') as f:
+            lines.append(len(f.readlines()) - 2)
+        remove(p)
+    assert sorted(lines) == [1, 3, 3]
+
+
+def test_am0_rotate_rows_existing_file():
+    """Rows already within the file count toward the limit."""
+    with mats.ArchiveManager(data_format=0) as am:
+        for _ in range(2):
+            am.save(data_point_1)
+
+    with mats.ArchiveManager(data_format=0, rotate_rows=3) as am:
+        for _ in range(2):
+            am.save(data_point_1)
+
+    data_paths = _data_files()
+    assert len(data_paths) == 2
+    for p in data_paths:
+        remove(p)
+
+
+def test_am4_rotate_rows_existing_file():
+    """The criteria blocks of data format 4 do not count as rows."""
+    with mats.ArchiveManager(data_format=4) as am:
+        for limit in (11.0, 12.0, 13.0):
+            am.save({'t1': {'value': 10},
+                     't2': {'value': 10.0,
+                            'criteria': {'min': 9.0, 'max': limit}}})
+
+    with mats.ArchiveManager(data_format=4, rotate_rows=4) as am:
+        am.save({'t1': {'value': 10},
+                 't2': {'value': 10.0, 'criteria': {'min': 9.0, 'max': 13.0}}})
+
+    data_paths = _data_files()
+    assert len(data_paths) == 1
+    assert len(list(mats.read_archive(data_paths[0]))) == 4
+
+    with mats.ArchiveManager(data_format=4, rotate_rows=4) as am:
+        am.save({'t1': {'value': 10},
+                 't2': {'value': 10.0, 'criteria': {'min': 9.0, 'max': 13.0}}})
+
+    data_paths = _data_files()
+    assert len(data_paths) == 2
+    for p in data_paths:
+        remove(p)
+
+
+def test_am3_rotate_bytes():
+    am = mats.ArchiveManager(data_format=3, rotate_bytes=1, persistent=True)
+    for _ in range(3):
+        am.save(data_point_1)
+    am.close()
+
+    data_paths = [p for p in _data_files() if p.suffix == '.bin']
+    assert len(data_paths) == 3
+    for p in _data_files():
+        remove(p)
+
+
+def test_am0_rotate_daily():
+    am = mats.ArchiveManager(data_format=0, rotate_daily=True, persistent=True)
+    am.save(data_point_1)
+
+    am._file_day = date.today() - timedelta(days=1)
+    am.save(data_point_1)
+    am.save(data_point_1)
+    am.close()
+
+    data_paths = _data_files()
+    assert len(data_paths) == 2
+    for p in data_paths:
+        remove(p)
+
+
+@pytest.mark.parametrize('compression, extension', [('gzip', '.gz'),
+                                                    ('lzma', '.xz')])
+def test_am0_rotate_compression(compression, extension):
+    am = mats.ArchiveManager(data_format=0, compression=compression)
+    for _ in range(5):
+        am.save(data_point_1)
+    for _ in range(5):
+        am.save(data_point_2)
+    am.close()
+
+    data_paths = _data_files()
+    assert len(data_paths) == 2
+
+    compressed = [p for p in data_paths if p.suffix == extension][0]
+    opener = gzip.open if compression == 'gzip' else lzma.open
+    with opener(compressed, 'rt') as f:
+        assert len(f.readlines()) == 7
+
+    for p in data_paths:
+        remove(p)
+
+
+def test_am_invalid_compression():
+    with pytest.raises(ValueError):
+        mats.ArchiveManager(compression='zip')
+
+
+def _save_shared(station, rows):
+    with mats.ArchiveManager(data_format=1, shared=True, rotate_rows=150) as am:
+        for i in range(rows):
+            am.save({'station': {'value': station},
+                     'row': {'value': i},
+                     'padding': {'value': 'x' * 500}})
+
+
+def test_am1_shared():
+    """Rows saved by several processes are neither interleaved nor lost."""
+    processes = [Process(target=_save_shared, args=(station, 200))
+                 for station in range(3)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    data_paths = [p for p in _data_files() if p.suffix == '.txt']
+    assert len(data_paths) == 4
+
+    rows = []
+    for p in data_paths:
+        file_rows = [(r['station']['value'], r['row']['value'])
+                     for r in mats.ArchiveReader(p)]
+        assert len(file_rows) == 150
+        rows += file_rows
+
+    assert sorted(rows) == [(s, i) for s in range(3) for i in range(200)]
+
+    for p in _data_files():
+        remove(p)
+
+
+def test_am0_shared_moved_by_other_process():
+    with mats.ArchiveManager(data_format=0, shared=True) as am, \
+            mats.ArchiveManager(data_format=0, shared=True) as other:
+        am.save(data_point_1)
+        other.save(data_point_2)  # moves the first file aside
+        am.save(data_point_1)  # moves the second file aside
+        other.save(data_point_1)
+
+    data_paths = [p for p in _data_files() if p.suffix == '.txt']
+    assert len(data_paths) == 3
+
+    with open('data.txt', 'r') as f:
+        assert len(f.readlines()) == 4
+
+    for p in _data_files():
+        remove(p)
+
+
+def test_am3_shared():
+    with pytest.raises(ValueError):
+        mats.ArchiveManager(data_format=3, shared=True)
@@ -0,0 +1,171 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``ArchiveReader`` class.
+"""
+from datetime import datetime
+from pathlib import Path
+from os import remove
+
+import pytest
+
+import mats
+from mats.archiving.reader import parse_criteria, parse_failed, parse_value
+
+
+def _point(i):
+    return {
+        'datetime': {'value': str(datetime(2022, 5, 26, 1, 4, i))},
+        'pass': {'value': i % 2 == 0},
+        'failed': {'value': [] if i % 2 == 0 else ['flow, test', 'comms']},
+        'comms': {'value': i % 2 == 0, 'criteria': {'pass_if': True}},
+        'flow, test': {'value': 5.5 + i, 'criteria': {'min': 5.6, 'max': 6.4}},
+        'count': {'value': i},
+        'serial': {'value': f'SN{i}'},
+        'aborted': {'value': None},
+    }
+
+
+@pytest.fixture(params=[0, 1, 4])
+def archive(request):
+    length = 5
+
+    with mats.ArchiveManager(data_format=request.param,
+                             preamble='station 1\nbench 2') as am:
+        for i in range(length):
+            am.save(_point(i))
+
+    yield request.param, Path('data.txt')
+
+    remove('data.txt')
+
+
+def test_ar_header(archive):
+    data_format, path = archive
+    reader = mats.ArchiveReader(path)
+
+    assert reader.data_format == data_format
+    assert reader.preamble == 'station 1\nbench 2'
+    assert reader.headings == list(_point(0).keys())
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1024 * 1024])
+def test_ar_rows(archive, chunk_size):
+    _, path = archive
+    rows = list(mats.ArchiveReader(path, chunk_size=chunk_size))
+
+    assert len(rows) == 5
+    for i, row in enumerate(rows):
+        assert row['datetime']['value'] == datetime(2022, 5, 26, 1, 4, i)
+        assert row['pass']['value'] is (i % 2 == 0)
+        assert row['failed']['value'] == _point(i)['failed']['value']
+        assert row['comms'] == _point(i)['comms']
+        assert row['flow, test'] == _point(i)['flow, test']
+        assert row['count']['value'] == i
+        assert row['serial']['value'] == f'SN{i}'
+        assert row['aborted']['value'] is None
+        assert 'criteria' not in row['count']
+
+
+def test_ar_offsets(archive):
+    _, path = archive
+    reader = mats.ArchiveReader(path, chunk_size=16)
+    records = list(reader.records())
+
+    with open(path, 'rb') as f:
+        for offset, row in records:
+            f.seek(offset)
+            assert reader.parse_line(f.readline().decode().rstrip('\n')) == row
+
+    # reading may begin from any row
+    assert [r for _, r in reader.records(records[3][0])] == \
+           [r for _, r in records[3:]]
+
+
+def test_ar_partial_row(archive):
+    _, path = archive
+    with open(path, 'a') as f:
+        f.write('2022-05-26 01:04:17.221758\tTrue')
+
+    assert len(list(mats.read_archive(path))) == 5
+
+
+def test_ar_no_preamble():
+    with mats.ArchiveManager(data_format=1) as am:
+        am.save(_point(0))
+
+    reader = mats.ArchiveReader('data.txt')
+    assert reader.data_format == 1
+    assert reader.preamble is None
+    assert list(reader)[0]['flow, test']['criteria'] == {'min': 5.6, 'max': 6.4}
+
+    remove('data.txt')
+
+
+def test_ar_criteria_blocks():
+    with mats.ArchiveManager(data_format=4) as am:
+        for i in range(6):
+            point = _point(i)
+            if i >= 3:
+                point['flow, test']['criteria'] = {'min': 5.6, 'max': 7.0}
+            am.save(point)
+
+    reader = mats.ArchiveReader('data.txt', chunk_size=16)
+    assert reader.data_format == 4
+    assert reader.criteria['flow, test'] == {'min': 5.6, 'max': 6.4}
+
+    records = list(reader.records())
+    assert [r['flow, test']['criteria']['max'] for _, r in records] == \
+           [6.4, 6.4, 6.4, 7.0, 7.0, 7.0]
+
+    # the criteria of a row are found when reading begins from it
+    for offset, row in reversed(records):
+        assert next(mats.ArchiveReader('data.txt').records(offset))[1] == row
+
+    remove('data.txt')
+
+
+def test_ar_parse_value():
+    assert parse_value('10') == 10
+    assert parse_value('10.5') == 10.5
+    assert parse_value('True') is True
+    assert parse_value('None') is None
+    assert parse_value('1_000') == '1_000'
+    assert parse_value('string 10') == 'string 10'
+    assert parse_value('[1.5,2,NaN]')[:2] == [1.5, 2]
+    assert parse_value('[1, 2]') == '[1, 2]'
+
+
+def test_ar_parse_failed():
+    assert parse_failed('') == []
+    assert parse_failed('[]') == []
+    assert parse_failed("['a', 'b']") == ['a', 'b']
+    assert parse_failed('a;b') == ['a', 'b']
+
+
+def test_ar_parse_criteria():
+    assert parse_criteria('pass_if=a,b') == {'pass_if': 'a,b'}
+    assert parse_criteria('min=5.6,max=6.4') == {'min': 5.6, 'max': 6.4}
+
+
+@pytest.mark.parametrize('data_format', [0, 1, 4])
+def test_ar_array_values(data_format):
+    """Arrays and limits per element are written as JSON, never abbreviated."""
+    np = pytest.importorskip('numpy')
+
+    sweep = np.linspace(0.0, 1.0, 2000)
+    point = {
+        'datetime': {'value': str(datetime(2022, 5, 26, 1, 4))},
+        'pass': {'value': True},
+        'failed': {'value': []},
+        'sweep': {'value': sweep, 'criteria': {'min': (0.0, -1.0), 'max': 2.0}},
+    }
+    with mats.ArchiveManager(data_format=data_format) as am:
+        am.save(point)
+
+    rows = list(mats.ArchiveReader('data.txt'))
+    remove('data.txt')
+
+    assert rows[0]['sweep']['value'] == sweep.tolist()
+    assert list(rows[0]['sweep']['criteria']['min']) == [0.0, -1.0]
+    assert rows[0]['sweep']['criteria']['max'] == 2.0
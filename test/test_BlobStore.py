@@ -0,0 +1,118 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``BlobStore`` class along with the \
+large values saved by the ``ArchiveManager``.
+"""
+from pathlib import Path
+
+import pytest
+
+import mats
+from mats.archiving.blobs import BlobRef, payload_size
+
+
+def test_bs_bytes(clean):
+    store = mats.BlobStore('blobs')
+
+    ref = store.put(b'\x00\x01' * 1000)
+    assert ref.startswith('blob:') and ref.endswith('.bin')
+    assert store.put(bytearray(b'\x00\x01' * 1000)) == ref
+    assert bytes(store.load(ref)) == b'\x00\x01' * 1000
+
+
+def test_bs_memoryview(clean):
+    store = mats.BlobStore('blobs')
+
+    data = memoryview(b'abcdefgh')
+    assert store.load(store.put(data[::2])) == b'aceg'
+
+
+def test_bs_dedup(clean):
+    store = mats.BlobStore('blobs')
+    for _ in range(3):
+        store.put(b'waveform')
+    store.put(b'image')
+
+    stored = [p for p in Path('blobs').rglob('*') if p.is_file()]
+    assert len(stored) == 2
+
+
+def test_bs_array(clean):
+    np = pytest.importorskip('numpy')
+    store = mats.BlobStore('blobs')
+
+    waveform = np.sin(np.linspace(0, 10, 10000))
+    ref = store.put(waveform)
+    assert ref.endswith('.npy')
+
+    loaded = store.load(ref)
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded, waveform)
+
+    # the same bytes with another shape are stored separately
+    assert store.put(waveform.reshape(100, 100)) != ref
+    assert store.put(waveform[::2]) == store.put(waveform[::2].copy())
+
+
+def test_bs_unsupported(clean):
+    np = pytest.importorskip('numpy')
+
+    assert payload_size('text') is None
+    assert payload_size(np.array([{}])) is None
+    with pytest.raises(TypeError):
+        mats.BlobStore('blobs').put(np.array([{}]))
+
+
+@pytest.mark.parametrize('data_format', [0, 1])
+def test_am_blob_bytes(clean, data_format):
+    np = pytest.importorskip('numpy')
+
+    waveform = np.arange(5000, dtype=np.float32)
+    with mats.ArchiveManager(data_format=data_format, blob_bytes=1024) as am:
+        for i in range(3):
+            am.save({'serial': {'value': f'SN{i}'},
+                     'waveform': {'value': waveform},
+                     'image': {'value': bytes([i]) * 2048},
+                     'header': {'value': b'\x01\x02'}})
+
+    stored = [p for p in Path('blobs').rglob('*') if p.is_file()]
+    assert len(stored) == 4
+
+    rows = list(mats.ArchiveReader('data.txt'))
+    assert len(rows) == 3
+
+    ref = rows[0]['waveform']['value']
+    assert isinstance(ref, BlobRef)
+    assert ref == rows[2]['waveform']['value']
+    assert np.array_equal(ref.load(), waveform)
+
+    assert bytes(rows[1]['image']['value'].load()) == b'\x01' * 2048
+
+    # small values remain within the row
+    assert rows[0]['header']['value'] == str(b'\x01\x02')
+
+
+def test_bs_ref_pickled(clean):
+    import pickle
+
+    ref = pickle.loads(pickle.dumps(BlobRef('blob:abc.bin', mats.BlobStore('blobs'))))
+    assert ref == 'blob:abc.bin'
+    assert ref._store.path == Path('blobs')
+
+
+def test_bs_compacted(clean):
+    """Archives which refer to stored values are compacted in parallel."""
+    from mats.archiving import compact_archives
+
+    for fname in ('data_a.txt', 'data_b.txt'):
+        with mats.ArchiveManager(fname=fname, data_format=1, blob_bytes=1024) as am:
+            am.save({'serial': {'value': fname},
+                     'image': {'value': fname.encode() * 256}})
+
+    summary = compact_archives(['data_a.txt', 'data_b.txt'], 'data_merged.txt',
+                               processes=2)
+    assert summary['rows'] == 2
+
+    rows = list(mats.ArchiveReader('data_merged.txt'))
+    assert bytes(rows[1]['image']['value'].load()) == b'data_b.txt' * 256
@@ -0,0 +1,99 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``ColumnarArchive`` class.
+"""
+from datetime import datetime
+from pathlib import Path
+from os import remove
+
+import pint
+import pytest
+
+import mats
+
+np = pytest.importorskip('numpy')
+
+unit = pint.UnitRegistry()
+
+
+def _point(i):
+    return {
+        'datetime': {'value': str(datetime(2022, 5, 26, 1, 4, i))},
+        'pass': {'value': None if i == 3 else i % 2 == 0},
+        'failed': {'value': [] if i % 2 == 0 else ['t1', 't3']},
+        't1': {'value': 1.5 * i, 'criteria': {'min': 0.0, 'max': 10.0}},
+        't2': {'value': i},
+        't3': {'value': f'serial {i % 2}', 'criteria': {'pass_if': 'serial 0'}},
+        't4': {'value': i * unit.rpm},
+    }
+
+
+@pytest.fixture
+def archive():
+    length = 6
+
+    with mats.ArchiveManager(data_format=3, preamble='station 1') as am:
+        for i in range(length):
+            am.save(_point(i))
+
+    yield mats.ColumnarArchive('data.bin')
+
+    data_paths = [f for f in Path('.').iterdir() if 'data' in str(f)]
+    for p in data_paths:
+        remove(p)
+
+
+def test_ca_descriptor(archive):
+    assert len(archive) == 6
+    assert archive.preamble == 'station 1'
+    assert archive.criteria == {
+        't1': {'min': 0.0, 'max': 10.0},
+        't3': {'pass_if': 'serial 0'},
+    }
+
+
+def test_ca_numeric_columns(archive):
+    assert archive.column('t1').dtype == np.float64
+    assert archive.column('t2').dtype == np.int64
+    assert archive.column('t1').tolist() == [0.0, 1.5, 3.0, 4.5, 6.0, 7.5]
+    assert archive.column('t2').tolist() == [0, 1, 2, 3, 4, 5]
+
+    # pint values are stored using their magnitude
+    assert archive.column('t4').tolist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_ca_datetime_column(archive):
+    dts = archive.column('datetime')
+    assert dts.dtype == np.dtype('M8[us]')
+    assert dts[1] == np.datetime64('2022-05-26T01:04:01')
+
+
+def test_ca_bool_columns(archive):
+    assert archive.column('pass').tolist() == [True, False, True, False, True, False]
+
+    # the raw records retain the difference between False and None
+    assert archive.records['pass'][3] == -1
+
+
+def test_ca_string_columns(archive):
+    assert archive.column('t3').tolist() == ['serial 0', 'serial 1'] * 3
+    assert archive.column('failed')[0] == []
+    assert archive.column('failed')[1] == ['t1', 't3']
+
+
+def test_ca_partial_record_ignored(archive):
+    with open('data.bin', 'ab') as f:
+        f.write(b'\x00\x01\x02')
+
+    assert len(mats.ColumnarArchive('data.bin')) == 6
+
+
+def test_ca_not_columnar():
+    with open('data.txt', 'w') as f:
+        f.write('t1\tt2\n1\t2\n')
+
+    with pytest.raises(ValueError):
+        mats.ColumnarArchive('data.txt')
+
+    remove('data.txt')
@@ -0,0 +1,142 @@
+"""
+Automated test suite for the Automated Test Environment.  This file focuses
+on testing the ``Event`` class and the event subscribers.
+"""
+import logging
+
+import pytest
+import mats
+from mats.events import emit, subscribe, unsubscribe
+
+
+class T(mats.Test):
+    def __init__(self, loglevel=logging.INFO):
+        super().__init__('test', min_value=1.0, max_value=2.0, loglevel=loglevel)
+
+    def execute(self, is_passing):
+        return 2.5
+
+
+class Formatted:
+    """Counts the number of times that it is formatted into text."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __format__(self, format_spec):
+        self.count += 1
+        return 'formatted'
+
+
+@pytest.fixture
+def events():
+    received = []
+    subscribe(received.append)
+    yield received
+    unsubscribe(received.append)
+
+
+def of_test(events):
+    # test sequences run by other tests may still be emitting events
+    return [e for e in events if e.fields.get('moniker') == 'test']
+
+
+def test_Event_test_events(events):
+    t = T()
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    t._teardown(is_passing=True)
+    events = of_test(events)
+
+    assert [e.kind for e in events] == [
+        'test_setup', 'test_execute', 'limit_check', 'limit_check', 'test_teardown'
+    ]
+
+    minimum, maximum = events[2:4]
+    assert minimum.fields == {
+        'moniker': 'test', 'criteria': 'min', 'value': 2.5, 'limit': 1.0,
+        'passing': True,
+    }
+    assert minimum.level == logging.INFO
+    assert maximum.fields['passing'] is False
+    assert maximum.level == logging.WARNING
+    assert str(maximum) == '"2.5" is above the maximum "2.0"'
+
+
+def test_Event_kinds():
+    received = []
+    subscribe(received.append, kinds=['limit_check'])
+    try:
+        t = T()
+        t._setup(is_passing=True)
+        t._execute(is_passing=True)
+    finally:
+        unsubscribe(received.append)
+
+    assert [e.fields['criteria'] for e in of_test(received)] == ['min', 'max']
+
+
+def test_Event_sequence_events(events):
+    ts = mats.TestSequence(sequence=[T()])
+    try:
+        assert ts.start().result(timeout=5.0)['pass'] is False
+    finally:
+        ts.close()
+
+    kinds = [e.kind for e in events]
+    assert 'sequence_started' in kinds
+    assert any(
+        e.kind == 'sequence_complete'
+        and e.fields['passing'] is False
+        and e.fields['failed'] == ('test',)
+        for e in events
+    )
+
+
+def test_Event_rendered_only_when_logged(events):
+    logger = logging.getLogger('test_Event')
+    logger.setLevel(logging.WARNING)
+    value = Formatted()
+
+    emit(logger, logging.INFO, 'example', 'value is {value}', value=value)
+    assert value.count == 0
+
+    emit(logger, logging.WARNING, 'example', 'value is {value}', value=value)
+    assert value.count == 1
+
+    examples = [e for e in events if e.kind == 'example']
+    assert [e.fields['value'] for e in examples] == [value, value]
+    assert str(examples[-1]) == 'value is formatted'
+    assert value.count == 1
+
+
+def test_Event_not_created_without_subscribers():
+    logger = logging.getLogger('test_Event')
+    logger.setLevel(logging.WARNING)
+    value = Formatted()
+
+    emit(logger, logging.INFO, 'example', '{value}', value=value)
+    assert value.count == 0
+
+
+def test_Event_unsubscribe():
+    received = []
+    subscribe(received.append)
+    T()._setup(is_passing=True)
+    unsubscribe(received.append)
+    T()._setup(is_passing=True)
+
+    assert len(of_test(received)) == 1
+
+
+def test_Event_subscriber_exception(events):
+    def subscriber(event):
+        raise RuntimeError('subscriber failed')
+
+    subscribe(subscriber)
+    try:
+        T()._setup(is_passing=True)
+    finally:
+        unsubscribe(subscriber)
+
+    assert [e.kind for e in of_test(events)] == ['test_setup']
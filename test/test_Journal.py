@@ -0,0 +1,165 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``Journal`` class along with the \
+recovery performed by the ``ArchiveManager``.
+"""
+from pathlib import Path
+from os import remove
+
+import pytest
+
+import mats
+from mats.archiving.journal import Journal
+
+
+def _crash(am):
+    """Abandons a manager without closing it, as a loss of power would."""
+    if am._file is not None:
+        am._file.flush()
+    am._journal.close()
+
+
+@pytest.mark.parametrize('data_format', [0, 1])
+def test_journal_committed_on_close(clean, data_format, data_point):
+    with mats.ArchiveManager(data_format=data_format, journal=True) as am:
+        for i in range(3):
+            am.save(data_point(i, serial=f'SN{i}'))
+        assert Path('data.txt.journal').stat().st_size > 0
+
+    assert Path('data.txt.journal').stat().st_size == 0
+    assert len(list(mats.ArchiveReader('data.txt'))) == 3
+
+
+@pytest.mark.parametrize('persistent', [False, True])
+def test_journal_replays_lost_rows(clean, persistent, data_point):
+    am = mats.ArchiveManager(journal=True, persistent=persistent)
+    for i in range(5):
+        am.save(data_point(i, serial=f'SN{i}'))
+    _crash(am)
+
+    # the last row, and part of the row before it, never reached the disk
+    with open('data.txt', 'rb') as f:
+        data = f.read()
+    with open('data.txt', 'wb') as f:
+        f.write(data[:data.rfind(b'\n', 0, -1) - 10])
+
+    with mats.ArchiveManager(journal=True) as am:
+        am.save(data_point(5, serial='SN5'))
+
+    with open('data.txt', 'rb') as f:
+        assert f.read().startswith(data)
+
+    rows = list(mats.ArchiveReader('data.txt'))
+    assert [r['serial']['value'] for r in rows] == [f'SN{i}' for i in range(6)]
+
+
+def test_journal_replays_header(clean, data_point):
+    am = mats.ArchiveManager(journal=True, preamble='station 4')
+    am.save(data_point(0, serial='SN0'))
+    _crash(am)
+
+    remove('data.txt')
+    mats.ArchiveManager(journal=True).close()
+
+    reader = mats.ArchiveReader('data.txt')
+    assert reader.preamble == 'station 4'
+    assert len(list(reader)) == 1
+
+
+def test_journal_removes_unjournaled_partial_row(clean, data_point):
+    am = mats.ArchiveManager(journal=True)
+    am.save(data_point(0, serial='SN0'))
+    am.close()
+
+    with open('data.txt', 'a') as f:
+        f.write('2022-05-26 10:00:01\tTr')
+
+    with mats.ArchiveManager(journal=True) as am:
+        am.save(data_point(2, serial='SN2'))
+
+    rows = list(mats.ArchiveReader('data.txt'))
+    assert [r['serial']['value'] for r in rows] == ['SN0', 'SN2']
+
+
+def test_journal_partial_entry(clean, data_point):
+    am = mats.ArchiveManager(journal=True)
+    for i in range(2):
+        am.save(data_point(i, serial=f'SN{i}'))
+    _crash(am)
+
+    with open('data.txt.journal', 'ab') as f:
+        f.write(b'\x10\x00\x00')
+
+    journal = Journal('data.txt.journal')
+    assert len(journal.entries()) == 3  # the header and two rows
+    assert journal.recover('data.txt') == 0
+    assert journal.size == 0
+
+    assert len(list(mats.ArchiveReader('data.txt'))) == 2
+
+
+def test_journal_limited(clean, monkeypatch, data_point):
+    monkeypatch.setattr('mats.archiving.manager._JOURNAL_BYTES', 500)
+
+    am = mats.ArchiveManager(journal=True)
+    for i in range(20):
+        am.save(data_point(i, serial=f'SN{i}'))
+        assert am._journal.size < 600
+    am.close()
+
+
+def test_journal_rotation(clean, data_point):
+    am = mats.ArchiveManager(journal=True, rotate_rows=3)
+    for i in range(5):
+        am.save(data_point(i, serial=f'SN{i}'))
+    _crash(am)
+
+    # the journal only describes the rows since the file was moved aside
+    entries = Journal('data.txt.journal').entries()
+    assert len(entries) == 3
+    assert entries[0][0] == 0
+
+
+def test_journal_columnar(clean, data_point):
+    pytest.importorskip('numpy')
+
+    am = mats.ArchiveManager(data_format=3, journal=True)
+    for i in range(3):
+        am.save(data_point(i, serial=f'SN{i}'))
+    _crash(am)
+
+    with open('data.bin', 'rb+') as f:
+        f.truncate(f.seek(0, 2) - 5)
+
+    mats.ArchiveManager(data_format=3, journal=True).close()
+
+    archive = mats.ColumnarArchive('data.bin')
+    assert list(archive.column('flow')) == [5.5, 6.5, 7.5]
+
+
+def test_journal_sqlite():
+    with pytest.raises(ValueError):
+        mats.ArchiveManager(data_format=2, journal=True)
+
+
+def test_journal_synced_before_data(clean, monkeypatch, data_point):
+    synced = []
+
+    def fsync(fd):
+        # the size of the data file when each entry is forced to disk
+        path = Path('data.txt')
+        synced.append(path.stat().st_size if path.exists() else 0)
+
+    monkeypatch.setattr('mats.archiving.journal.fsync', fsync)
+
+    am = mats.ArchiveManager(journal=True)
+    for i in range(3):
+        am.save(data_point(i, serial=f'SN{i}'))
+    entries = Journal('data.txt.journal').entries()
+    am.close()
+
+    # each entry, including the header, is forced to disk before the data
+    # file reaches its offset
+    assert len(synced) == len(entries) == 4
+    assert synced == [offset for offset, _ in entries]
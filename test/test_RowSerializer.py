@@ -0,0 +1,111 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``RowSerializer`` class.
+"""
+import pint
+import pytest
+
+from mats.archiving.serializer import RowSerializer, format_value
+
+unit = pint.UnitRegistry()
+
+
+def _point(flow=5.5, criteria=None):
+    return {
+        'datetime': {'value': '2022-05-26 01:04:00'},
+        'pass': {'value': False},
+        'failed': {'value': ['flow', 'comms']},
+        'comms': {'value': True, 'criteria': {'pass_if': True}},
+        'flow': {'value': flow, 'criteria': criteria or {'max': 6.4, 'min': 5.6}},
+        'count': {'value': 3},
+        'aborted': {'value': None},
+    }
+
+
+def test_format_value():
+    assert format_value('text') == 'text'
+    assert format_value(3) == '3'
+    assert format_value(3.25) == '3.25'
+    assert format_value(True) == 'True'
+    assert format_value(None) == 'None'
+    assert format_value(3.25 * unit.volt) == '3.25'
+    assert format_value([1, 2]) == '[1, 2]'
+
+
+def test_rs_fmt0():
+    serializer = RowSerializer(_point(), data_format=0, preamble='station 4')
+
+    assert serializer.header == 'station 4\n' \
+                                'comms:pass_if=True\n' \
+                                'flow:min=5.6,max=6.4\n' \
+                                '\n' \
+                                'datetime\tpass\tfailed\tcomms\tflow\tcount\taborted\n'
+    assert serializer.serialize(_point()) == \
+           "2022-05-26 01:04:00\tFalse\t['flow', 'comms']\tTrue\t5.5\t3\tNone\n"
+
+
+def test_rs_fmt1():
+    serializer = RowSerializer(_point(), data_format=1)
+
+    assert serializer.header == 'datetime\tpass\tfailed\tcomms\tcomms =\t' \
+                                'flow\tflow >=\tflow <=\tcount\taborted\n'
+    assert serializer.serialize(_point()) == \
+           '2022-05-26 01:04:00\tFalse\tflow;comms\tTrue\tTrue\t' \
+           '5.5\t5.6\t6.4\t3\tNone\n'
+
+
+def test_rs_fmt1_criteria_values():
+    """Changed criteria values are written without recompiling."""
+    serializer = RowSerializer(_point(), data_format=1)
+
+    point = _point(criteria={'min': 5.0, 'max': 7.0})
+    assert serializer.matches(point)
+    assert '\t5.5\t5.0\t7.0\t' in serializer.serialize(point)
+    assert '\t5.5\t5.6\t6.4\t' in serializer.serialize(_point())
+
+
+def test_rs_matches():
+    for data_format in [0, 1]:
+        serializer = RowSerializer(_point(), data_format=data_format)
+        assert serializer.matches(_point(flow=6.0))
+
+        point = _point()
+        point['serial'] = {'value': 'SN1'}
+        assert not serializer.matches(point)
+
+        point = _point()
+        del point['flow']['criteria']
+        assert not serializer.matches(point)
+
+        point = _point(criteria={'min': 5.6})
+        assert not serializer.matches(point)
+
+    serializer = RowSerializer(_point(), data_format=0)
+    assert not serializer.matches(_point(criteria={'min': 5.0, 'max': 7.0}))
+
+
+def test_rs_pint_column():
+    serializer = RowSerializer(_point(flow=5.5 * unit.liter), data_format=1)
+
+    assert '\t5.5\t5.6\t6.4\t' in serializer.serialize(_point(flow=5.5 * unit.liter))
+
+    # a failed measurement may not return a pint value
+    assert '\tNone\t5.6\t6.4\t' in serializer.serialize(_point(flow=None))
+
+
+def test_rs_pint_criteria():
+    """Scalar criteria are written as formatted, including their units."""
+    criteria = {'min': 5.6 * unit.liter, 'max': 6.4 * unit.liter}
+
+    serializer = RowSerializer(_point(criteria=criteria), data_format=0)
+    assert 'flow:min=5.6 liter,max=6.4 liter\n' in serializer.header
+
+    serializer = RowSerializer(_point(criteria=criteria), data_format=1)
+    assert '\t5.5\t5.6 liter\t6.4 liter\t' in \
+           serializer.serialize(_point(criteria=criteria))
+
+
+def test_rs_invalid_format():
+    with pytest.raises(ValueError):
+        RowSerializer(_point(), data_format=2)
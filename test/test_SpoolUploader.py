@@ -0,0 +1,180 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``SpoolUploader`` class.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import socketserver
+from threading import Thread
+from time import monotonic, sleep
+
+import pytest
+
+import mats
+
+
+class _Collector(ThreadingHTTPServer):
+    """An HTTP stand-in for the MES which records each batch received."""
+
+    def __init__(self, status=200):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                self.server.batches.append(json.loads(body))
+                self.server.clients.add(self.client_address)
+                self.send_response(self.server.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.status = status
+        self.batches = []
+        self.clients = set()
+        Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/results'
+
+    @property
+    def points(self):
+        return [point for batch in self.batches for point in batch]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def _wait_for(condition, timeout=5.0):
+    end = monotonic() + timeout
+    while not condition() and monotonic() < end:
+        sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def collector(clean):
+    collector = _Collector()
+
+    yield collector
+
+    collector.stop()
+
+
+def test_su_batches(collector, data_point):
+    uploader = mats.SpoolUploader(collector.url, batch_size=4, interval=0.01)
+    for i in range(10):
+        uploader.save(data_point(i))
+    uploader.close()
+
+    assert [p['flow']['value'] for p in collector.points] == [5.5 + i for i in range(10)]
+    assert collector.points[0]['flow']['criteria'] == {'min': 5.6, 'max': 6.4}
+    assert all(len(batch) <= 4 for batch in collector.batches)
+
+    # every batch is sent using the same connection
+    assert len(collector.clients) == 1
+
+    statistics = uploader.statistics
+    assert statistics['spool_depth'] == 0
+    assert statistics['uploaded'] == 10
+    assert statistics['latency']['max'] >= statistics['latency']['mean'] > 0
+    assert Path('upload.spool').stat().st_size == 0
+
+
+def test_su_collector_unavailable(collector, data_point):
+    collector.status = 503
+    uploader = mats.SpoolUploader(collector.url, interval=0.01, retry_delay=0.01,
+                                  max_retry_delay=0.05)
+    for i in range(3):
+        uploader.save(data_point(i))
+
+    assert _wait_for(lambda: uploader.statistics['failures'] >= 2)
+    assert uploader.statistics['retrying']
+    assert uploader.statistics['spool_depth'] == 3
+
+    collector.status = 200
+    assert _wait_for(lambda: uploader.statistics['spool_depth'] == 0)
+    uploader.close()
+
+    assert len(collector.points) >= 3
+    assert not uploader.statistics['retrying']
+
+
+def test_su_cursor_survives_restart(collector, data_point):
+    collector.status = 503
+    uploader = mats.SpoolUploader(collector.url, batch_size=2, interval=0.01,
+                                  retry_delay=10)
+    for i in range(5):
+        uploader.save(data_point(i))
+    uploader.close(timeout=0.5)
+    assert uploader.statistics['spool_depth'] == 5
+
+    # a partially-written point is discarded when the spool is opened
+    with open('upload.spool', 'ab') as f:
+        f.write(b'{"flow": ')
+
+    collector.status = 200
+    collector.batches.clear()
+    with mats.SpoolUploader(collector.url, interval=0.01) as uploader:
+        assert uploader.statistics['spool_depth'] == 5
+        assert _wait_for(lambda: uploader.statistics['spool_depth'] == 0)
+        uploader.save(data_point(5))
+
+    assert [p['flow']['value'] for p in collector.points] == [5.5 + i for i in range(6)]
+
+
+def test_su_tcp(collector, data_point):
+    received = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                received.extend(json.loads(line))
+                self.wfile.write(b'OK\n')
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+
+    with mats.SpoolUploader(f'tcp://127.0.0.1:{server.server_address[1]}',
+                            interval=0.01) as uploader:
+        for i in range(3):
+            uploader.save(data_point(i))
+
+    server.shutdown()
+    server.server_close()
+    assert [p['flow']['value'] for p in received] == [5.5, 6.5, 7.5]
+
+
+def test_su_invalid_url():
+    with pytest.raises(ValueError):
+        mats.SpoolUploader('ftp://127.0.0.1/results')
+    with pytest.raises(ValueError):
+        mats.SpoolUploader('tcp://127.0.0.1')
+
+
+def test_su_archive_manager(collector):
+    """The uploader may be the archive_manager of a test sequence."""
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('flow', min_value=5.6, max_value=6.4)
+
+        def execute(self, is_passing):
+            return 6.0
+
+    uploader = mats.SpoolUploader(collector.url, interval=0.01)
+    ts = mats.TestSequence(sequence=[T()], archive_manager=uploader)
+    assert ts.start().result(timeout=5.0)['pass'] is True
+    ts.close()
+
+    assert len(collector.points) == 1
+    point = collector.points[0]
+    assert point['pass']['value'] is True
+    assert point['flow'] == {'value': 6.0, 'criteria': {'min': 5.6, 'max': 6.4}}
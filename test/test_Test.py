@@ -2,6 +2,9 @@
 Automated test suite for the Automated Test Environment.  This file focuses
 on testing the ``Test`` class.
 """
+import logging
+import warnings
+
 import pytest
 import mats
 
@@ -346,3 +349,301 @@ def test_Test_significant_figures_string():
     test = T()
     test._execute(True)
     assert test.value == '12345678'
+
+
+def test_Test_verdict_margin(bracketed_Test):
+    """The verdict contains the limit nearest to the value and the margin."""
+    t = bracketed_Test
+
+    t.execute = lambda is_passing: 1.9
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    assert t.verdict.passing is True
+    assert t.verdict.limit == 'max'
+    assert t.verdict.margin == pytest.approx(0.1)
+
+    t.execute = lambda is_passing: 0.75
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    assert t.is_passing is False
+    assert t.verdict.failed == ('min',)
+    assert t.verdict.limit == 'min'
+    assert t.verdict.margin == pytest.approx(-0.25)
+
+
+def test_Test_verdict_pass_if(pass_if_Test):
+    t = pass_if_Test
+    t.execute = lambda is_passing: False
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+
+    assert t.verdict.failed == ('pass_if',)
+    assert t.verdict.limit is None
+    assert t.verdict.margin is None
+
+
+def test_Test_criteria_replaced(blank_Test):
+    """Replacing the criteria replaces the evaluation of the value."""
+    t = blank_Test
+    t.execute = lambda is_passing: 5.0
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    assert t.verdict is None
+
+    t.criteria = {'min': 6.0, 'max': None}
+    assert t.criteria == {'min': 6.0}
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    assert t.is_passing is False
+    assert t.verdict.failed == ('min',)
+
+
+def test_Test_criteria_read_only(blank_Test):
+    """The criteria cannot be changed in place, which would not be evaluated."""
+    t = blank_Test
+    t.criteria = {'min': 6.0}
+
+    with pytest.raises(TypeError):
+        t.criteria['min'] = 4.0
+    assert t.criteria == {'min': 6.0}
+
+    criteria = dict(t.criteria, min=4.0)
+    t.criteria = criteria
+    t.execute = lambda is_passing: 5.0
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    assert t.is_passing is True
+
+
+def test_Test_criteria_messages_lazy(bracketed_Test):
+    """The messages are not formatted unless they are logged."""
+    formatted = []
+
+    class Value(float):
+        def __str__(self):
+            formatted.append(self)
+            return super().__str__()
+
+    t = bracketed_Test
+    t._logger.setLevel(logging.ERROR)
+    t._evaluate(Value(1.5))
+    assert formatted == []
+
+    t._logger.setLevel(logging.INFO)
+    t._evaluate(Value(1.5))
+    assert formatted
+
+
+def test_Test_array_value():
+    """An array is rounded and compared to the criteria of each element."""
+    np = pytest.importorskip('numpy')
+
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('sweep', min_value=[0.0, 0.0, 0.5, 0.5],
+                             max_value=1.0, significant_figures=3)
+
+        def execute(self, is_passing):
+            return np.array([0.12345, 1.25, 0.45, 0.75])
+
+    t = T()
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+
+    assert t.value.tolist() == [0.123, 1.25, 0.45, 0.75]
+    assert t.criteria['min'] == (0.0, 0.0, 0.5, 0.5)
+    assert t.is_passing is False
+    assert t.verdict.failed == ('min', 'max')
+    assert t.verdict.indices == (1, 2)
+    assert t.verdict.index == 1
+    assert t.verdict.limit == 'max'
+    assert t.verdict.margin == pytest.approx(-0.25)
+
+
+def test_Test_buffer_value():
+    """Any array of numbers which supports the buffer protocol is an array."""
+    pytest.importorskip('numpy')
+    from array import array
+
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('sweep', min_value=0.0)
+
+        def execute(self, is_passing):
+            return array('d', [1.0, 2.0])
+
+    t = T()
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+
+    assert t.value.tolist() == [1.0, 2.0]
+    assert t.is_passing is True
+    assert t.verdict.indices == ()
+    assert t.verdict.margin == 1.0
+
+
+def test_Test_numpy_scalar_value():
+    """NumPy scalars are compared as scalars rather than as arrays."""
+    np = pytest.importorskip('numpy')
+
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('test', pass_if=True)
+
+        def execute(self, is_passing):
+            return np.bool_(True)
+
+    t = T()
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+
+    assert not isinstance(t.value, np.ndarray)
+    assert t.value == True  # noqa: E712
+    assert t.is_passing is True
+    assert t.verdict.indices is None
+    assert mats.criteria.as_array(np.float64(1.5)) is None
+
+
+def test_Test_unsigned_array_value():
+    """Unsigned values are compared without wrapping around."""
+    np = pytest.importorskip('numpy')
+    from array import array
+
+    for value, criteria, failed, margin in (
+        (np.array([5, 20], dtype=np.uint8), {'min_value': 10}, 'min', -5.0),
+        (array('H', [5, 20]), {'max_value': 10}, 'max', -10.0),
+    ):
+        class T(mats.Test):
+            def __init__(self):
+                super().__init__('sweep', **criteria)
+
+            def execute(self, is_passing):
+                return value
+
+        t = T()
+        t._setup(is_passing=True)
+        t._execute(is_passing=True)
+
+        assert t.is_passing is False
+        assert t.verdict.failed == (failed,)
+        assert t.verdict.margin == margin
+        assert t.verdict.indices == ((0,) if failed == 'min' else (1,))
+
+
+def test_Test_round_array():
+    np = pytest.importorskip('numpy')
+    from mats.rounding import round_array
+
+    values = np.array([2.5, -2.5, 0.125, 1.005, 12345678.0, 0.0, np.nan, 1e300])
+    rounded = round_array(values, 3)
+    assert rounded[:6].tolist() == [2.5, -2.5, 0.125, 1.01, 12300000.0, 0.0]
+    assert np.isnan(rounded[6])
+    assert rounded[7] == 1e300
+    assert round_array(values, 1)[:3].tolist() == [3.0, -3.0, 0.1]
+    assert round_array(np.arange(3), 1).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize('significant_figures', [1, 3, 9, 10, 15])
+def test_Test_round_array_matches_round_significant(significant_figures):
+    """``round_array()`` agrees with ``round_significant()`` at every scale."""
+    np = pytest.importorskip('numpy')
+    from random import Random
+    from mats.rounding import round_array, round_significant
+
+    rng = Random(significant_figures)
+    shift = 10 ** significant_figures
+    values = []
+    for exponent in range(-320, 308):
+        values.append(rng.uniform(1.0, 10.0) * 10.0 ** exponent)
+        # a half, as written, at the final significant figure
+        half = rng.randrange(shift, 10 * shift) // 10 * 10 + 5
+        values.append(-float(f'{half}e{exponent - significant_figures}'))
+    values = np.array(values)
+
+    expected = [round_significant(v, significant_figures) for v in values.tolist()]
+    assert round_array(values, significant_figures).tolist() == expected
+
+
+def test_Test_round_significant_matches_sigfig():
+    """The built-in rounding matches ``sigfig.round()``."""
+    sigfig = pytest.importorskip('sigfig')
+    from decimal import Decimal
+    from random import Random
+    from mats.rounding import round_significant
+
+    rng = Random(0)
+    values = [2.5, -2.5, 0.125, 1.005, 999.96, -9.95, 12345678, -12345, 95,
+              0.0, -0.0, 0.1 + 0.2, 1e300, 5e-324, Decimal('1.2345')]
+    values += [rng.gauss(0, 1) * 10 ** rng.randint(-12, 12) for _ in range(500)]
+    values += [round(rng.uniform(-100, 100), rng.randint(0, 4)) for _ in range(500)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # sigfig warns of values with few digits
+        for value in values:
+            for significant_figures in (1, 3, 4, 17):
+                expected = sigfig.round(value, significant_figures)
+                rounded = round_significant(value, significant_figures)
+                assert rounded == expected
+                assert type(rounded) is type(expected)
+
+
+def test_Test_round_significant_invalid():
+    from mats.rounding import round_significant
+
+    assert round_significant(1.5, None) == 1.5
+    for value in (True, float('inf'), 1 + 2j, 'text'):
+        with pytest.raises(ValueError):
+            round_significant(value, 3)
+
+
+def test_Test_timeout_invalid():
+    with pytest.raises(ValueError):
+        mats.Test('test', timeout=0.0)
+    with pytest.raises(ValueError):
+        mats.Test('test', timeout={'measure': 1.0})
+
+
+def test_Test_execute_timeout():
+    from threading import Event
+
+    release = Event()
+
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('test', pass_if=True, timeout={'execute': 0.05})
+
+        def execute(self, is_passing):
+            release.wait(5.0)
+            return True
+
+    t = T()
+    assert t.timeouts == {'execute': 0.05}
+
+    t._setup(is_passing=True)
+    with pytest.raises(mats.PhaseTimeoutError) as e:
+        t._execute(is_passing=True)
+    release.set()
+
+    assert e.value.phase == 'execute'
+    assert t.timed_out == 'execute'
+    assert t.value is None
+    assert t.timing['execute'] >= 50_000_000
+
+
+def test_Test_timeout_not_expired():
+    class T(mats.Test):
+        def __init__(self):
+            super().__init__('test', min_value=1.0, timeout=5.0)
+
+        def execute(self, is_passing):
+            return 2.0
+
+    t = T()
+    t._setup(is_passing=True)
+    t._execute(is_passing=True)
+    t._teardown(is_passing=True)
+
+    assert t.value == 2.0
+    assert t.timed_out is None
+    assert t.is_passing is True
+    assert t.status == 'complete'
@@ -339,6 +339,24 @@ def test_TestSequence_run_aborted(aborted_test_sequence):
 
     assert ts.is_aborted is True
 
+
+def test_TestSequence_aborted_before_setup():
+    """A test sequence aborted before it begins reports no result."""
+    ts = mats.TestSequence(sequence=[t2])
+    assert ts.start().result(timeout=5.0)['pass'] is True
+
+    # the runner cannot begin until the condition is released
+    with ts._condition:
+        future = ts.start()
+        ts.abort()
+
+    result = future.result(timeout=5.0)
+    assert ts.state is mats.SequenceState.ABORTED
+    ts.close()
+
+    assert result['pass'] is None
+    assert result['failed'] == ()
+
 # #testing GUI elements appears to make automated testing unstable
 # def test_MatsFrame_run_aborted(root):
 #     """
@@ -452,3 +470,283 @@ def test_TestSequence_setup():
 
     assert path.exists('test_data.txt')
     remove('test_data.txt')
+
+
+def test_TestSequence_several_archives():
+    """A list of archive managers is saved to using an ``ArchiveFanout``."""
+    ts = mats.TestSequence(
+        sequence=[t1, t2],
+        archive_manager=[mats.ArchiveManager(fname='fanout_data.txt', data_format=1),
+                         mats.ArchiveManager(fname='fanout_data.db', data_format=2)])
+    ts.start()
+    sleep(0.1)
+    while ts.in_progress is True:
+        sleep(0.1)
+    ts.close()
+
+    rows = list(mats.read_archive('fanout_data.txt'))
+    assert rows[0]['test 2']['criteria'] == {'min': -1.0, 'max': 1.0}
+    with mats.SqliteArchive('fanout_data.db') as database:
+        assert len(database.results('test 2')) == 1
+
+    for p in ('fanout_data.txt', 'fanout_data.db'):
+        remove(p)
+
+
+def test_TestSequence_archive_without_close():
+    """An archive manager need only provide ``aggregate()``."""
+    class Archive:
+        def __init__(self):
+            self.rows = []
+
+        def aggregate(self, **row):
+            self.rows.append(row)
+
+    archive = Archive()
+    ts = mats.TestSequence(sequence=[t1, t2], archive_manager=archive)
+    assert ts.start().result(timeout=5.0)['pass'] is True
+    ts.close()
+
+    assert len(archive.rows) == 1
+
+
+def test_TestSequence_callback_workers():
+    """A slow callback does not delay the next execution of the sequence."""
+    received = []
+
+    def slow_callback(data):
+        sleep(1.0)
+        received.append(data)
+
+    ts = mats.TestSequence(sequence=[t1, t2], callback=slow_callback,
+                           callback_workers=1)
+    ts.start()
+    sleep(0.1)
+    while ts.in_progress is True:
+        sleep(0.1)
+
+    assert ts.ready is True
+    assert received == []
+    assert ts.callback_statistics['queued'] == 1
+
+    ts.close()  # waits on the callback
+
+    assert len(received) == 1
+    assert received[0]['pass'] is True
+    assert received[0]['failed'] == ()
+    with pytest.raises(TypeError):
+        received[0]['pass'] = False
+
+    statistics = ts.callback_statistics
+    assert statistics['queued'] == 0
+    assert statistics['completed'] == 1
+    assert statistics['failures'] == 0
+    assert statistics['duration']['last'] >= 1.0
+    assert statistics['latency']['last'] >= statistics['duration']['last']
+
+
+def test_TestSequence_close_with_callback_workers():
+    """
+    A callback which waits for the queue while the sequence is closed is
+    executed by the sequence itself rather than submitted to the workers.
+    """
+    received = []
+
+    def slow_callback(data):
+        sleep(0.5)
+        received.append(data)
+
+    ts = mats.TestSequence(sequence=[t2], callback=slow_callback,
+                           callback_workers=1, callback_queue_size=0)
+    ts.start().result(timeout=5.0)
+    future = ts.start()  # its callback waits for the first to complete
+    sleep(0.1)
+    ts.close()
+
+    assert future.exception(timeout=5.0) is None
+    assert len(received) == 2
+    assert ts.callback_statistics['completed'] == 2
+
+
+def test_TestSequence_callback_failure():
+    """An exception within the callback is counted rather than raised."""
+    def failing_callback(data):
+        raise ValueError('label printer offline')
+
+    for workers in (0, 2):
+        ts = mats.TestSequence(sequence=[t1, t2], callback=failing_callback,
+                               callback_workers=workers)
+        ts.start()
+        sleep(0.1)
+        while ts.in_progress is True or ts.callback_statistics['queued']:
+            sleep(0.1)
+
+        statistics = ts.callback_statistics
+        ts.close()
+        assert statistics['completed'] == 1
+        assert statistics['failures'] == 1
+        assert statistics['last_error'] == 'label printer offline'
+
+
+def test_TestSequence_state():
+    """The state follows the test sequence and ``start()`` wakes the runner."""
+    ts = mats.TestSequence(sequence=[t1, t2])
+    sleep(0.1)
+    assert ts.state is mats.SequenceState.READY
+    assert ts.start_latency is None
+
+    ts.start()
+    sleep(0.1)
+    assert ts.state is mats.SequenceState.EXECUTING
+    assert ts.start_latency < 0.05
+
+    while ts.in_progress is True:
+        sleep(0.1)
+    assert ts.state is mats.SequenceState.COMPLETE
+
+    with pytest.raises(ValueError):
+        ts._transition(mats.SequenceState.TEARING_DOWN)
+
+    ts.close()
+    ts.abort()  # does not leave the exiting state
+    assert ts.state is mats.SequenceState.EXITING
+    ts._thread.join(1.0)
+    assert not ts._thread.is_alive()
+
+
+def test_TestSequence_start_future():
+    """``start()`` returns a future of the result record of the run."""
+    ts = mats.TestSequence(sequence=[t1, t2])
+
+    future = ts.start()
+    assert ts.start() is future  # already in progress
+
+    result = future.result(timeout=5.0)
+    assert ts.ready is True
+    assert result['pass'] is True
+    assert result['failed'] == ()
+
+    assert ts.wait(timeout=0.0) is True
+    ts.start()
+    assert ts.wait(timeout=5.0) is True
+
+    ts.close()
+    assert ts.wait(timeout=0.0) is False
+
+
+def test_TestSequence_wait_auto_run():
+    """``wait()`` returns once every automatic run has completed."""
+    ts = mats.TestSequence(sequence=[t1, t2], auto_run=3)
+    assert ts.wait(timeout=10.0) is True
+    assert ts._auto_run == 0
+    ts.close()
+
+
+def test_TestSequence_run_awaitable():
+    """``run()`` may be awaited within an event loop."""
+    import asyncio
+
+    ts = mats.TestSequence(sequence=[t1, t2])
+
+    async def chain():
+        return [await ts.run(), await ts.run()]
+
+    results = asyncio.run(chain())
+    assert [r['pass'] for r in results] == [True, True]
+    assert results[0]['datetime'] != results[1]['datetime']
+    ts.close()
+
+
+def test_TestSequence_timing():
+    """The time of each phase is found within the result record."""
+    ts = mats.TestSequence(sequence=[t1, t2], callback=lambda data: None)
+    assert ts.timing is None
+
+    result = ts.start().result(timeout=5.0)
+    timing = result['timing']
+    assert timing is ts.timing
+
+    assert timing['tests']['test 1']['execute'] >= 200_000_000  # sleeps 0.2s
+    assert set(timing['tests']['test 2']) == {'setup', 'execute', 'teardown'}
+    assert set(timing) == {'setup', 'tests', 'callback', 'total', 'overhead'}
+    assert 0 <= timing['overhead'] < timing['total']
+    ts.close()
+
+
+def test_TestSequence_archive_timing():
+    """The time of each phase may be saved along with the data."""
+    ts = mats.TestSequence(
+        sequence=[t1, t2],
+        archive_manager=mats.ArchiveManager(fname='timing_data.txt', data_format=1),
+        archive_timing=True)
+    ts.start().result(timeout=5.0)
+    ts.close()
+
+    row = next(iter(mats.read_archive('timing_data.txt')))
+    assert row['test 1 execute ns']['value'] >= 200_000_000
+    assert 'sequence setup ns' in row
+    assert 'test 2 teardown ns' in row
+    remove('timing_data.txt')
+
+
+class T_hung(mats.Test):
+    """Executes until ``release`` is set, as an instrument which hangs."""
+
+    def __init__(self, release):
+        super().__init__('test hung', pass_if=True, timeout={'execute': 0.1})
+        self.release = release
+        self.torn_down = False
+
+    def execute(self, is_passing):
+        self.release.wait(5.0)
+        return True
+
+    def teardown(self, is_passing):
+        self.torn_down = True
+
+
+def test_TestSequence_timeout_aborts():
+    """A test which times out is torn down and the test sequence aborts."""
+    from threading import Event
+
+    release = Event()
+    hung = T_hung(release)
+    following = T_normal_2()
+    ts = mats.TestSequence(sequence=[hung, following])
+
+    result = ts.start().result(timeout=5.0)
+    release.set()
+    assert ts.state is mats.SequenceState.ABORTED
+    ts.close()
+
+    assert result['pass'] is None
+    assert result['failed'] == ('test hung',)
+    assert hung.torn_down is True
+    assert hung.timed_out == 'execute'
+    assert hung.status == 'aborted'
+    assert following.value is None
+
+
+def test_TestSequence_timeout_fails():
+    """The test sequence may continue after a test times out."""
+    from threading import Event
+
+    release = Event()
+    hung = T_hung(release)
+    following = T_normal_2()
+    ts = mats.TestSequence(sequence=[hung, following], on_timeout='fail')
+
+    result = ts.start().result(timeout=5.0)
+    release.set()
+    assert ts.state is mats.SequenceState.COMPLETE
+    ts.close()
+
+    assert result['pass'] is False
+    assert result['failed'] == ('test hung',)
+    assert hung.torn_down is True
+    assert following.value == 0.012
+
+
+def test_TestSequence_timeout_invalid():
+    with pytest.raises(ValueError):
+        mats.TestSequence(sequence=[T_normal_2()], on_timeout='ignore')
@@ -0,0 +1,180 @@
+"""
+Automated test suite for the Automated Test Environment.
+
+This file focuses on testing the ``load_arrays()`` function.
+"""
+from datetime import datetime
+from pathlib import Path
+import tracemalloc
+
+import pytest
+
+import mats
+
+np = pytest.importorskip('numpy')
+
+
+def _point(i, max_value=6.4):
+    return {
+        'datetime': {'value': str(datetime(2022, 5, 26, 1, 4, i))},
+        'pass': {'value': i % 3 != 0},
+        'failed': {'value': ['flow test', 'comms'] if i % 3 == 0 else []},
+        'comms': {'value': i % 3 != 0, 'criteria': {'pass_if': True}},
+        'flow test': {'value': 5.5 + i / 10,
+                      'criteria': {'min': 5.6, 'max': max_value}},
+        'flow': {'value': None if i == 1 else i},
+        'serial': {'value': f'SN{i}'},
+    }
+
+
+def _data_files():
+    return sorted(f for f in Path('.').iterdir() if 'data' in str(f))
+
+
+@pytest.fixture(params=[0, 1, 4])
+def data_format(request, clean):
+    yield request.param
+
+
+def test_la_single_file(data_format):
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(6):
+            am.save(_point(i))
+
+    data = mats.load_arrays('data.txt')
+    assert set(data.keys()) == {'comms', 'flow test', 'flow', 'serial'}
+
+    flow_test = data['flow test']
+    assert len(flow_test) == 6
+    assert flow_test.values.dtype == np.float64
+    assert np.allclose(flow_test.values, [5.5, 5.6, 5.7, 5.8, 5.9, 6.0])
+    assert flow_test.passed.tolist() == [False, True, True, False, True, True]
+    assert flow_test.min.tolist() == [5.6] * 6
+    assert flow_test.max.tolist() == [6.4] * 6
+    assert flow_test.datetime[2] == np.datetime64('2022-05-26T01:04:02')
+
+    assert data['comms'].values.dtype == bool
+    assert data['comms'].pass_if.tolist() == [True] * 6
+    assert np.isnan(data['comms'].min).all()
+
+    assert np.isnan(data['flow'].values[1])
+    assert data['flow'].values[2] == 2.0
+    assert data['serial'].values.tolist() == [f'SN{i}' for i in range(6)]
+
+
+def test_la_rotated_files(data_format):
+    """Criteria changes are retained when files are combined."""
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(3):
+            am.save(_point(i))
+        for i in range(3, 5):
+            am.save(_point(i, max_value=7.0))
+
+    # data formats 1 and 4 record the criteria within the file
+    paths = _data_files()
+    assert len(paths) == (2 if data_format == 0 else 1)
+
+    data = mats.load_arrays(sorted(paths, key=lambda p: p.name == 'data.txt'))
+    assert data['flow test'].max.tolist() == [6.4, 6.4, 6.4, 7.0, 7.0]
+
+
+def test_la_schema_differences(data_format):
+    with mats.ArchiveManager(data_format=data_format) as am:
+        am.save(_point(0))
+        point = _point(1)
+        point['extra'] = {'value': 1.5}
+        am.save(point)
+
+    data = mats.load_arrays(_data_files())
+    assert len(data['flow test']) == 2
+    assert data['extra'].values.tolist() == [1.5]
+
+
+def test_la_matches_reader(data_format):
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(6):
+            am.save(_point(i))
+
+    data = mats.load_arrays('data.txt')
+    rows = list(mats.ArchiveReader('data.txt'))
+    assert data['serial'].values.tolist() == [r['serial']['value'] for r in rows]
+    assert data['comms'].values.tolist() == [r['comms']['value'] for r in rows]
+
+
+def test_la_malformed_and_partial_rows(data_format):
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(3):
+            am.save(_point(i))
+
+    with open('data.txt', 'a') as f:
+        f.write('malformed\trow\n')
+        f.write(f'{datetime(2022, 5, 26)}\tTrue')
+
+    assert len(mats.load_arrays('data.txt')['flow test']) == 3
+
+
+def test_la_windows_line_endings(data_format):
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(3):
+            am.save(_point(i))
+
+    with open('data.txt', 'rb') as f:
+        content = f.read()
+    with open('data.txt', 'wb') as f:
+        f.write(content.replace(b'\n', b'\r\n'))
+
+    data = mats.load_arrays('data.txt')
+    assert data['serial'].values.tolist() == ['SN0', 'SN1', 'SN2']
+
+
+def test_la_per_element_limits(data_format):
+    """Limits per element, as saved by a test of an array, are loaded."""
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(3):
+            am.save({
+                'datetime': {'value': str(datetime(2022, 5, 26, 1, 4, i))},
+                'pass': {'value': True},
+                'failed': {'value': []},
+                'sweep': {'value': np.array([0.25, 0.75]) + i,
+                          'criteria': {'min': (0.0, 0.5), 'max': 4.0}},
+                'flow test': {'value': 5.5 + i / 10,
+                              'criteria': {'min': 5.6, 'max': 6.4}},
+            })
+
+    data = mats.load_arrays('data.txt')
+
+    sweep = data['sweep']
+    assert len(sweep) == 3
+    assert [list(v) for v in sweep.values] == [[0.25, 0.75], [1.25, 1.75],
+                                               [2.25, 2.75]]
+    assert [list(m) for m in sweep.min] == [[0.0, 0.5]] * 3
+    assert sweep.max.tolist() == [4.0] * 3
+
+    assert data['flow test'].min.dtype == np.float64
+    assert data['flow test'].min.tolist() == [5.6] * 3
+
+
+def test_la_wide_field(data_format):
+    wide = 'x' * 20_000
+
+    with mats.ArchiveManager(data_format=data_format) as am:
+        for i in range(500):
+            point = _point(i % 60)
+            point['serial']['value'] = wide if i == 7 else f'SN{i}'
+            am.save(point)
+
+    tracemalloc.start()
+    try:
+        data = mats.load_arrays('data.txt')
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    serial = data['serial'].values
+    assert serial[7] == wide
+    assert serial[8] == 'SN8'
+    assert len(serial) == 500
+
+    # the column of bytes is 10 MB, which indexing every byte of it would
+    # multiply several times over
+    assert peak < 40_000_000